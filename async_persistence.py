@@ -0,0 +1,407 @@
+"""
+Módulo async_persistence.py
+
+Guardado y carga de partidas en segundo plano para la interfaz Tkinter.
+
+Al guardar, en el hilo de Tk solo se copia una instantánea inmutable de la
+partida (las filas como bytes y los contadores); la codificación y la
+escritura se hacen en un hilo de trabajo, primero en un archivo temporal que
+después se renombra de forma atómica sobre el destino. La carga lee y
+decodifica el archivo por bloques de filas en el hilo de trabajo e informa
+del progreso. Los resultados vuelven al hilo de Tk a través de una cola que
+se revisa con master.after, porque Tk no admite llamadas desde otros hilos.
+
+Clases:
+    GameSnapshot: Copia inmutable de una partida lista para codificar.
+    AsyncPersistence: Guardado y carga en un hilo de trabajo.
+    Autosave: Guardado periódico que se omite si la partida no cambió.
+"""
+
+import itertools
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+import board_codec
+from engines import DEFAULT_ENGINE, get_engine
+from file_manager import FileManager
+from replay_journal import DEFAULT_CHECKPOINT_EVERY, JOURNAL_EXT, ReplayJournal
+
+ROWS_PER_CHUNK = 256
+POLL_MS = 50
+AUTOSAVE_MS = 60_000
+# Lado mínimo para que el autoguardado reescriba solo las filas cambiadas.
+ROWS_SAVE_MIN_SIZE = 512
+# Sufijos de los temporales de write_snapshot (únicos dentro del proceso).
+_TMP_IDS = itertools.count()
+
+
+class GameSnapshot:
+    """
+    Copia inmutable del estado de una partida.
+
+    Expone los atributos y row_bytes que usa board_codec.encode_game, así
+    que se puede codificar en otro hilo mientras la partida sigue cambiando.
+    De las partidas por teselas (SparseGameLogic) se copian solo las teselas
+    guardadas, y se escriben con board_codec.encode_tiled. Con ``rows`` se
+    copian solo esas filas (para FileManager.save_rows).
+
+    Args:
+        game (GameLogic): Partida a copiar (cualquier motor)
+        rows (iterable): Filas a copiar; por defecto todas
+    """
+
+    __slots__ = ("size", "level", "max_level", "barriers_remaining", "barrier_placed", "rows", "tile", "tiles")
+
+    def __init__(self, game, rows=None):
+        self.size = game.size
+        self.level = game.level
+        self.max_level = game.max_level
+        self.barriers_remaining = game.barriers_remaining
+        self.barrier_placed = game.barrier_placed
+        self.tile = getattr(game, "tile", None)
+        if rows is not None:
+            self.rows = {i: bytes(game.row_bytes(i)) for i in rows}
+            self.tiles = None
+        elif self.tile:
+            self.rows = None
+            self.tiles = tuple(game.stored_tiles())
+        else:
+            self.rows = tuple(bytes(game.row_bytes(i)) for i in range(game.size))
+            self.tiles = None
+
+    def row_bytes(self, i):
+        return self.rows[i]
+
+    def stored_tiles(self):
+        return self.tiles
+
+
+def write_snapshot(snapshot, path, rows_per_chunk=ROWS_PER_CHUNK):
+    """
+    Escribe una instantánea en formato empaquetado con reemplazo atómico.
+
+    Las filas se empaquetan por bloques, lo que deja respirar al hilo de Tk
+    entre bloques. El archivo temporal se sincroniza antes de renombrarlo,
+    así que el destino contiene siempre la partida anterior o la nueva. Cada
+    escritura usa su propio temporal (creado con O_EXCL), de modo que varios
+    guardados simultáneos en la misma ruta no se mezclan: gana el último
+    en renombrar.
+    """
+    tmp_path, fd = _create_temp(path)
+    flags = board_codec.pack_flags(snapshot)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if snapshot.tile:
+                f.write(board_codec.encode_tiled(snapshot))
+            else:
+                f.write(board_codec.HEADER.pack(board_codec.MAGIC, board_codec.VERSION, snapshot.size,
+                                                snapshot.level, snapshot.barriers_remaining, flags))
+                for start in range(0, snapshot.size, rows_per_chunk):
+                    f.write(board_codec.pack_rows(snapshot.rows[start:start + rows_per_chunk],
+                                                  snapshot.size))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _create_temp(path):
+    """
+    Crea junto a path un archivo temporal nuevo con los permisos de un open()
+    normal (0666 menos la umask, que aplica el sistema).
+
+    Returns:
+        tuple: (ruta del temporal, descriptor abierto para escritura)
+    """
+    while True:
+        tmp_path = f"{path}.{os.getpid()}.{next(_TMP_IDS)}.tmp"
+        try:
+            return tmp_path, os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        except FileExistsError:
+            continue
+
+
+def read_game(path, engine=DEFAULT_ENGINE, progress=None, rows_per_chunk=ROWS_PER_CHUNK):
+    """
+    Carga una partida leyendo y decodificando el tablero por bloques de filas.
+
+    Args:
+        path (str): Ruta del archivo .bin
+        engine (str): Motor de tablero de la partida
+        progress (callable): Función opcional llamada con la fracción cargada (0..1)
+        rows_per_chunk (int): Filas por bloque
+
+    Returns:
+        GameLogic: Partida cargada
+    """
+    total = os.path.getsize(path)
+    with open(path, "rb") as f:
+        head = f.read(board_codec.HEADER.size)
+        header = board_codec.read_header(head)
+        if header is not None and header.version == board_codec.TILED_VERSION:
+            # Por teselas: el archivo solo contiene las teselas ocupadas.
+            game = board_codec.decode_game(head + f.read(), engine)
+            if progress is not None:
+                progress(1.0)
+            return game
+        stride = None if header is None else board_codec.row_stride(header.size)
+        if header is None or total != board_codec.HEADER.size + header.size * stride:
+            # Formato antiguo: no tiene filas de ancho fijo, se lee completo.
+            game = FileManager._load_legacy(head + f.read(), engine)
+            if progress is not None:
+                progress(1.0)
+            return game
+        rows = []
+        while len(rows) < header.size:
+            count = min(rows_per_chunk, header.size - len(rows))
+            data = f.read(count * stride)
+            if len(data) != count * stride:
+                raise ValueError("archivo truncado")
+            rows.extend(board_codec.unpack_rows(data, header.size))
+            if progress is not None:
+                progress(len(rows) / header.size)
+    game = get_engine(engine)(header.size, initialize=False)
+    game.level = header.level
+    game.barriers_remaining = header.barriers
+    game.barrier_placed = header.barrier_placed
+    if header.max_level:
+        game.max_level = header.max_level
+    game.load_rows(rows)
+    return game
+
+
+class AsyncPersistence:
+    """
+    Guardado y carga de partidas en un hilo de trabajo.
+
+    Las operaciones se ejecutan en orden en un único hilo, y sus callbacks se
+    llaman en el hilo de Tk.
+
+    Args:
+        master (tk.Misc): Widget con el que programar las revisiones (master.after)
+        poll_ms (int): Milisegundos entre revisiones de la cola de resultados
+    """
+
+    def __init__(self, master, poll_ms=POLL_MS):
+        self.master = master
+        self.poll_ms = poll_ms
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="persistence")
+        self.results = queue.Queue()
+        self.pending = 0
+        self._poll_id = None
+
+    def save(self, game, filename, on_done=None):
+        """
+        Guarda una partida en segundo plano.
+
+        Args:
+            game (GameLogic): Partida a guardar; se copia en este momento
+            filename (str): Nombre base del archivo (sin extensión), como FileManager
+            on_done (callable): Función (ok, error) llamada en el hilo de Tk al terminar
+        """
+        snapshot = GameSnapshot(game)
+        self._submit(write_snapshot, (snapshot, f"{filename}.bin"), on_done, None)
+
+    def save_rows(self, game, filename, rows, on_done=None):
+        """
+        Reescribe en segundo plano solo algunas filas (y la cabecera) de una
+        partida ya guardada con el mismo tamaño (FileManager.save_rows).
+
+        Args:
+            game (GameLogic): Partida a guardar; las filas se copian en este momento
+            filename (str): Nombre base del archivo (sin extensión)
+            rows (iterable): Índices de las filas que cambiaron
+            on_done (callable): Función (ok, error) llamada en el hilo de Tk al terminar
+        """
+        rows = sorted(rows)
+        snapshot = GameSnapshot(game, rows)
+        self._submit(FileManager.save_rows, (snapshot, filename, rows), on_done, None)
+
+    def open_journal(self, game, filename, on_done=None, checkpoint_every=DEFAULT_CHECKPOINT_EVERY):
+        """
+        Abre el diario de jugadas de una partida en segundo plano.
+
+        En el hilo de Tk solo se copia la partida y se suscribe el diario (que
+        acumula las jugadas en memoria); la lectura del diario existente y el
+        primer punto de control se escriben en el hilo de trabajo.
+
+        Args:
+            game (GameLogic): Partida a registrar
+            filename (str): Nombre base del archivo (sin extensión)
+            on_done (callable): Función (ok, error) llamada en el hilo de Tk al terminar
+            checkpoint_every (int): Jugadas entre puntos de control
+
+        Returns:
+            ReplayJournal: El diario, ya suscrito a la partida
+        """
+        journal = ReplayJournal(f"{filename}{JOURNAL_EXT}", game, checkpoint_every,
+                                snapshot=GameSnapshot(game))
+        self._submit(journal.open, (), on_done, None)
+        return journal
+
+    def load(self, filename, on_done, engine=DEFAULT_ENGINE, on_progress=None):
+        """
+        Carga una partida en segundo plano.
+
+        Args:
+            filename (str): Nombre base del archivo (sin extensión)
+            on_done (callable): Función (game, error) llamada en el hilo de Tk;
+                game es None si ocurrió un error
+            engine (str): Motor de tablero de la partida
+            on_progress (callable): Función (fracción) llamada en el hilo de Tk
+        """
+        self._submit(read_game, (f"{filename}.bin", engine), on_done, on_progress)
+
+    def _submit(self, func, args, on_done, on_progress):
+        def progress(fraction):
+            self.results.put(("progress", on_progress, fraction))
+
+        def run():
+            try:
+                if on_progress is not None:
+                    value = func(*args, progress=progress)
+                else:
+                    value = func(*args)
+                outcome = (True if value is None else value, None)
+            except Exception as e:
+                print(f"Error en segundo plano: {str(e)}")
+                outcome = (None if func is read_game else False, e)
+            self.results.put(("done", on_done, outcome))
+
+        self.pending += 1
+        self.executor.submit(run)
+        if self._poll_id is None:
+            self._poll_id = self.master.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        self._poll_id = None
+        # Del progreso solo interesa el último valor de cada revisión.
+        progress = {}
+        while True:
+            try:
+                kind, callback, value = self.results.get_nowait()
+            except queue.Empty:
+                break
+            if kind == "progress":
+                progress[callback] = value
+                continue
+            self.pending -= 1
+            for progress_callback, fraction in progress.items():
+                progress_callback(fraction)
+            progress.clear()
+            if callback is not None:
+                callback(*value)
+        for callback, fraction in progress.items():
+            callback(fraction)
+        if self.pending:
+            self._poll_id = self.master.after(self.poll_ms, self._poll)
+
+    def shutdown(self):
+        """Espera a que terminen las escrituras pendientes."""
+        self.executor.shutdown(wait=True)
+
+
+class Autosave:
+    """
+    Guarda periódicamente la partida observada si cambió desde el último guardado.
+
+    Los cambios de celda se detectan con los eventos de GameLogic; el nivel y
+    las barreras se comparan con los del último guardado. En partidas grandes
+    en formato empaquetado, tras el primer guardado completo solo se
+    reescriben las filas que cambiaron (FileManager.save_rows).
+
+    Args:
+        persistence (AsyncPersistence): Capa de guardado en segundo plano
+        filename (str): Nombre base del archivo de autoguardado
+        interval_ms (int): Milisegundos entre intentos de guardado
+    """
+
+    def __init__(self, persistence, filename, interval_ms=AUTOSAVE_MS):
+        self.persistence = persistence
+        self.filename = filename
+        self.interval_ms = interval_ms
+        self.game = None
+        self.dirty = False
+        self.dirty_rows = set()
+        self.full_save = True
+        self.saving = False
+        self.saves = 0
+        self._saved_state = None
+        self._after_id = None
+
+    def watch(self, game):
+        """Empieza a observar una partida (por ejemplo, tras un juego nuevo o una carga)."""
+        if self.game is game:
+            return
+        if self.game is not None:
+            self.game.unsubscribe(self._on_changes)
+        self.game = game
+        self.dirty = True
+        self.dirty_rows = set()
+        self.full_save = True
+        game.subscribe(self._on_changes)
+
+    def _on_changes(self, changes):
+        self.dirty = True
+        self.dirty_rows.update(change.i for change in changes)
+
+    def _state(self):
+        return (self.game.level, self.game.barriers_remaining, self.game.barrier_placed)
+
+    def start(self):
+        if self._after_id is None:
+            self._after_id = self.persistence.master.after(self.interval_ms, self._tick)
+
+    def stop(self):
+        if self._after_id is not None:
+            self.persistence.master.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _tick(self):
+        self._after_id = None
+        self.save_if_changed()
+        self.start()
+
+    def save_if_changed(self):
+        """
+        Lanza un guardado si la partida cambió desde el último.
+
+        Returns:
+            bool: True si se lanzó un guardado
+        """
+        if self.game is None or self.saving:
+            return False
+        if not self.dirty and self._state() == self._saved_state:
+            return False
+        game = self.game
+        rows = None
+        if (not self.full_save and game.size >= ROWS_SAVE_MIN_SIZE and not getattr(game, "tile", None)
+                and len(self.dirty_rows) * 2 < game.size):
+            rows = self.dirty_rows
+        self.dirty = False
+        self.dirty_rows = set()
+        self.saving = True
+        state = self._state()
+
+        def done(ok, error):
+            self.saving = False
+            if ok:
+                self._saved_state = state
+                self.full_save = False
+                self.saves += 1
+            else:
+                # Las filas pendientes se perdieron: el siguiente guardado es completo.
+                self.dirty = True
+                self.full_save = True
+
+        if rows is None:
+            self.persistence.save(game, self.filename, done)
+        else:
+            self.persistence.save_rows(game, self.filename, rows, done)
+        return True
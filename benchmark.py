@@ -0,0 +1,442 @@
+"""
+Módulo benchmark.py
+
+Banco de pruebas de rendimiento para GameLogic, Validation y los formatos de
+guardado de FileManager (.bin) y FileHandler (.vsc). Recorre varios tamaños de
+tablero, mide operaciones por segundo y memoria pico de cada operación, y
+escribe los resultados en JSON. Si se indica una línea base, compara contra
+ella y marca las regresiones.
+
+También mide la memoria que ocupa cada partida viva de cada motor, para
+dimensionar cuántas partidas caben en un proceso, y el tiempo de arranque de
+cli.py: cada orden se ejecuta en un proceso nuevo y se comprueba que no
+supere el presupuesto (por encima del arranque del intérprete) ni importe
+Tkinter, NumPy o el solver.
+
+Uso:
+    python benchmark.py --sizes 5 50 500 --output resultados.json
+    python benchmark.py --baseline base.json --tolerance 0.25
+    python benchmark.py --memory --sizes 5 10 25 --games 10000
+    python benchmark.py --startup --startup-budget 150
+
+Funciones:
+    run_benchmarks: Ejecuta las mediciones y devuelve el informe.
+    compare: Compara un informe con una línea base.
+    game_memory: Mide los bytes por partida viva de un motor.
+    measure_startup: Mide el arranque de las órdenes de cli.py.
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from engines import DEFAULT_ENGINE, ENGINES, create_game
+from file_handler import FileHandler
+from file_manager import FileManager
+from validation import Validation
+
+DEFAULT_SIZES = [5, 10, 25, 50, 100, 250, 500, 1000, 2000, 4000]
+
+
+def _played_game(size, engine):
+    """Partida con algo de virus propagado para que las operaciones sean realistas."""
+    game = create_game(size, engine, seed=size)
+    for _ in range(size):
+        game.spread_virus()
+    return game
+
+
+def bench_place_barrier(size, engine, workdir):
+    game = _played_game(size, engine)
+    game.barriers_remaining = size * size
+    cells = sorted(game.legal_barrier_cells())
+    state = {"next": 0}
+
+    def op():
+        # Se coloca y se retira la barrera para que cada llamada parta del
+        # mismo tablero y tenga que recalcular las celdas válidas.
+        i, j = cells[state["next"] % len(cells)]
+        state["next"] += 1
+        game.place_barrier(i, j)
+        game._set_cell(i, j, 0)
+    return op
+
+
+def bench_legal_barrier_cells(size, engine, workdir):
+    game = _played_game(size, engine)
+
+    def op():
+        game._legal_cache = None
+        game.legal_barrier_cells()
+    return op
+
+
+def bench_validate_no_islands(size, engine, workdir):
+    game = _played_game(size, engine)
+    i, j = next((i, j) for i in range(size // 2, size) for j in range(size) if game.cell(i, j) == 0)
+    return lambda: game.validate_no_islands(i, j)
+
+
+def bench_validation_no_islands(size, engine, workdir):
+    game = _played_game(size, engine)
+    board = [list(row) for row in game.board]
+    virus = [(i, j) for i in range(size) for j in range(size) if board[i][j] == 1]
+    validator = Validation()
+    return lambda: validator.validate_no_islands(board, virus, size)
+
+
+def bench_spread_virus(size, engine, workdir):
+    state = {"game": _played_game(size, engine)}
+
+    def op():
+        if not state["game"].spread_virus():
+            state["game"].initialize_level()
+    return op
+
+
+def bench_check_win(size, engine, workdir):
+    return _played_game(size, engine).check_win
+
+
+def bench_free_cells(size, engine, workdir):
+    return _played_game(size, engine).free_cells
+
+
+def _checked(call):
+    """Envuelve una operación de guardado/carga para que un fallo detenga la medición."""
+    def op():
+        result = call()
+        if result is False or result is None or result == (None, None, None):
+            raise RuntimeError("la operación de archivo falló")
+    return op
+
+
+def bench_file_manager_save(size, engine, workdir):
+    game = _played_game(size, engine)
+    path = os.path.join(workdir, "fm")
+    return _checked(lambda: FileManager.save_game(game, path))
+
+
+def bench_file_manager_load(size, engine, workdir):
+    path = os.path.join(workdir, "fm")
+    _checked(lambda: FileManager.save_game(_played_game(size, engine), path))()
+    return _checked(lambda: FileManager.load_game(path, engine))
+
+
+def bench_file_handler_save(size, engine, workdir):
+    game = _played_game(size, engine)
+    path = os.path.join(workdir, "fh.vsc")
+    handler = FileHandler()
+    return _checked(lambda: handler.save_game(game, path))
+
+
+def bench_file_handler_load(size, engine, workdir):
+    path = os.path.join(workdir, "fh.vsc")
+    handler = FileHandler()
+    _checked(lambda: handler.save_game(_played_game(size, engine), path))()
+    return _checked(lambda: handler.load_game(path))
+
+
+BENCHMARKS = {
+    "place_barrier": bench_place_barrier,
+    "legal_barrier_cells": bench_legal_barrier_cells,
+    "validate_no_islands": bench_validate_no_islands,
+    "Validation.validate_no_islands": bench_validation_no_islands,
+    "spread_virus": bench_spread_virus,
+    "check_win": bench_check_win,
+    "free_cells": bench_free_cells,
+    "FileManager.save_game": bench_file_manager_save,
+    "FileManager.load_game": bench_file_manager_load,
+    "FileHandler.save_game": bench_file_handler_save,
+    "FileHandler.load_game": bench_file_handler_load,
+}
+
+
+def measure(op, min_time=0.2, max_iterations=100000):
+    """
+    Mide una operación repitiéndola hasta acumular ``min_time`` segundos.
+
+    Returns:
+        dict: Iteraciones, operaciones por segundo, tiempo medio y memoria pico
+    """
+    tracemalloc.start()
+    try:
+        op()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    iterations = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time and iterations < max_iterations:
+        op()
+        iterations += 1
+        elapsed = time.perf_counter() - start
+    return {
+        "iterations": iterations,
+        "ops_per_sec": iterations / elapsed if elapsed else float("inf"),
+        "mean_seconds": elapsed / iterations,
+        "peak_bytes": peak,
+    }
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, names=None, engine=DEFAULT_ENGINE,
+                   min_time=0.2, budget=5.0, log=None):
+    """
+    Ejecuta los benchmarks indicados para cada tamaño de tablero.
+
+    Si la preparación o una sola llamada de una operación supera ``budget``
+    segundos, o la operación falla, los tamaños mayores de esa operación se
+    marcan como omitidos.
+
+    Args:
+        sizes (list): Tamaños de tablero a recorrer
+        names (list): Operaciones a medir (None = todas)
+        engine (str): Motor de tablero
+        min_time (float): Tiempo mínimo de medición por operación y tamaño
+        budget (float): Tiempo máximo por llamada antes de omitir tamaños mayores
+        log (callable): Función opcional para informar del progreso
+
+    Returns:
+        dict: Informe con metadatos y una lista de resultados
+    """
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for name in names or BENCHMARKS:
+            too_slow = False
+            for size in sorted(sizes):
+                entry = {"op": name, "size": size}
+                if too_slow:
+                    entry["skipped"] = True
+                    results.append(entry)
+                    continue
+                start = time.perf_counter()
+                try:
+                    op = BENCHMARKS[name](size, engine, workdir)
+                    setup = time.perf_counter() - start
+                    entry.update(measure(op, min_time=min_time))
+                except Exception as e:
+                    entry["error"] = str(e)
+                    results.append(entry)
+                    too_slow = True
+                    if log:
+                        log(f"{name:32} {size:>6} ERROR: {e}")
+                    continue
+                too_slow = setup > budget or entry["mean_seconds"] > budget
+                results.append(entry)
+                if log:
+                    log(f"{name:32} {size:>6} {entry['ops_per_sec']:>14.1f} ops/s "
+                        f"{entry['peak_bytes']:>12} B")
+    return {
+        "meta": {
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "engine": engine,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+
+
+def game_memory(size, engine=DEFAULT_ENGINE, games=1000, turns=None):
+    """
+    Mide la memoria por partida manteniendo ``games`` partidas vivas a la vez.
+
+    Args:
+        size (int): Tamaño del tablero
+        engine (str): Motor de tablero
+        games (int): Partidas a crear
+        turns (int): Propagaciones por partida antes de medir (por defecto, size)
+
+    Returns:
+        dict: bytes_per_game, total_bytes y games
+    """
+    turns = size if turns is None else turns
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        alive = []
+        for index in range(games):
+            game = create_game(size, engine, seed=index)
+            for _ in range(turns):
+                game.spread_virus()
+            alive.append(game)
+        total = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return {"games": games, "total_bytes": total, "bytes_per_game": total / games}
+
+
+STARTUP_BUDGET_MS = 150
+STARTUP_RUNS = 10
+# Módulos que cli.py solo debe importar en las órdenes que los necesitan.
+HEAVY_MODULES = ("tkinter", "numpy", "solver")
+_MODULES_SCRIPT = (
+    "import json, sys, cli\n"
+    "cli.main(json.loads(sys.argv[1]))\n"
+    "print(json.dumps(sorted(m for m in json.loads(sys.argv[2]) if m in sys.modules)))\n"
+)
+
+
+def _best_time(command, runs, cwd):
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=cwd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def measure_startup(runs=STARTUP_RUNS):
+    """
+    Mide el arranque de las órdenes de cli.py en procesos nuevos.
+
+    Para cada orden se toma el mejor de ``runs`` tiempos y se le resta el del
+    intérprete vacío, y se anotan los módulos de HEAVY_MODULES que importa.
+
+    Args:
+        runs (int): Ejecuciones por orden
+
+    Returns:
+        dict: interpreter_ms y, por orden, ms y heavy_modules
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    cli = os.path.join(here, "cli.py")
+    env_path = os.pathsep.join(filter(None, [here, os.environ.get("PYTHONPATH")]))
+    env = {**os.environ, "PYTHONPATH": env_path}
+    with tempfile.TemporaryDirectory() as workdir:
+        game = os.path.join(workdir, "partida")
+        commands = {
+            "help": ["--help"],
+            "new": ["new", game, "--size", "20", "--seed", "1"],
+            "load": ["load", game],
+            "turn": ["turn", game, "--seed", "1"],
+            "fast-forward": ["fast-forward", game, "--turns", "5", "--seed", "1"],
+        }
+        interpreter = _best_time([sys.executable, "-c", "pass"], runs, workdir)
+        report = {"interpreter_ms": interpreter * 1000, "commands": {}}
+        for name, argv in commands.items():
+            elapsed = _best_time([sys.executable, cli, *argv], runs, workdir)
+            if name == "help":
+                loaded = []
+            else:
+                output = subprocess.run(
+                    [sys.executable, "-c", _MODULES_SCRIPT, json.dumps(argv), json.dumps(HEAVY_MODULES)],
+                    cwd=workdir, env=env, capture_output=True, text=True, check=True).stdout
+                loaded = json.loads(output.strip().splitlines()[-1])
+            report["commands"][name] = {"ms": (elapsed - interpreter) * 1000, "heavy_modules": loaded}
+    return report
+
+
+def compare(report, baseline, tolerance=0.2):
+    """
+    Compara un informe con una línea base.
+
+    Args:
+        report (dict): Informe de run_benchmarks
+        baseline (dict): Informe guardado previamente
+        tolerance (float): Caída relativa de ops/s permitida (0.2 = 20 %)
+
+    Returns:
+        list: Regresiones como diccionarios (op, size, baseline, current, ratio)
+    """
+    previous = {(r["op"], r["size"]): r for r in baseline["results"] if "ops_per_sec" in r}
+    regressions = []
+    for result in report["results"]:
+        old = previous.get((result["op"], result["size"]))
+        if old is None or "ops_per_sec" not in result:
+            continue
+        ratio = result["ops_per_sec"] / old["ops_per_sec"]
+        if ratio < 1 - tolerance:
+            regressions.append({
+                "op": result["op"],
+                "size": result["size"],
+                "baseline": old["ops_per_sec"],
+                "current": result["ops_per_sec"],
+                "ratio": ratio,
+            })
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks del juego de virus")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--ops", nargs="+", choices=sorted(BENCHMARKS), default=None)
+    parser.add_argument("--engine", default=None,
+                        help=f"Motor de tablero (por defecto {DEFAULT_ENGINE}; con --memory, todos)")
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--budget", type=float, default=5.0)
+    parser.add_argument("--output", help="Archivo JSON donde escribir los resultados")
+    parser.add_argument("--baseline", help="Informe JSON contra el que comparar")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--memory", action="store_true",
+                        help="Medir bytes por partida viva de cada motor en lugar de la velocidad")
+    parser.add_argument("--games", type=int, default=1000, help="Partidas vivas para --memory")
+    parser.add_argument("--startup", action="store_true",
+                        help="Medir el arranque de cli.py en lugar de la velocidad")
+    parser.add_argument("--startup-budget", type=float, default=STARTUP_BUDGET_MS,
+                        help="Milisegundos de arranque permitidos por orden sobre el intérprete")
+    args = parser.parse_args(argv)
+
+    if args.startup:
+        report = measure_startup()
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+        failed = False
+        print(f"intérprete: {report['interpreter_ms']:.1f} ms", file=sys.stderr)
+        for name, result in report["commands"].items():
+            over = result["ms"] > args.startup_budget
+            print(f"{name:>13} {result['ms']:>8.1f} ms {' '.join(result['heavy_modules'])}", file=sys.stderr)
+            if over:
+                print(f"REGRESIÓN arranque de {name}: {result['ms']:.1f} ms "
+                      f"(presupuesto {args.startup_budget:.0f} ms)")
+            if result["heavy_modules"]:
+                print(f"REGRESIÓN arranque de {name}: importa {', '.join(result['heavy_modules'])}")
+            failed = failed or over or bool(result["heavy_modules"])
+        return 1 if failed else 0
+
+    if args.memory:
+        engines = [args.engine] if args.engine else list(ENGINES)
+        report = {}
+        for engine in engines:
+            for size in args.sizes:
+                try:
+                    result = game_memory(size, engine, args.games)
+                except ImportError as e:
+                    print(f"{engine}: {e}", file=sys.stderr)
+                    break
+                report.setdefault(engine, {})[str(size)] = result
+                print(f"{engine:>9} {size:>5}x{size:<5} {result['bytes_per_game']:>12,.0f} bytes/partida",
+                      file=sys.stderr)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(report, f, indent=2)
+        return 0
+
+    report = run_benchmarks(args.sizes, args.ops, args.engine or DEFAULT_ENGINE, args.min_time, args.budget,
+                            log=lambda line: print(line, file=sys.stderr))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for r in regressions:
+            print(f"REGRESIÓN {r['op']} (tamaño {r['size']}): "
+                  f"{r['baseline']:.1f} -> {r['current']:.1f} ops/s ({r['ratio']:.0%})")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
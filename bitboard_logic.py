@@ -0,0 +1,239 @@
+"""
+Módulo bitboard_logic.py
+
+Motor alternativo de GameLogic pensado para simulaciones sin interfaz. El
+tablero se guarda como dos enteros de precisión arbitraria usados como mapas
+de bits (celdas infectadas y barreras). Cada fila ocupa size + 1 bits: la
+columna extra queda siempre a cero y evita que los desplazamientos
+horizontales pasen de una fila a la siguiente.
+
+Con esta representación la expansión a vecinos, la frontera, la verificación
+de victoria y el conteo de celdas libres son unos pocos desplazamientos, AND y
+``int.bit_count()``.
+
+Clases:
+    BitboardGameLogic: GameLogic con el tablero en mapas de bits.
+"""
+
+from game_logic import CAUSE_SPREAD, DIRECTIONS, GameLogic
+
+_INFECTED_BITS = bytes.maketrans(b"\x00\x01\x02", b"010")
+_BARRIER_BITS = bytes.maketrans(b"\x00\x01\x02", b"001")
+
+
+class _BitboardRow:
+    """Vista de una fila del tablero de bits con semántica de lista."""
+
+    def __init__(self, game, i):
+        self.game = game
+        self.i = i
+
+    def __len__(self):
+        return self.game.size
+
+    def __getitem__(self, j):
+        if j < 0:
+            j += self.game.size
+        if not 0 <= j < self.game.size:
+            raise IndexError("columna fuera del tablero")
+        return self.game.cell(self.i, j)
+
+    def __setitem__(self, j, value):
+        if j < 0:
+            j += self.game.size
+        if not 0 <= j < self.game.size:
+            raise IndexError("columna fuera del tablero")
+        self.game._write_bits(self.i, j, value)
+
+    def __iter__(self):
+        return iter(self.game.row_values(self.i))
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def count(self, value):
+        return self.game.row_values(self.i).count(value)
+
+
+class _BitboardView:
+    """Vista del tablero completo, indexable como ``board[i][j]``."""
+
+    def __init__(self, game):
+        self.game = game
+
+    def __len__(self):
+        return self.game.size
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.game.size
+        if not 0 <= i < self.game.size:
+            raise IndexError("fila fuera del tablero")
+        return _BitboardRow(self.game, i)
+
+    def __iter__(self):
+        for i in range(self.game.size):
+            yield _BitboardRow(self.game, i)
+
+    def __eq__(self, other):
+        return [list(row) for row in self] == [list(row) for row in other]
+
+    def __repr__(self):
+        return repr([list(row) for row in self])
+
+
+class BitboardGameLogic(GameLogic):
+    """
+    GameLogic con el tablero almacenado en dos mapas de bits.
+
+    Asignar una lista de listas a ``board`` la codifica en los mapas de bits,
+    y leer ``board`` devuelve una vista con la misma semántica ``board[i][j]``
+    que el motor de listas, de modo que FileManager y la interfaz funcionan
+    sin cambios.
+    """
+
+    def __init__(self, size=5, seed=None, initialize=True):
+        self.stride = size + 1
+        self.row_mask = (1 << size) - 1
+        self.valid = 0
+        for i in range(size):
+            self.valid |= self.row_mask << (i * self.stride)
+        self.infected = 0
+        self.barriers = 0
+        super().__init__(size, seed, initialize)
+
+    @property
+    def board(self):
+        return _BitboardView(self)
+
+    @board.setter
+    def board(self, rows):
+        infected = bytearray()
+        barriers = bytearray()
+        for row in rows:
+            values = bytes(row)
+            infected += values.translate(_INFECTED_BITS) + b"0"
+            barriers += values.translate(_BARRIER_BITS) + b"0"
+        # El bit 0 corresponde a la celda (0, 0): se invierte la cadena.
+        self.infected = int(infected[::-1] or b"0", 2)
+        self.barriers = int(barriers[::-1] or b"0", 2)
+
+    def to_board(self):
+        """Devuelve el tablero como lista de listas (motor de referencia)."""
+        return [self.row_values(i) for i in range(self.size)]
+
+    def row_bytes(self, i):
+        return bytes(self.row_values(i))
+
+    def row_values(self, i):
+        """Decodifica la fila i como lista de valores 0/1/2."""
+        shift = i * self.stride
+        infected = (self.infected >> shift) & self.row_mask
+        barriers = (self.barriers >> shift) & self.row_mask
+        row = [0] * self.size
+        for j, bit in enumerate(reversed(format(infected, f"0{self.size}b"))):
+            if bit == "1":
+                row[j] = 1
+        for j, bit in enumerate(reversed(format(barriers, f"0{self.size}b"))):
+            if bit == "1":
+                row[j] = 2
+        return row
+
+    def cell(self, i, j):
+        bit = 1 << (i * self.stride + j)
+        if self.infected & bit:
+            return 1
+        if self.barriers & bit:
+            return 2
+        return 0
+
+    def _write_bits(self, i, j, value):
+        bit = 1 << (i * self.stride + j)
+        self.infected &= ~bit
+        self.barriers &= ~bit
+        if value == 1:
+            self.infected |= bit
+        elif value == 2:
+            self.barriers |= bit
+
+    def neighbors(self, mask):
+        """Celdas ortogonalmente adyacentes a las de ``mask``."""
+        stride = self.stride
+        return ((mask << 1) | (mask >> 1) | (mask << stride) | (mask >> stride)) & self.valid
+
+    def free_mask(self):
+        return self.valid & ~(self.infected | self.barriers)
+
+    def frontier_mask(self):
+        """Celdas libres a las que el virus puede propagarse."""
+        return self.neighbors(self.infected) & self.free_mask()
+
+    def _reset_board(self):
+        self.infected = 0
+        self.barriers = 0
+        for k in self.rng.sample(range(self.size * self.size), self.level):
+            i, j = divmod(k, self.size)
+            self.infected |= 1 << (i * self.stride + j)
+
+    def rebuild_frontier(self):
+        # La frontera se obtiene de los mapas de bits cuando se necesita.
+        self._invalidate()
+
+    def _write_cell(self, i, j, value):
+        self._write_bits(i, j, value)
+
+    def _infect_all(self, cells):
+        # Se construye la máscara en un bytearray para no rehacer el entero por celda.
+        self._record_spread(cells)
+        bits = bytearray((self.size * self.stride + 7) // 8)
+        for k in cells:
+            i, j = divmod(k, self.size)
+            b = i * self.stride + j
+            bits[b >> 3] |= 1 << (b & 7)
+        self.infected |= int.from_bytes(bits, "little")
+        self._invalidate()
+
+    def spread_virus(self):
+        # Misma distribución que la referencia: una celda infectada con algún
+        # vecino libre elegida al azar y luego una dirección libre al azar.
+        active = self.neighbors(self.free_mask()) & self.infected
+        if not active:
+            return False
+        k = _nth_set_bit(active, self.rng.randrange(active.bit_count()))
+        x, y = divmod(k, self.stride)
+        for dx, dy in self.rng.sample(DIRECTIONS, 4):
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.size and 0 <= ny < self.size and self.cell(nx, ny) == 0:
+                self._set_cell(nx, ny, 1, CAUSE_SPREAD)
+                self._flush_changes()
+                return True
+        return False
+
+    def check_win(self):
+        return not self.frontier_mask()
+
+    def frontier_cells(self):
+        mask = self.frontier_mask()
+        cells = set()
+        for k, bit in enumerate(reversed(format(mask, "b"))):
+            if bit == "1":
+                cells.add(divmod(k, self.stride))
+        return cells
+
+    def free_cells(self):
+        return self.free_mask().bit_count()
+
+
+def _nth_set_bit(mask, n):
+    """Posición del bit activo número n (desde 0) de ``mask``, por búsqueda binaria."""
+    lo, hi = 0, mask.bit_length()
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if (mask & ((1 << mid) - 1)).bit_count() > n:
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo - 1
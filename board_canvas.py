@@ -0,0 +1,246 @@
+"""
+Renderizador del tablero sobre un único tk.Canvas.
+
+Sustituye la cuadrícula de tk.Button de VirusGameGUI: cada celda es un
+rectángulo del canvas (y un emoji cuando el zoom lo permite). El canvas se
+suscribe a los cambios de celda de la partida y solo redibuja las celdas que
+cambiaron; las actualizaciones se agrupan en una por ciclo del bucle de eventos.
+Opcionalmente sombrea las celdas libres amenazadas según el mapa de distancias
+de GameLogic (a cuántas propagaciones está el virus); solo se vuelven a
+sombrear las celdas cuya distancia cambió según cada ChangeBatch. Admite zoom
+y desplazamiento para tableros mucho mayores que la ventana.
+
+Clases:
+    BoardCanvas: Canvas con barras de desplazamiento que dibuja una partida.
+"""
+
+import tkinter as tk
+
+from game_logic import UNREACHABLE
+
+COLORS = {0: "#90EE90", 1: "#FF6961", 2: "#A9A9A9"}
+GLYPHS = {0: "🌿", 1: "🦠", 2: "🧱"}
+OUTLINES = {0: "#5E9E5E", 1: "#B04A44", 2: "#4F4F4F"}
+# Color de las celdas libres a distancia 1, 2, 3... del virus.
+THREAT_COLORS = ["#FFB347", "#FFCF80", "#F3E3A0", "#C8EBA0"]
+
+
+class BoardCanvas:
+    """
+    Dibuja el tablero de una partida en un canvas desplazable.
+
+    Args:
+        master (tk.Widget): Contenedor donde colocar el canvas
+        on_click (callable): Función (i, j) llamada al pulsar una celda
+        cell_size (int): Tamaño inicial de cada celda en píxeles
+        max_view (int): Tamaño máximo del área visible en píxeles
+    """
+
+    MIN_CELL = 4
+    MAX_CELL = 96
+    GLYPH_MIN_CELL = 24
+
+    def __init__(self, master, on_click, cell_size=40, max_view=640):
+        self.on_click = on_click
+        self.default_cell = cell_size
+        self.cell_size = cell_size
+        self.max_view = max_view
+        self.game = None
+        self._rects = []
+        self._glyphs = []
+        self._fills = []
+        self._dirty = set()
+        self._full_redraw = False
+        self._reshade_cells = set()
+        self._reshade_all = False
+        self._pending = None
+        self.show_threat = False
+
+        self.frame = tk.Frame(master)
+        self.canvas = tk.Canvas(self.frame, highlightthickness=0, bg="white")
+        self.xscroll = tk.Scrollbar(self.frame, orient="horizontal", command=self.canvas.xview)
+        self.yscroll = tk.Scrollbar(self.frame, orient="vertical", command=self.canvas.yview)
+        self.canvas.configure(xscrollcommand=self.xscroll.set, yscrollcommand=self.yscroll.set)
+        self.canvas.grid(row=0, column=0, sticky="nsew")
+        self.yscroll.grid(row=0, column=1, sticky="ns")
+        self.xscroll.grid(row=1, column=0, sticky="ew")
+        self.frame.rowconfigure(0, weight=1)
+        self.frame.columnconfigure(0, weight=1)
+
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.canvas.bind("<MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Shift-MouseWheel>", self._on_wheel)
+        self.canvas.bind("<Control-MouseWheel>", self._on_wheel)
+        for button in ("<Button-4>", "<Button-5>", "<Shift-Button-4>", "<Shift-Button-5>",
+                       "<Control-Button-4>", "<Control-Button-5>"):
+            self.canvas.bind(button, self._on_wheel)
+        self.canvas.bind("<Enter>", lambda e: self.canvas.focus_set())
+        self.canvas.bind("<plus>", lambda e: self.zoom(1.25))
+        self.canvas.bind("<KP_Add>", lambda e: self.zoom(1.25))
+        self.canvas.bind("<minus>", lambda e: self.zoom(0.8))
+        self.canvas.bind("<KP_Subtract>", lambda e: self.zoom(0.8))
+
+    def grid(self, **kwargs):
+        self.frame.grid(**kwargs)
+
+    def set_game(self, game):
+        """Cambia la partida mostrada, ajusta el zoom para que quepa y la dibuja completa."""
+        if self.game is None or game.size != self.game.size:
+            fit = self.max_view // max(game.size, 1)
+            self.cell_size = max(self.MIN_CELL, min(self.default_cell, fit))
+        if self.game is not game:
+            if self.game is not None:
+                self.game.unsubscribe(self._on_changes)
+            game.subscribe(self._on_changes)
+        self.game = game
+        self._redraw_all()
+
+    def mark(self, i, j, color="#FFD700"):
+        """Resalta la celda (i, j) (por ejemplo, una pista) hasta el próximo cambio del tablero."""
+        self.canvas.delete("mark")
+        cs = self.cell_size
+        self.canvas.create_rectangle(j * cs + 2, i * cs + 2, (j + 1) * cs - 2, (i + 1) * cs - 2,
+                                     outline=color, width=3, tags="mark")
+        extent = self.game.size * cs
+        view = min(extent, self.max_view)
+        if extent > view:
+            self.canvas.xview_moveto(max(0, (j * cs - view / 2) / extent))
+            self.canvas.yview_moveto(max(0, (i * cs - view / 2) / extent))
+
+    def set_threat(self, enabled):
+        """Activa o desactiva el sombreado de celdas amenazadas."""
+        self.show_threat = enabled
+        self._redraw_all()
+
+    def _fill(self, k, cell, distance):
+        if distance is not None and cell == 0 and 0 < distance[k] <= len(THREAT_COLORS):
+            return THREAT_COLORS[distance[k] - 1]
+        return COLORS[cell]
+
+    def _on_changes(self, changes):
+        """Suscriptor de la partida: anota las celdas cambiadas y programa el redibujado."""
+        if self._full_redraw or len(self._dirty) + len(changes) > len(self._rects) // 2:
+            # Con medio tablero cambiado (nuevo nivel, carga) sale más barato redibujar todo.
+            self._full_redraw = True
+            self._dirty.clear()
+        else:
+            self._dirty.update((c.i, c.j) for c in changes)
+        distance_changed = getattr(changes, "distance_changed", None)
+        if distance_changed is None:
+            self._reshade_all = True
+        elif not self._reshade_all:
+            self._reshade_cells.update(distance_changed)
+        self.canvas.delete("mark")
+        self.refresh()
+
+    def refresh(self):
+        """Programa el redibujado de las celdas cambiadas para el próximo ciclo ocioso."""
+        if self._pending is None:
+            self._pending = self.canvas.after_idle(self._flush)
+
+    def _flush(self):
+        self._pending = None
+        if self.game is None:
+            return
+        if self._full_redraw or len(self._rects) != self.game.size * self.game.size:
+            self._redraw_all()
+            return
+        dirty, self._dirty = self._dirty, set()
+        for i, j in dirty:
+            self._draw_cell(i, j)
+        cells, self._reshade_cells = self._reshade_cells, set()
+        reshade_all, self._reshade_all = self._reshade_all, False
+        if self.show_threat:
+            self._reshade(None if reshade_all else cells)
+
+    def _reshade(self, cells=None):
+        """
+        Actualiza los rectángulos cuyo sombreado cambió con el mapa de distancias.
+
+        Args:
+            cells (set): Celdas planas cuya distancia cambió (None = todo el mapa)
+        """
+        distance = self.game.distance_map()
+        fills = self._fills
+        for k in range(len(distance)) if cells is None else cells:
+            d = distance[k]
+            # Las celdas que cambiaron de estado ya se redibujaron; aquí solo quedan
+            # las libres, alcanzables (d > 0) o no.
+            if d > 0 or d == UNREACHABLE:
+                fill = THREAT_COLORS[d - 1] if 0 < d <= len(THREAT_COLORS) else COLORS[0]
+                if fill != fills[k]:
+                    fills[k] = fill
+                    self.canvas.itemconfigure(self._rects[k], fill=fill)
+
+    def _redraw_all(self):
+        self.canvas.delete("all")
+        self._rects = []
+        self._glyphs = []
+        self._fills = []
+        self._dirty = set()
+        self._full_redraw = False
+        self._reshade_cells = set()
+        self._reshade_all = False
+        if self.game is None:
+            return
+        size = self.game.size
+        cs = self.cell_size
+        font = ("TkDefaultFont", max(cs // 3, 6))
+        show_glyphs = cs >= self.GLYPH_MIN_CELL
+        board = self.game.board
+        distance = self.game.distance_map() if self.show_threat else None
+        for i in range(size):
+            row = board[i]
+            for j in range(size):
+                cell = row[j]
+                x, y = j * cs, i * cs
+                fill = self._fill(i * size + j, cell, distance)
+                self._fills.append(fill)
+                self._rects.append(self.canvas.create_rectangle(
+                    x, y, x + cs, y + cs, fill=fill, outline=OUTLINES[cell]))
+                if show_glyphs:
+                    self._glyphs.append(self.canvas.create_text(
+                        x + cs / 2, y + cs / 2, text=GLYPHS[cell], font=font))
+        extent = size * cs
+        self.canvas.configure(scrollregion=(0, 0, extent, extent),
+                              width=min(extent, self.max_view), height=min(extent, self.max_view))
+
+    def _draw_cell(self, i, j):
+        k = i * self.game.size + j
+        cell = self.game.board[i][j]
+        distance = self.game.distance_map() if self.show_threat else None
+        self._fills[k] = self._fill(k, cell, distance)
+        self.canvas.itemconfigure(self._rects[k], fill=self._fills[k], outline=OUTLINES[cell])
+        if self._glyphs:
+            self.canvas.itemconfigure(self._glyphs[k], text=GLYPHS[cell])
+
+    def zoom(self, factor):
+        """Cambia el tamaño de celda manteniendo el límite MIN_CELL..MAX_CELL."""
+        new_size = int(min(max(self.cell_size * factor, self.MIN_CELL), self.MAX_CELL))
+        if new_size != self.cell_size:
+            self.cell_size = new_size
+            self._redraw_all()
+
+    def cell_at(self, x, y):
+        """Convierte coordenadas del widget en la celda (i, j), o None si está fuera."""
+        if self.game is None:
+            return None
+        i = int(self.canvas.canvasy(y) // self.cell_size)
+        j = int(self.canvas.canvasx(x) // self.cell_size)
+        if 0 <= i < self.game.size and 0 <= j < self.game.size:
+            return i, j
+        return None
+
+    def _on_click(self, event):
+        cell = self.cell_at(event.x, event.y)
+        if cell is not None:
+            self.on_click(*cell)
+
+    def _on_wheel(self, event):
+        up = event.num == 4 or getattr(event, "delta", 0) > 0
+        if event.state & 0x0004:  # Control: zoom
+            self.zoom(1.25 if up else 0.8)
+        elif event.state & 0x0001:  # Shift: desplazamiento horizontal
+            self.canvas.xview_scroll(-1 if up else 1, "units")
+        else:
+            self.canvas.yview_scroll(-1 if up else 1, "units")
@@ -0,0 +1,306 @@
+"""
+Módulo board_codec.py
+
+Formato empaquetado y versionado para guardar partidas. Reemplaza la
+codificación de cada fila como un número en base 3, cuyo coste crece de forma
+cuadrática con el ancho de la fila.
+
+Formato (versión 2):
+    cabecera (12 bytes, big endian):
+        magic "VGS", versión (1 byte), tamaño (2 bytes), nivel (1 byte),
+        barreras restantes (4 bytes), indicadores (1 byte: bit 0
+        barrier_placed, bits 1-7 max_level; 0 = no guardado, se usa el
+        valor por defecto de la partida)
+    tablero:
+        cada fila ocupa ceil(size / 5) bytes; cada byte guarda 5 celdas
+        (0 libre, 1 virus, 2 barrera) como dígitos en base 3, la primera celda
+        en el dígito más significativo.
+
+Todas las filas tienen el mismo ancho en disco, así que la fila i empieza en
+HEADER.size + i * row_stride(size). El empaquetado y desempaquetado se hacen
+en bloque con operaciones sobre bytes y enteros grandes, en tiempo lineal.
+
+Formato por teselas (versión 3), para tableros dispersos (sparse_logic):
+    la misma cabecera con versión 3, seguida de TILES (lado de tesela y
+    número de teselas, 6 bytes) y de cada tesela no vacía: su fila y columna
+    de tesela (TILE_ID, 4 bytes) y sus lado x lado celdas empaquetadas como
+    filas de ancho lado. Las teselas que no aparecen están libres, así que el
+    archivo crece con la región ocupada y no con el área del tablero.
+
+Los archivos antiguos (sin magic) se siguen leyendo desde FileManager y
+FileHandler con su decodificador original.
+
+Funciones:
+    pack_rows: Empaqueta filas de celdas en bytes.
+    unpack_rows: Desempaqueta bytes en filas de celdas.
+    encode_game: Codifica una partida completa (cabecera + tablero).
+    read_header: Lee la cabecera de una partida empaquetada.
+    decode_game: Reconstruye una partida a partir de los bytes guardados.
+    encode_tiled: Codifica una partida dispersa por teselas.
+    unpack_tiles: Lee las teselas de una partida guardada por teselas.
+"""
+
+import struct
+from collections import namedtuple
+
+from engines import DEFAULT_ENGINE, get_engine
+
+MAGIC = b"VGS"
+VERSION = 2
+TILED_VERSION = 3
+HEADER = struct.Struct(">3sBHBIB")
+TILES = struct.Struct(">HI")
+TILE_ID = struct.Struct(">HH")
+TRITS_PER_BYTE = 5
+FLAG_BARRIER_PLACED = 0x01
+MAX_LEVEL_SHIFT = 1
+MAX_STORED_LEVEL = 0x7F
+# Tamaño máximo de tablero que cabe en la cabecera (campo de 2 bytes).
+MAX_SIZE = 0xFFFF
+
+_WEIGHTS = (81, 27, 9, 3, 1)
+_VALID_CELLS = b"\x00\x01\x02"
+# _DIGITS[k] traduce un byte empaquetado a su dígito k en base 3.
+_DIGITS = [bytes((b // w) % 3 if b < 243 else 255 for b in range(256)) for w in _WEIGHTS]
+
+SaveHeader = namedtuple("SaveHeader", "version size level barriers barrier_placed max_level")
+
+
+def pack_flags(game):
+    """
+    Byte de indicadores de la cabecera: barrier_placed y max_level.
+
+    Args:
+        game: Partida o copia con barrier_placed y max_level
+
+    Returns:
+        int: Valor del byte de indicadores
+    """
+    max_level = game.max_level
+    if not 1 <= max_level <= MAX_STORED_LEVEL:
+        raise ValueError(f"max_level fuera de rango (1 a {MAX_STORED_LEVEL}): {max_level}")
+    return (FLAG_BARRIER_PLACED if game.barrier_placed else 0) | (max_level << MAX_LEVEL_SHIFT)
+
+
+def row_stride(size):
+    """Bytes que ocupa una fila empaquetada."""
+    return -(-size // TRITS_PER_BYTE)
+
+
+def pack_rows(rows, size):
+    """
+    Empaqueta filas de celdas (valores 0, 1 o 2) a 5 celdas por byte.
+
+    Args:
+        rows (iterable): Filas del tablero (listas, bytes o vistas de fila)
+        size (int): Ancho de cada fila
+
+    Returns:
+        bytes: Filas empaquetadas, row_stride(size) bytes por fila
+    """
+    padding = bytes(row_stride(size) * TRITS_PER_BYTE - size)
+    digits = b"".join(bytes(row) + padding for row in rows)
+    if digits.translate(None, _VALID_CELLS):
+        raise ValueError("el tablero contiene valores distintos de 0, 1 y 2")
+    length = len(digits) // TRITS_PER_BYTE
+    # Cada byte de los enteros vale como mucho 2, así que la suma ponderada
+    # (<= 242) nunca acarrea al byte vecino.
+    packed = 0
+    for k, weight in enumerate(_WEIGHTS):
+        packed += int.from_bytes(digits[k::TRITS_PER_BYTE], "big") * weight
+    return packed.to_bytes(length, "big")
+
+
+def unpack_rows(data, size):
+    """
+    Desempaqueta filas guardadas con pack_rows.
+
+    Args:
+        data (bytes): Bytes empaquetados (row_stride(size) por fila)
+        size (int): Ancho de cada fila
+
+    Returns:
+        list: Una cadena de bytes con los valores 0/1/2 por cada fila
+    """
+    data = bytes(data)
+    width = row_stride(size) * TRITS_PER_BYTE
+    digits = bytearray(len(data) * TRITS_PER_BYTE)
+    for k, table in enumerate(_DIGITS):
+        digits[k::TRITS_PER_BYTE] = data.translate(table)
+    if 255 in digits:
+        raise ValueError("byte empaquetado fuera de rango")
+    return [bytes(digits[start:start + size]) for start in range(0, len(digits), width)]
+
+
+def encode_game(game):
+    """
+    Codifica una partida en el formato empaquetado.
+
+    Args:
+        game (GameLogic): Partida a guardar (cualquier motor)
+
+    Las partidas por teselas (con atributo ``tile``, como SparseGameLogic)
+    se guardan con encode_tiled.
+
+    Returns:
+        bytes: Cabecera seguida del tablero empaquetado
+    """
+    if getattr(game, "tile", None):
+        return encode_tiled(game)
+    header = HEADER.pack(MAGIC, VERSION, game.size, game.level, game.barriers_remaining, pack_flags(game))
+    return header + pack_rows((game.row_bytes(i) for i in range(game.size)), game.size)
+
+
+def read_header(data):
+    """
+    Lee la cabecera de una partida empaquetada.
+
+    Args:
+        data (bytes): Al menos los primeros HEADER.size bytes del archivo
+
+    Returns:
+        SaveHeader | None: La cabecera, o None si los datos no usan este formato
+    """
+    if len(data) < HEADER.size:
+        return None
+    magic, version, size, level, barriers, flags = HEADER.unpack_from(data)
+    if magic != MAGIC or version not in (VERSION, TILED_VERSION):
+        return None
+    return SaveHeader(version, size, level, barriers, bool(flags & FLAG_BARRIER_PLACED),
+                      flags >> MAX_LEVEL_SHIFT or None)
+
+
+def is_packed(data):
+    """Indica si ``data`` es una partida completa en el formato empaquetado."""
+    header = read_header(data)
+    return (header is not None and header.version == VERSION
+            and len(data) == HEADER.size + header.size * row_stride(header.size))
+
+
+def is_tiled(data):
+    """Indica si ``data`` empieza como una partida en el formato por teselas."""
+    header = read_header(data)
+    return header is not None and header.version == TILED_VERSION and len(data) >= HEADER.size + TILES.size
+
+
+def decode_game(data, engine=DEFAULT_ENGINE):
+    """
+    Reconstruye una partida guardada con encode_game.
+
+    Args:
+        data (bytes): Contenido completo del archivo
+        engine (str): Motor de tablero con el que crear la partida; con None,
+            "sparse" para las partidas por teselas y DEFAULT_ENGINE para el resto
+
+    Returns:
+        GameLogic: Partida restaurada
+    """
+    if engine is None:
+        engine = "sparse" if is_tiled(data) else DEFAULT_ENGINE
+    if is_tiled(data):
+        return decode_tiled(data, engine)
+    if not is_packed(data):
+        raise ValueError("los datos no son una partida empaquetada válida")
+    header = read_header(data)
+    game = get_engine(engine)(header.size, initialize=False)
+    game.level = header.level
+    game.barriers_remaining = header.barriers
+    game.barrier_placed = header.barrier_placed
+    if header.max_level:
+        game.max_level = header.max_level
+    game.load_rows(unpack_rows(memoryview(data)[HEADER.size:], header.size))
+    return game
+
+
+def encode_tiled(game):
+    """
+    Codifica una partida en el formato por teselas.
+
+    Args:
+        game: Partida con ``tile`` y ``stored_tiles()`` (SparseGameLogic o una copia)
+
+    Returns:
+        bytes: Cabecera, TILES y las teselas no vacías
+    """
+    tile = game.tile
+    tiles = list(game.stored_tiles())
+    parts = [HEADER.pack(MAGIC, TILED_VERSION, game.size, game.level, game.barriers_remaining,
+                         pack_flags(game)),
+             TILES.pack(tile, len(tiles))]
+    for ti, tj, cells in tiles:
+        parts.append(TILE_ID.pack(ti, tj))
+        parts.append(pack_rows((cells[r * tile:(r + 1) * tile] for r in range(tile)), tile))
+    return b"".join(parts)
+
+
+def unpack_tiles(data):
+    """
+    Lee una partida guardada con encode_tiled.
+
+    Args:
+        data (bytes): Contenido completo del archivo
+
+    Returns:
+        tuple: (SaveHeader, lado de tesela, dict (fila, columna de tesela) -> bytes)
+    """
+    if not is_tiled(data):
+        raise ValueError("los datos no son una partida por teselas válida")
+    header = read_header(data)
+    tile, count = TILES.unpack_from(data, HEADER.size)
+    if not tile:
+        raise ValueError("lado de tesela nulo")
+    stride = row_stride(tile) * tile
+    pos = HEADER.size + TILES.size
+    if len(data) != pos + count * (TILE_ID.size + stride):
+        raise ValueError("archivo por teselas truncado")
+    tiles = {}
+    for _ in range(count):
+        ti, tj = TILE_ID.unpack_from(data, pos)
+        pos += TILE_ID.size
+        tiles[(ti, tj)] = b"".join(unpack_rows(memoryview(data)[pos:pos + stride], tile))
+        pos += stride
+    return header, tile, tiles
+
+
+def tiles_to_rows(size, tile, tiles):
+    """Convierte teselas de unpack_tiles en filas densas (para motores no dispersos)."""
+    rows = [bytearray(size) for _ in range(size)]
+    for (ti, tj), cells in tiles.items():
+        width = min(tile, size - tj * tile)
+        for r in range(min(tile, size - ti * tile)):
+            rows[ti * tile + r][tj * tile:tj * tile + width] = cells[r * tile:r * tile + width]
+    return rows
+
+
+def decode_tiled(data, engine=DEFAULT_ENGINE):
+    """
+    Reconstruye una partida guardada con encode_tiled.
+
+    Con un motor por teselas (que tenga load_tiles) las teselas se cargan
+    directamente; con el resto se reconstruyen las filas completas.
+
+    Args:
+        data (bytes): Contenido completo del archivo
+        engine (str): Motor de tablero con el que crear la partida
+
+    Returns:
+        GameLogic: Partida restaurada
+    """
+    header, tile, tiles = unpack_tiles(data)
+    cls = get_engine(engine)
+    if hasattr(cls, "load_tiles"):
+        game = cls(header.size, tile=tile, initialize=False)
+        if game.tile != tile:
+            raise ValueError("lado de tesela no válido para este tamaño")
+    else:
+        game = cls(header.size, initialize=False)
+    game.level = header.level
+    game.barriers_remaining = header.barriers
+    game.barrier_placed = header.barrier_placed
+    if header.max_level:
+        game.max_level = header.max_level
+    if hasattr(game, "load_tiles"):
+        game.load_tiles(tiles)
+    else:
+        game.load_rows(tiles_to_rows(header.size, tile, tiles))
+    return game
@@ -0,0 +1,296 @@
+"""
+Módulo cli.py
+
+Punto de entrada de línea de órdenes, sin interfaz gráfica. Cada orden carga
+la partida de un archivo de FileManager (``nombre.bin``), la modifica, la
+vuelve a guardar e imprime su estado en JSON, así que se puede jugar desde
+scripts sin pantalla.
+
+Para que el arranque sea rápido, al cargar el módulo solo se importan
+argparse, json, sys y engines; Tkinter, el solver, NumPy (motor "numpy") y
+el resto de módulos se importan dentro de las órdenes que los usan.
+benchmark.py --startup mide el tiempo de arranque y comprueba que no se
+carga ninguno de esos módulos.
+
+Uso:
+    python cli.py new partida --size 10 --seed 1
+    python cli.py place partida 3 4
+    python cli.py turn partida --seed 7
+    python cli.py fast-forward partida --turns 20
+    python cli.py load partida --board
+    python cli.py save partida copia --engine sparse
+    python cli.py convert finales.vga partida.bin --index 3
+    python cli.py hint partida --time 1
+    python cli.py hint partida --seed 3 --nodes 500
+    python cli.py benchmark --sizes 5 50
+    python cli.py gui
+
+Funciones:
+    main: Ejecuta una orden y devuelve el código de salida.
+"""
+
+import argparse
+import json
+import sys
+
+from engines import DEFAULT_ENGINE, ENGINES
+
+FORMATS = ("packed", "tiled")
+# Simulaciones de "hint" con --seed y sin --nodes.
+HINT_NODES = 2000
+ENGINE_HELP = (f"Motor de tablero (por defecto, \"sparse\" para las partidas guardadas por teselas"
+               f" y {DEFAULT_ENGINE!r} para el resto)")
+
+
+class CommandError(Exception):
+    """Error de una orden; se muestra sin traza y la salida es 1."""
+
+
+def _base(name):
+    """Nombre base de FileManager: se admite con o sin la extensión .bin."""
+    return name[:-4] if name.endswith(".bin") else name
+
+
+def _describe(game, board=False):
+    won = game.check_win()
+    data = {
+        "size": game.size,
+        "level": game.level,
+        "max_level": game.max_level,
+        "barriers_remaining": game.barriers_remaining,
+        "max_barriers": game.max_barriers(),
+        "barrier_placed": game.barrier_placed,
+        "free_cells": game.free_cells(),
+        "contained": won,
+        "lost": game.barriers_remaining <= 0 and not won,
+    }
+    if board:
+        data["board"] = ["".join(map(str, game.row_bytes(i))) for i in range(game.size)]
+    return data
+
+
+def _print(data):
+    print(json.dumps(data, indent=2))
+
+
+def _load(args):
+    from file_manager import FileManager
+    game = FileManager.load_game(_base(args.name), args.engine)
+    if game is None:
+        raise CommandError(f"No se pudo cargar {args.name}")
+    if getattr(args, "seed", None) is not None:
+        # El estado del generador no se guarda; con --seed la orden es reproducible.
+        game.rng.seed(args.seed)
+    return game
+
+
+def _save(game, name):
+    from file_manager import FileManager
+    if not FileManager.save_game(game, _base(name)):
+        raise CommandError(f"No se pudo guardar {name}")
+
+
+def cmd_new(args):
+    from board_codec import MAX_STORED_LEVEL
+    from engines import create_game
+    if not 1 <= args.max_level <= MAX_STORED_LEVEL:
+        raise CommandError(f"--max-level debe estar entre 1 y {MAX_STORED_LEVEL}")
+    game = create_game(args.size, args.engine or DEFAULT_ENGINE, seed=args.seed)
+    # Se guarda en la cabecera del archivo, así que lo respetan las órdenes siguientes.
+    game.max_level = args.max_level
+    _save(game, args.name)
+    _print(_describe(game, args.board))
+
+
+def cmd_load(args):
+    _print(_describe(_load(args), args.board))
+
+
+def cmd_save(args):
+    _save(_load(args), args.dest)
+    _print({"saved": _base(args.dest) + ".bin"})
+
+
+def cmd_place(args):
+    game = _load(args)
+    if not (0 <= args.i < game.size and 0 <= args.j < game.size):
+        raise CommandError("Celda fuera del tablero")
+    if game.barrier_placed:
+        raise CommandError("Solo 1 barrera por turno")
+    if not game.place_barrier(args.i, args.j):
+        raise CommandError("Sin barreras disponibles" if game.barriers_remaining <= 0
+                           else "Ubicación inválida")
+    _save(game, args.name)
+    _print(_describe(game, args.board))
+
+
+def cmd_turn(args):
+    # Mismas reglas que VirusGameGUI.next_turn.
+    game = _load(args)
+    game.barrier_placed = False
+    if game.check_win():
+        event = "level" if game.advance_level() else "won"
+    else:
+        event = "spread" if game.spread_virus() else "idle"
+    _save(game, args.name)
+    _print({"event": event, **_describe(game, args.board)})
+
+
+def cmd_fast_forward(args):
+    game = _load(args)
+    infected = game.fast_forward(args.turns)
+    _save(game, args.name)
+    _print({"infected": infected, **_describe(game, args.board)})
+
+
+def cmd_hint(args):
+    from solver import solve
+    game = _load(args)
+    nodes = args.nodes
+    if nodes is None and args.seed is not None:
+        nodes = HINT_NODES
+    # Con un número de simulaciones y sin límite de tiempo, la misma semilla da la misma pista.
+    result = solve(game, time_limit=None if nodes is not None else args.time,
+                   max_nodes=nodes, seed=args.seed)
+    _print({"move": result.move, "win_probability": result.win_probability,
+            "playouts": result.playouts})
+
+
+def _read_source(path, args):
+    """Carga una partida de un .bin, .vsc, archivo .vga o diario .vjl."""
+    import board_codec
+    if path.endswith(".vga"):
+        from game_archive import GameArchive
+        with GameArchive(path) as archive:
+            if not 0 <= args.index < len(archive):
+                raise CommandError(f"{path} tiene {len(archive)} partidas")
+            return archive.game(args.index, args.engine)
+    if path.endswith(".vjl"):
+        from replay_journal import JournalReader
+        with JournalReader(path) as reader:
+            return reader.seek(reader.moves if args.move is None else args.move, args.engine)
+    if path.endswith(".vsc"):
+        with open(path, "rb") as f:
+            data = f.read()
+        if board_codec.is_packed(data) or board_codec.is_tiled(data):
+            return board_codec.decode_game(data, args.engine)
+        from engines import create_game
+        from file_handler import FileHandler
+        board, level, _ = FileHandler().load_game(path)
+        if board is None:
+            raise CommandError(f"No se pudo cargar {path}")
+        game = create_game(len(board), args.engine or DEFAULT_ENGINE)
+        game.level = level
+        game.barriers_remaining = game.max_barriers()
+        game.load_rows(board)
+        return game
+    args.name = path
+    return _load(args)
+
+
+def cmd_convert(args):
+    game = _read_source(args.source, args)
+    if args.format == "tiled" and not getattr(game, "tile", None):
+        import board_codec
+        game = board_codec.decode_game(board_codec.encode_game(game), "sparse")
+    elif args.format == "packed" and getattr(game, "tile", None):
+        import board_codec
+        game = board_codec.decode_game(board_codec.encode_game(game), DEFAULT_ENGINE)
+    dest = args.dest
+    if dest.endswith(".vga"):
+        from game_archive import GameArchive
+        with GameArchive(dest, "a") as archive:
+            index = archive.append(game)
+        _print({"archive": dest, "index": index})
+    elif dest.endswith(".vsc"):
+        from file_handler import FileHandler
+        if not FileHandler().save_game(game, dest):
+            raise CommandError(f"No se pudo guardar {dest}")
+        _print({"saved": dest})
+    else:
+        _save(game, dest)
+        _print({"saved": _base(dest) + ".bin"})
+
+
+def cmd_benchmark(args):
+    import benchmark
+    return benchmark.main(args.rest)
+
+
+def cmd_gui(args):
+    import tkinter as tk
+    from gui import VirusGameGUI
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        raise CommandError(f"No se pudo abrir la ventana: {e}")
+    VirusGameGUI(root)
+    root.mainloop()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="Juego de virus sin interfaz gráfica")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def game_command(name, func, help_text, seeded=False):
+        sub = commands.add_parser(name, help=help_text)
+        sub.add_argument("name", help="Partida (nombre base del archivo .bin)")
+        sub.add_argument("--engine", choices=sorted(ENGINES), default=None, help=ENGINE_HELP)
+        sub.add_argument("--board", action="store_true", help="Incluir el tablero en la salida")
+        if seeded:
+            sub.add_argument("--seed", type=int, default=None, help="Semilla del virus para esta orden")
+        sub.set_defaults(func=func)
+        return sub
+
+    sub = game_command("new", cmd_new, "Crear una partida nueva", seeded=True)
+    sub.add_argument("--size", type=int, default=5)
+    sub.add_argument("--max-level", type=int, default=3)
+
+    game_command("load", cmd_load, "Mostrar el estado de una partida")
+    sub = game_command("save", cmd_save, "Guardar una copia (con --engine sparse, por teselas)")
+    sub.add_argument("dest", help="Nombre base del archivo de destino")
+    sub = game_command("place", cmd_place, "Colocar la barrera del turno")
+    sub.add_argument("i", type=int)
+    sub.add_argument("j", type=int)
+    game_command("turn", cmd_turn, "Terminar el turno: propagar el virus o avanzar de nivel", seeded=True)
+    sub = game_command("fast-forward", cmd_fast_forward, "Avanzar varios turnos del virus", seeded=True)
+    sub.add_argument("--turns", type=int, default=None, help="Turnos (por defecto, hasta el final)")
+    sub = game_command("hint", cmd_hint, "Sugerir una barrera con el solver", seeded=True)
+    sub.add_argument("--time", type=float, default=1.0, help="Segundos de búsqueda (sin --seed ni --nodes)")
+    sub.add_argument("--nodes", type=int, default=None,
+                     help=f"Simulaciones en lugar de tiempo (con --seed, {HINT_NODES} por defecto)")
+
+    sub = commands.add_parser("convert", help="Convertir entre .bin, .vsc, .vga y .vjl")
+    sub.add_argument("source", help="Origen: .bin, .vsc, archivo .vga o diario .vjl")
+    sub.add_argument("dest", help="Destino: .bin, .vsc o archivo .vga (se añade al final)")
+    sub.add_argument("--engine", choices=sorted(ENGINES), default=None, help=ENGINE_HELP)
+    sub.add_argument("--index", type=int, default=0, help="Partida del archivo .vga de origen")
+    sub.add_argument("--move", type=int, default=None, help="Jugada del diario .vjl (por defecto, la última)")
+    sub.add_argument("--format", choices=FORMATS, default=None,
+                     help="Forzar el formato empaquetado o por teselas")
+    sub.set_defaults(func=cmd_convert)
+
+    sub = commands.add_parser("benchmark", help="Ejecutar benchmark.py con los argumentos dados")
+    sub.add_argument("rest", nargs=argparse.REMAINDER)
+    sub.set_defaults(func=cmd_benchmark)
+
+    sub = commands.add_parser("gui", help="Abrir la interfaz gráfica")
+    sub.set_defaults(func=cmd_gui)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if argv[:1] == ["benchmark"]:
+        # Las opciones se pasan tal cual a benchmark.main (argparse no las deja en REMAINDER).
+        return cmd_benchmark(argparse.Namespace(rest=argv[1:]))
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args) or 0
+    except CommandError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
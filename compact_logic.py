@@ -0,0 +1,153 @@
+"""
+Módulo compact_logic.py
+
+Motor de GameLogic con el estado mínimo por partida, pensado para mantener
+decenas de miles de partidas vivas en un mismo proceso (por ejemplo, en el
+servidor o en simulaciones). El tablero es un único bytearray en orden de
+filas (un byte por celda) en lugar de una lista de listas de enteros, la
+instancia usa __slots__ (sin __dict__) y la frontera y las celdas activas
+guardan índices planos en lugar de tuplas.
+
+``board[i][j]`` sigue funcionando: ``board`` devuelve una vista ligera cuyas
+filas son memoryview sobre el bytearray, así que leer y escribir celdas no
+copia nada.
+
+Clases:
+    CompactGameLogic: GameLogic con el tablero en un bytearray plano.
+"""
+
+from game_logic import CAUSE_SPREAD, DIRECTIONS, GameLogic, _IndexedSet, distance_field
+
+
+class _CompactBoard:
+    """Vista ``board[i][j]`` sobre el bytearray de una CompactGameLogic."""
+
+    __slots__ = ("cells", "size")
+
+    def __init__(self, cells, size):
+        self.cells = cells
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.size
+        if not 0 <= i < self.size:
+            raise IndexError("fila fuera del tablero")
+        return memoryview(self.cells)[i * self.size:(i + 1) * self.size]
+
+    def __iter__(self):
+        view = memoryview(self.cells)
+        for start in range(0, self.size * self.size, self.size):
+            yield view[start:start + self.size]
+
+    def __eq__(self, other):
+        return [list(row) for row in self] == [list(row) for row in other]
+
+    def __repr__(self):
+        return repr([list(row) for row in self])
+
+
+class CompactGameLogic(GameLogic):
+    """
+    GameLogic con el tablero en un bytearray plano de size * size bytes.
+
+    La frontera y las celdas activas guardan el índice plano i * size + j;
+    los métodos públicos siguen devolviendo coordenadas (i, j).
+    """
+
+    __slots__ = ("_cells",)
+
+    @property
+    def board(self):
+        return _CompactBoard(self._cells, self.size)
+
+    @board.setter
+    def board(self, rows):
+        self._cells = bytearray(b"".join(bytes(row) for row in rows))
+
+    def _reset_board(self):
+        self._cells = bytearray(self.size * self.size)
+        for k in self.rng.sample(range(self.size * self.size), self.level):
+            self._cells[k] = 1
+
+    def cell(self, i, j):
+        return self._cells[i * self.size + j]
+
+    def row_bytes(self, i):
+        return bytes(self._cells[i * self.size:(i + 1) * self.size])
+
+    def _replace_rows(self, rows):
+        self._cells = bytearray(b"".join(bytes(row) for row in rows))
+
+    def _adjacent(self, k):
+        size = self.size
+        j = k % size
+        if k >= size:
+            yield k - size
+        if k + size < size * size:
+            yield k + size
+        if j > 0:
+            yield k - 1
+        if j < size - 1:
+            yield k + 1
+
+    def rebuild_frontier(self):
+        self._invalidate()
+        self._frontier = set()
+        self._active = _IndexedSet()
+        cells = self._cells
+        k = cells.find(1)
+        while k >= 0:
+            self._refresh_flat(k)
+            for w in self._adjacent(k):
+                self._refresh_flat(w)
+            k = cells.find(1, k + 1)
+
+    def _refresh_flat(self, k):
+        cells = self._cells
+        cell = cells[k]
+        target = 1 if cell == 0 else 0 if cell == 1 else None
+        touches = target is not None and any(cells[w] == target for w in self._adjacent(k))
+        if cell == 0 and touches:
+            self._frontier.add(k)
+        else:
+            self._frontier.discard(k)
+        if cell == 1 and touches:
+            self._active.add(k)
+        else:
+            self._active.discard(k)
+
+    def _refresh_cell(self, i, j):
+        self._refresh_flat(i * self.size + j)
+
+    def _write_cell(self, i, j, value):
+        k = i * self.size + j
+        self._cells[k] = value
+        self._refresh_flat(k)
+        for w in self._adjacent(k):
+            self._refresh_flat(w)
+
+    def spread_virus(self):
+        # Igual que GameLogic.spread_virus, con índices planos.
+        if not self._active:
+            return False
+        x, y = divmod(self._active.choice(self.rng), self.size)
+        for dx, dy in self.rng.sample(DIRECTIONS, 4):
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.size and 0 <= ny < self.size and self._cells[nx * self.size + ny] == 0:
+                self._set_cell(nx, ny, 1, CAUSE_SPREAD)
+                self._flush_changes()
+                return True
+        return False
+
+    def frontier_cells(self):
+        return {divmod(k, self.size) for k in self._frontier}
+
+    def free_cells(self):
+        return self._cells.count(0)
+
+    def _distance_field(self):
+        return distance_field(bytes(self._cells), self.size)
@@ -0,0 +1,54 @@
+"""
+Módulo engines.py
+
+Registro de motores de tablero disponibles para GameLogic. Cada motor expone
+la misma API pública; el de listas (game_logic.GameLogic) es la
+implementación de referencia. Los motores se importan solo cuando se piden,
+así que las dependencias opcionales (como NumPy) no se cargan si no se usan.
+
+Funciones:
+    get_engine: Devuelve la clase de un motor por nombre.
+    create_game: Crea una partida con el motor indicado.
+"""
+
+import importlib
+
+ENGINES = {
+    "list": ("game_logic", "GameLogic"),
+    "numpy": ("numpy_logic", "NumpyGameLogic"),
+    "bitboard": ("bitboard_logic", "BitboardGameLogic"),
+    "compact": ("compact_logic", "CompactGameLogic"),
+    "sparse": ("sparse_logic", "SparseGameLogic"),
+}
+
+DEFAULT_ENGINE = "list"
+
+
+def get_engine(name=DEFAULT_ENGINE):
+    """
+    Devuelve la clase que implementa un motor de tablero.
+
+    Args:
+        name (str): Nombre del motor registrado en ENGINES
+
+    Returns:
+        type: Subclase de GameLogic (o la propia GameLogic)
+    """
+    if name not in ENGINES:
+        raise ValueError(f"Motor desconocido: {name!r}")
+    module_name, class_name = ENGINES[name]
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+def create_game(size=5, engine=DEFAULT_ENGINE, **kwargs):
+    """
+    Crea una nueva partida con el motor indicado.
+
+    Args:
+        size (int): Tamaño del tablero
+        engine (str): Nombre del motor ("list", "numpy", "bitboard", "compact", "sparse", ...)
+
+    Returns:
+        GameLogic: Instancia del motor elegido
+    """
+    return get_engine(engine)(size, **kwargs)
@@ -3,6 +3,8 @@ Módulo para manejo de archivos binarios del juego.
 
 Implementa la codificación/decodificación del estado del juego
 para guardar y cargar partidas según el formato especificado.
+Las partidas nuevas usan el formato empaquetado de board_codec; las
+guardadas con el formato antiguo (filas en base 3) se siguen pudiendo cargar.
 
 Clases:
     FileHandler: Maneja operaciones de lectura/escritura de partidas.
@@ -13,6 +15,9 @@ Fecha: [Fecha]
 
 import os
 
+import board_codec
+from save_catalog import SaveCatalog
+
 class FileHandler:
     """
     Clase para manejar el guardado y carga de partidas en archivos binarios.
@@ -21,6 +26,7 @@ class FileHandler:
         save_game: Guarda el estado actual del juego en un archivo.
         load_game: Carga un juego desde un archivo guardado.
         list_saved_games: Lista todas las partidas guardadas.
+        saved_games_info: Lista las partidas con sus metadatos, con filtros y orden.
     """
     
     def __init__(self):
@@ -40,23 +46,8 @@ class FileHandler:
         """
         try:
             with open(filename, 'wb') as file:
-                # Escribir tamaño del tablero (2 bytes)
-                size = game_logic.size
-                file.write(size.to_bytes(2, byteorder='big'))
-                
-                # Escribir nivel actual (1 byte)
-                level = game_logic.level
-                file.write(level.to_bytes(1, byteorder='big'))
-                
-                # Escribir estado del tablero
-                for row in game_logic.board:
-                    base3_str = ''.join(str(cell) for cell in row)
-                    base3_num = int(base3_str, 3)
-                    
-                    hex_str = format(base3_num, 'x')
-                    if len(hex_str) % 2 != 0:
-                        hex_str = '0' + hex_str
-                    file.write(bytes.fromhex(hex_str))
+                # Cabecera y tablero en el formato empaquetado (5 celdas por byte)
+                file.write(board_codec.encode_game(game_logic))
             
             return True
         except Exception as e:
@@ -75,36 +66,55 @@ class FileHandler:
         """
         try:
             with open(filename, 'rb') as file:
-                # Leer tamaño del tablero (2 bytes)
-                size = int.from_bytes(file.read(2), byteorder='big')
-                
-                # Leer nivel actual (1 byte)
-                level = int.from_bytes(file.read(1), byteorder='big')
-                
-                # Leer y decodificar el tablero
-                board = [[0 for _ in range(size)] for _ in range(size)]
-                virus_positions = []
-                
-                for i in range(size):
-                    max_base3 = 3**size - 1
-                    max_hex_len = len(format(max_base3, 'x'))
-                    bytes_to_read = (max_hex_len + 1) // 2
-                    
-                    hex_data = file.read(bytes_to_read).hex()
-                    base3_num = int(hex_data, 16)
-                    base3_str = self._base3(base3_num, size)
-                    
-                    for j in range(size):
-                        cell = int(base3_str[j])
-                        board[i][j] = cell
-                        if cell == 1:
-                            virus_positions.append((i, j))
-                
-                return board, level, virus_positions
+                data = file.read()
+            
+            if board_codec.is_packed(data):
+                header = board_codec.read_header(data)
+                size, level = header.size, header.level
+                rows = board_codec.unpack_rows(data[board_codec.HEADER.size:], size)
+                board = [list(row) for row in rows]
+            elif board_codec.is_tiled(data):
+                header, tile, tiles = board_codec.unpack_tiles(data)
+                size, level = header.size, header.level
+                board = [list(row) for row in board_codec.tiles_to_rows(size, tile, tiles)]
+            else:
+                size, level, board = self._load_legacy(data)
+            
+            virus_positions = [(i, j) for i, row in enumerate(board)
+                               for j, cell in enumerate(row) if cell == 1]
+            return board, level, virus_positions
         except Exception as e:
             print(f"Error al cargar el juego: {e}")
             return None, None, None
     
+    def _load_legacy(self, data):
+        """
+        Decodifica el formato original (cada fila como un número en base 3).
+        
+        Args:
+            data (bytes): Contenido completo del archivo
+            
+        Returns:
+            tuple: (size, level, board)
+        """
+        # Leer tamaño del tablero (2 bytes) y nivel actual (1 byte)
+        size = int.from_bytes(data[0:2], byteorder='big')
+        level = data[2]
+        
+        max_base3 = 3**size - 1
+        max_hex_len = len(format(max_base3, 'x'))
+        bytes_to_read = (max_hex_len + 1) // 2
+        
+        board = []
+        offset = 3
+        for i in range(size):
+            hex_data = data[offset:offset + bytes_to_read].hex()
+            offset += bytes_to_read
+            base3_num = int(hex_data, 16)
+            base3_str = self._base3(base3_num, size)
+            board.append([int(digit) for digit in base3_str])
+        return size, level, board
+    
     def _base3(self, n, length):
         """
         Convierte un número a base3 con padding de ceros.
@@ -136,4 +146,21 @@ class FileHandler:
         for file in os.listdir('.'):
             if file.endswith('.vsc'):
                 games.append(file)
-        return games
\ No newline at end of file
+        return games
+    
+    def saved_games_info(self, directory='.', **filters):
+        """
+        Lista las partidas .vsc con tamaño, nivel y barreras leídos de su cabecera.
+        
+        Usa el índice de SaveCatalog, que solo vuelve a leer los archivos
+        modificados desde la última consulta.
+        
+        Args:
+            directory (str): Directorio donde buscar partidas
+            **filters: Filtros y orden aceptados por SaveCatalog.query
+            
+        Returns:
+            list: Diccionarios con los metadatos de cada partida
+        """
+        catalog = SaveCatalog(directory, extensions=('.vsc',))
+        return catalog.query(**filters)
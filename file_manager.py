@@ -11,73 +11,112 @@ permitiendo la persistencia del progreso del juego.
         filename (str): Nombre base del archivo (sin extensión).
     Retorna:
         bool: True si el guardado fue exitoso, False en caso de error.
-    El método serializa el tamaño del tablero, el nivel, las barreras restantes y el estado del tablero,
-    codificando cada fila como un número en base 3 y almacenándolo en formato binario.
+    El método serializa el tamaño del tablero, el nivel, las barreras restantes y el estado del tablero
+    en el formato empaquetado de board_codec (5 celdas por byte, filas de ancho fijo).
     """
 """
     Carga el estado de un juego previamente guardado desde un archivo binario.
     Parámetros:
         filename (str): Nombre base del archivo (sin extensión).
+        engine (str): Motor de tablero con el que se crea la partida (ver engines.py).
     Retorna:
         GameLogic | None: Instancia de GameLogic restaurada desde el archivo, o None si ocurre un error.
     El método deserializa el tamaño, nivel, barreras y el estado del tablero,
     reconstruyendo el objeto GameLogic a partir de los datos binarios almacenados.
+    Acepta el formato empaquetado, el formato por teselas y el formato antiguo de filas en base 3.
     """
-from game_logic import GameLogic
+import board_codec
+from engines import DEFAULT_ENGINE, get_engine
+from mapped_board import MappedBoard
+from replay_journal import DEFAULT_CHECKPOINT_EVERY, JOURNAL_EXT, JournalReader, ReplayJournal
 
 class FileManager:
     def save_game(game, filename):
         try:
             with open(f"{filename}.bin", "wb") as f:
-                f.write(struct.pack(">H", game.size))
-                f.write(struct.pack("B", game.level))
-                f.write(struct.pack("B", game.barriers_remaining))
-                
-                max_num = 3**game.size - 1
-                bytes_per_row = (max_num.bit_length() + 7) // 8
-                
-                for row in game.board:
-                    num = 0
-                    for i, val in enumerate(row):
-                        num += val * (3 ** (game.size - 1 - i))
-                    
-                    hex_num = format(num, 'X')
-                    hex_padded = hex_num.zfill(bytes_per_row * 2)
-                    
-                    if len(hex_padded) % 2 != 0:
-                        hex_padded = '0' + hex_padded
-                    
-                    f.write(bytes.fromhex(hex_padded))
+                f.write(board_codec.encode_game(game))
             return True
         except Exception as e:
             print(f"Error saving: {str(e)}")
             return False
     
-    def load_game(filename):
+    def load_game(filename, engine=DEFAULT_ENGINE):
         try:
             with open(f"{filename}.bin", "rb") as f:
-                size = struct.unpack(">H", f.read(2))[0]
-                level = struct.unpack("B", f.read(1))[0]
-                barriers = struct.unpack("B", f.read(1))[0]
-                
-                max_num = 3**size - 1
-                bytes_per_row = (max_num.bit_length() + 7) // 8
-                
-                game = GameLogic(size)
-                game.level = level
-                game.barriers_remaining = barriers
-                game.board = [[0]*size for _ in range(size)]
-                
-                for i in range(size):
-                    hex_bytes = f.read(bytes_per_row)
-                    hex_str = hex_bytes.hex().upper()
-                    num = int(hex_str, 16)
-                    
-                    for j in range(size-1, -1, -1):
-                        game.board[i][j] = num % 3
-                        num = num // 3
-                
-                return game
+                data = f.read()
+            if board_codec.is_packed(data) or board_codec.is_tiled(data):
+                return board_codec.decode_game(data, engine)
+            return FileManager._load_legacy(data, engine or DEFAULT_ENGINE)
         except Exception as e:
             print(f"Error loading: {str(e)}")
-            return None
\ No newline at end of file
+            return None
+    
+    def open_mapped(filename, writable=True):
+        """Abre una partida empaquetada como MappedBoard (lectura perezosa por filas)."""
+        return MappedBoard(f"{filename}.bin", writable=writable)
+    
+    def save_rows(game, filename, rows):
+        """
+        Escribe en su sitio solo las filas indicadas (y la cabecera) de una partida.
+        Devuelve False si el archivo no existe o no es una partida empaquetada
+        del mismo tamaño; en ese caso hay que guardar la partida completa.
+        """
+        try:
+            with MappedBoard(f"{filename}.bin") as board:
+                if board.size != game.size:
+                    raise ValueError("tamaño distinto")
+                for i in rows:
+                    board[i][:] = game.row_bytes(i)
+                board.level = game.level
+                board.barriers_remaining = game.barriers_remaining
+                board.barrier_placed = game.barrier_placed
+                board.max_level = game.max_level
+            return True
+        except (OSError, ValueError) as e:
+            print(f"Error saving rows: {str(e)}")
+            return False
+    
+    def open_journal(game, filename, checkpoint_every=DEFAULT_CHECKPOINT_EVERY):
+        """
+        Abre (o continúa) el diario de jugadas junto a la partida guardada.
+        Cada turno se añade al archivo como unos pocos bytes.
+        """
+        try:
+            return ReplayJournal(f"{filename}{JOURNAL_EXT}", game, checkpoint_every)
+        except Exception as e:
+            print(f"Error opening journal: {str(e)}")
+            return None
+    
+    def load_journal_move(filename, move, engine=DEFAULT_ENGINE):
+        """Reconstruye la partida tras la jugada move del diario, o None si ocurre un error."""
+        try:
+            with JournalReader(f"{filename}{JOURNAL_EXT}") as reader:
+                return reader.seek(move, engine)
+        except Exception as e:
+            print(f"Error loading journal: {str(e)}")
+            return None
+    
+    def _load_legacy(data, engine=DEFAULT_ENGINE):
+        # Formato original: cada fila es un número en base 3 de ancho fijo.
+        size, level, barriers = struct.unpack_from(">HBB", data)
+        
+        max_num = 3**size - 1
+        bytes_per_row = (max_num.bit_length() + 7) // 8
+        
+        game = get_engine(engine)(size, initialize=False)
+        game.level = level
+        game.barriers_remaining = barriers
+        rows = []
+        
+        offset = 4
+        for i in range(size):
+            num = int.from_bytes(data[offset:offset + bytes_per_row], "big")
+            offset += bytes_per_row
+            row = bytearray(size)
+            for j in range(size-1, -1, -1):
+                row[j] = num % 3
+                num = num // 3
+            rows.append(row)
+        
+        game.load_rows(rows)
+        return game
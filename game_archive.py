@@ -0,0 +1,312 @@
+"""
+Módulo game_archive.py
+
+Archivo de muchas partidas en un único fichero (``.vga``), pensado para los
+estados finales de las simulaciones por lotes. Cada partida se guarda en el
+formato de board_codec (el mismo contenido que un ``.bin`` de FileManager)
+comprimido con zlib, y un índice de posiciones al final del fichero permite
+leer la partida i sin recorrer las anteriores.
+
+Formato:
+    cabecera (12 bytes, big endian):
+        magic "VGA", versión (1 byte), posición del índice (8 bytes;
+        0 mientras el archivo está abierto para añadir)
+    registros:
+        longitud (4 bytes) y partida codificada con board_codec y comprimida
+    índice (al cerrar):
+        magic "VGX", número de partidas (8 bytes) y la posición de cada
+        registro (8 bytes cada una)
+
+Al añadir partidas a un archivo existente se descarta el índice y se vuelve
+a escribir al cerrar. Si el archivo no se cerró (por ejemplo, tras un corte),
+el índice se reconstruye recorriendo los registros y se ignora un registro
+incompleto al final.
+
+Clases:
+    GameArchive: Lectura y escritura de un archivo de partidas.
+
+Funciones:
+    compress_game: Codifica y comprime una partida como registro del archivo.
+"""
+
+import os
+import struct
+import sys
+import zlib
+from array import array
+
+import board_codec
+from engines import DEFAULT_ENGINE
+from file_manager import FileManager
+
+MAGIC = b"VGA"
+VERSION = 1
+ARCHIVE_EXT = ".vga"
+HEADER = struct.Struct(">3sBQ")
+RECORD = struct.Struct(">I")
+INDEX_MAGIC = b"VGX"
+INDEX = struct.Struct(">3sQ")
+DEFAULT_LEVEL = 6
+
+
+def compress_game(game, level=DEFAULT_LEVEL):
+    """
+    Codifica y comprime una partida para GameArchive.append_compressed.
+
+    Permite comprimir en los procesos de trabajo de una simulación y escribir
+    solo en el proceso principal.
+
+    Args:
+        game (GameLogic): Partida (cualquier motor)
+        level (int): Nivel de compresión de zlib
+
+    Returns:
+        bytes: Registro comprimido
+    """
+    return zlib.compress(board_codec.encode_game(game), level)
+
+
+def _offsets_to_bytes(offsets):
+    data = array("Q", offsets)
+    if sys.byteorder == "little":
+        data.byteswap()
+    return data.tobytes()
+
+
+def _offsets_from_bytes(data):
+    offsets = array("Q")
+    offsets.frombytes(data)
+    if sys.byteorder == "little":
+        offsets.byteswap()
+    return offsets
+
+
+class GameArchive:
+    """
+    Archivo de partidas con acceso aleatorio y escritura al final.
+
+    Uso:
+        with GameArchive("finales.vga", "w") as archive:
+            archive.append(game)
+        with GameArchive("finales.vga") as archive:
+            game = archive.game(10)
+            for game in archive.iter_games():
+                ...
+
+    Args:
+        path (str): Ruta del archivo
+        mode (str): "r" para leer, "w" para crear (o vaciar) y "a" para añadir
+        level (int): Nivel de compresión de zlib al añadir partidas
+    """
+
+    def __init__(self, path, mode="r", level=DEFAULT_LEVEL):
+        if mode not in ("r", "w", "a"):
+            raise ValueError(f"Modo desconocido: {mode!r}")
+        self.path = path
+        self.mode = mode
+        self.level = level
+        self.offsets = array("Q")
+        if mode == "w" or (mode == "a" and not os.path.exists(path)):
+            self.file = open(path, "w+b")
+            self.file.write(HEADER.pack(MAGIC, VERSION, 0))
+            self._end = HEADER.size
+            return
+        self.file = open(path, "rb" if mode == "r" else "r+b")
+        try:
+            self._end = self._read_index()
+            if mode == "a":
+                # El índice se reescribe al cerrar; hasta entonces vale 0.
+                self.file.truncate(self._end)
+                self.file.seek(0)
+                self.file.write(HEADER.pack(MAGIC, VERSION, 0))
+                self.file.flush()
+        except Exception:
+            self.file.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __iter__(self):
+        return self.iter_games()
+
+    def _read_index(self):
+        """Carga el índice (o lo reconstruye) y devuelve dónde termina el último registro."""
+        f = self.file
+        size = f.seek(0, os.SEEK_END)
+        f.seek(0)
+        head = f.read(HEADER.size)
+        if len(head) < HEADER.size:
+            raise ValueError(f"{self.path} no es un archivo de partidas")
+        magic, version, index_offset = HEADER.unpack(head)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} no es un archivo de partidas")
+        if index_offset:
+            f.seek(index_offset)
+            index_magic, count = INDEX.unpack(f.read(INDEX.size))
+            data = f.read(count * 8)
+            if index_magic != INDEX_MAGIC or len(data) != count * 8:
+                raise ValueError("índice dañado")
+            self.offsets = _offsets_from_bytes(data)
+            return index_offset
+        # Sin índice: se recorren los registros completos.
+        pos = HEADER.size
+        while pos + RECORD.size <= size:
+            f.seek(pos)
+            (length,) = RECORD.unpack(f.read(RECORD.size))
+            if pos + RECORD.size + length > size:
+                break
+            self.offsets.append(pos)
+            pos += RECORD.size + length
+        return pos
+
+    def _check_writable(self):
+        if self.mode == "r":
+            raise ValueError("archivo abierto solo para lectura")
+
+    def append_compressed(self, blob):
+        """
+        Añade un registro ya comprimido (ver compress_game).
+
+        Returns:
+            int: Índice de la partida añadida
+        """
+        self._check_writable()
+        self.file.seek(self._end)
+        self.file.write(RECORD.pack(len(blob)))
+        self.file.write(blob)
+        self.offsets.append(self._end)
+        self._end += RECORD.size + len(blob)
+        return len(self.offsets) - 1
+
+    def append_encoded(self, data):
+        """Añade una partida ya codificada con board_codec (el contenido de un .bin)."""
+        if not (board_codec.is_packed(data) or board_codec.is_tiled(data)):
+            raise ValueError("los datos no son una partida empaquetada válida")
+        return self.append_compressed(zlib.compress(bytes(data), self.level))
+
+    def append(self, game):
+        """
+        Añade una partida.
+
+        Args:
+            game (GameLogic): Partida (cualquier motor)
+
+        Returns:
+            int: Índice de la partida añadida
+        """
+        self._check_writable()
+        return self.append_compressed(compress_game(game, self.level))
+
+    def add_save(self, filename, engine=DEFAULT_ENGINE):
+        """
+        Añade una partida guardada con FileManager.
+
+        Los archivos empaquetados se copian tal cual; los del formato antiguo
+        se cargan y se vuelven a codificar.
+
+        Args:
+            filename (str): Nombre base del archivo (sin extensión)
+            engine (str): Motor con el que cargar los archivos antiguos
+
+        Returns:
+            int | None: Índice de la partida añadida, o None si no se pudo leer
+        """
+        try:
+            with open(f"{filename}.bin", "rb") as f:
+                data = f.read()
+        except OSError as e:
+            print(f"Error loading: {str(e)}")
+            return None
+        if board_codec.is_packed(data) or board_codec.is_tiled(data):
+            return self.append_encoded(data)
+        game = FileManager.load_game(filename, engine)
+        return None if game is None else self.append(game)
+
+    def encoded(self, index):
+        """
+        Devuelve la partida ``index`` en el formato de board_codec.
+
+        Returns:
+            bytes: El mismo contenido que tendría su archivo .bin
+        """
+        offset = self.offsets[index]
+        self.file.seek(offset)
+        (length,) = RECORD.unpack(self.file.read(RECORD.size))
+        try:
+            return zlib.decompress(self.file.read(length))
+        except zlib.error as e:
+            raise ValueError(f"registro {index} dañado: {e}")
+
+    def game(self, index, engine=DEFAULT_ENGINE):
+        """Reconstruye la partida ``index`` con el motor indicado."""
+        return board_codec.decode_game(self.encoded(index), engine)
+
+    def board(self, index):
+        """
+        Devuelve el tablero de la partida ``index`` sin crear una GameLogic.
+
+        Returns:
+            tuple: (SaveHeader, lista de filas como bytes 0/1/2)
+        """
+        data = self.encoded(index)
+        if board_codec.is_tiled(data):
+            header, tile, tiles = board_codec.unpack_tiles(data)
+            return header, [bytes(row) for row in board_codec.tiles_to_rows(header.size, tile, tiles)]
+        if not board_codec.is_packed(data):
+            raise ValueError(f"registro {index} dañado")
+        header = board_codec.read_header(data)
+        return header, board_codec.unpack_rows(memoryview(data)[board_codec.HEADER.size:], header.size)
+
+    def iter_games(self, engine=DEFAULT_ENGINE, start=0, stop=None):
+        """Produce las partidas [start, stop) una a una."""
+        for index in range(*slice(start, stop).indices(len(self))):
+            yield self.game(index, engine)
+
+    def iter_boards(self, start=0, stop=None):
+        """Produce los tableros (cabecera, filas) de las partidas [start, stop) uno a uno."""
+        for index in range(*slice(start, stop).indices(len(self))):
+            yield self.board(index)
+
+    def extract(self, index, filename):
+        """
+        Escribe la partida ``index`` como un archivo de FileManager.
+
+        Args:
+            index (int): Índice de la partida
+            filename (str): Nombre base del archivo (sin extensión)
+
+        Returns:
+            bool: True si se escribió correctamente
+        """
+        try:
+            data = self.encoded(index)
+            with open(f"{filename}.bin", "wb") as f:
+                f.write(data)
+            return True
+        except Exception as e:
+            print(f"Error saving: {str(e)}")
+            return False
+
+    def close(self):
+        """Escribe el índice (si se añadieron partidas) y cierra el archivo."""
+        if self.file.closed:
+            return
+        try:
+            if self.mode != "r":
+                self.file.seek(self._end)
+                self.file.write(INDEX.pack(INDEX_MAGIC, len(self.offsets)))
+                self.file.write(_offsets_to_bytes(self.offsets))
+                self.file.truncate()
+                self.file.seek(0)
+                self.file.write(HEADER.pack(MAGIC, VERSION, self._end))
+                self.file.flush()
+                os.fsync(self.file.fileno())
+        finally:
+            self.file.close()
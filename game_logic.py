@@ -1,20 +1,28 @@
+import heapq
 import random
+from array import array
+from collections import deque, namedtuple
+from contextlib import contextmanager
 """
 Módulo game_logic.py
 Contiene la clase GameLogic que implementa la lógica principal de un juego de propagación de virus en un tablero cuadrado. Permite colocar barreras, propagar el virus, verificar condiciones de victoria o derrota y avanzar de nivel.
 Clases:
     GameLogic: Gestiona el estado del juego, el tablero, la propagación del virus y la colocación de barreras.
+    ChangeBatch: Lista de CellChange de una operación, con las celdas cuya distancia al virus cambió.
 Métodos:
-    __init__(self, size=5)
+    __init__(self, size=5, seed=None)
         Inicializa una nueva instancia del juego con un tablero de tamaño dado, nivel inicial y configuración de barreras.
+        Cada partida usa su propio random.Random (self.rng), sembrado con seed si se indica.
     max_barriers(self)
         Calcula la cantidad máxima de barreras permitidas según el tamaño del tablero y el nivel actual.
     initialize_level(self)
         Inicializa el tablero para el nivel actual, colocando infecciones iniciales y restableciendo barreras.
     place_barrier(self, i, j)
         Intenta colocar una barrera en la posición (i, j). Verifica que no se creen islas inaccesibles y que haya barreras disponibles.
-    validate_no_islands(self)
-        Verifica que al colocar una barrera no se creen zonas aisladas (islas) inaccesibles para el virus.
+    validate_no_islands(self, i, j)
+        Verifica que una barrera en (i, j) no deje sin acceso al virus ninguna celda que lo tenga (no cree una isla nueva).
+    legal_barrier_cells(self)
+        Devuelve el conjunto de celdas donde se puede colocar una barrera (calculado una vez por estado).
     spread_virus(self)
         Propaga el virus desde las celdas infectadas a celdas adyacentes libres, si es posible.
     check_win(self)
@@ -25,17 +33,242 @@ Métodos:
         Avanza al siguiente nivel si es posible, reiniciando el tablero y aumentando la dificultad.
     free_cells(self)
         Devuelve la cantidad de celdas libres (no infectadas ni bloqueadas) en el tablero.
+    rebuild_frontier(self)
+        Recalcula la frontera de infección a partir del tablero (tras cargar una partida).
+    subscribe(self, callback) / unsubscribe(self, callback)
+        Registra o elimina un suscriptor que recibe una ChangeBatch (lista de CellChange) tras cada operación.
+    batch(self)
+        Agrupa en una sola entrega los cambios de varias operaciones.
+    distance_map(self)
+        Devuelve, para cada celda, los pasos mínimos de propagación que necesita el virus para llegar.
+    fast_forward(self, turns=None)
+        Avanza varios turnos del virus de una vez, o hasta el estado final si turns es None.
+
+La frontera (celdas libres junto al virus) y las celdas infectadas que aún pueden
+propagarse se mantienen de forma incremental en cada cambio de celda, por lo que
+spread_virus, check_win y check_loss no recorren el tablero.
+
+Cada cambio de celda se describe con un CellChange (fila, columna, estado anterior,
+estado nuevo y causa). Los cambios se acumulan durante una operación
+(place_barrier, spread_virus, initialize_level, load_rows) y se entregan juntos a
+los suscriptores al terminarla; si no hay suscriptores no se registra nada.
+
+El mapa de distancias se calcula con un BFS desde todas las celdas infectadas
+la primera vez que se pide y después se actualiza de forma incremental al
+colocar una barrera o propagarse el virus; cualquier otro cambio lo descarta y
+se vuelve a calcular cuando se pida. Cada entrega de cambios (ChangeBatch)
+indica también qué celdas cambiaron de distancia, para que quien dibuje el
+mapa no tenga que recorrerlo entero.
 """
 
+from validation import Validation
+
+_validator = Validation()
+
+DIRECTIONS = [(-1,0), (1,0), (0,-1), (0,1)]
+
+CellChange = namedtuple("CellChange", "i j old new cause")
+
+
+class ChangeBatch(list):
+    """
+    Lista de CellChange que reciben los suscriptores al terminar una operación.
+
+    distance_changed guarda las celdas planas (i * size + j) cuya distancia de
+    infección cambió con la operación, o None si el mapa de distancias se
+    descartó o se recalculó entero y hay que revisarlo todo.
+    """
+
+    __slots__ = ("distance_changed",)
+
+CAUSE_BARRIER = "barrier"
+CAUSE_SPREAD = "spread"
+CAUSE_RESET = "reset"
+CAUSE_LOAD = "load"
+CAUSE_UNDO = "undo"
+CAUSE_REDO = "redo"
+
+# Valores especiales del mapa de distancias.
+BLOCKED = -2
+UNREACHABLE = -1
+
+
+def _adjacent(k, size, total):
+    """Vecinos ortogonales de la celda plana k."""
+    j = k % size
+    if k >= size:
+        yield k - size
+    if k + size < total:
+        yield k + size
+    if j > 0:
+        yield k - 1
+    if j < size - 1:
+        yield k + 1
+
+
+def distance_field(cells, size):
+    """
+    BFS desde todas las celdas infectadas a la vez.
+
+    Args:
+        cells (bytes): size * size celdas en orden de filas (0 libre, 1 virus, 2 barrera)
+        size (int): Tamaño del tablero
+
+    Returns:
+        array: Por celda, 0 si está infectada, los pasos mínimos de propagación si
+        es libre y alcanzable, UNREACHABLE si es libre e inalcanzable y BLOCKED si
+        es una barrera
+    """
+    total = size * size
+    dist = array("i", [UNREACHABLE]) * total
+    queue = []
+    for value, marker in ((1, 0), (2, BLOCKED)):
+        k = cells.find(value)
+        while k >= 0:
+            dist[k] = marker
+            if value == 1:
+                queue.append(k)
+            k = cells.find(value, k + 1)
+    for v in queue:
+        nd = dist[v] + 1
+        for w in _adjacent(v, size, total):
+            if dist[w] == UNREACHABLE:
+                dist[w] = nd
+                queue.append(w)
+    return dist
+
+
+def _infect_distance(dist, c, size, changed=None):
+    """
+    Actualiza el mapa tras infectarse la celda c: las distancias solo bajan.
+    Si se pasa ``changed``, se añaden las celdas cuya distancia cambió.
+    """
+    total = size * size
+    dist[c] = 0
+    queue = [c]
+    for v in queue:
+        nd = dist[v] + 1
+        for w in _adjacent(v, size, total):
+            d = dist[w]
+            if d == UNREACHABLE or d > nd:
+                dist[w] = nd
+                queue.append(w)
+    if changed is not None:
+        changed.update(queue)
+
+
+def _block_distance(dist, c, size, changed=None):
+    """
+    Actualiza el mapa tras colocar una barrera en c: las distancias solo suben.
+
+    Se buscan, por orden de distancia, las celdas cuyos caminos mínimos pasaban
+    todos por c (sin otro vecino a distancia d - 1 que siga siendo válido) y
+    solo esas se recalculan, a partir de sus vecinas no afectadas. Si se pasa
+    ``changed``, se añaden las celdas cuya distancia cambió.
+    """
+    total = size * size
+    old = dist[c]
+    dist[c] = BLOCKED
+    if changed is not None:
+        changed.add(c)
+    if old <= 0:
+        return
+    affected = {c}
+    queue = [w for w in _adjacent(c, size, total) if dist[w] == old + 1]
+    for w in queue:
+        if w in affected:
+            continue
+        d = dist[w]
+        if any(dist[u] == d - 1 and u not in affected for u in _adjacent(w, size, total)):
+            continue
+        affected.add(w)
+        queue.extend(x for x in _adjacent(w, size, total) if dist[x] == d + 1)
+    affected.discard(c)
+    before = {w: dist[w] for w in affected} if changed is not None else None
+    heap = []
+    for w in affected:
+        best = UNREACHABLE
+        for u in _adjacent(w, size, total):
+            if u not in affected and dist[u] >= 0 and (best == UNREACHABLE or dist[u] + 1 < best):
+                best = dist[u] + 1
+        dist[w] = best
+        if best != UNREACHABLE:
+            heap.append((best, w))
+    heapq.heapify(heap)
+    while heap:
+        d, w = heapq.heappop(heap)
+        if dist[w] != d:
+            continue
+        for x in _adjacent(w, size, total):
+            if x in affected and (dist[x] == UNREACHABLE or dist[x] > d + 1):
+                dist[x] = d + 1
+                heapq.heappush(heap, (d + 1, x))
+    if changed is not None:
+        changed.update(w for w, d in before.items() if dist[w] != d)
+
+
+class _IndexedSet:
+    """Conjunto con inserción, borrado y elección aleatoria uniforme en O(1)."""
+
+    __slots__ = ("items", "index")
+
+    def __init__(self):
+        self.items = []
+        self.index = {}
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, item):
+        return item in self.index
+
+    def add(self, item):
+        if item not in self.index:
+            self.index[item] = len(self.items)
+            self.items.append(item)
+
+    def discard(self, item):
+        pos = self.index.pop(item, None)
+        if pos is not None:
+            last = self.items.pop()
+            if pos < len(self.items):
+                self.items[pos] = last
+                self.index[last] = pos
+
+    def choice(self, rng):
+        return self.items[rng.randrange(len(self.items))]
+
+
 class GameLogic:
-    def __init__(self, size=5):
+    # Sin __dict__ por instancia; las subclases que no declaran __slots__ lo recuperan.
+    __slots__ = ("size", "seed", "rng", "level", "max_level", "barrier_placed",
+                 "barriers_remaining", "board", "_frontier", "_active", "_legal_cache",
+                 "_subscribers", "_pending", "_batch_depth", "last_flood_cells", "_distance",
+                 "_distance_base", "_distance_changed", "__weakref__")
+
+    def __init__(self, size=5, seed=None, initialize=True):
         self.size = size
+        self.seed = seed
+        self.rng = random.Random(seed)
         self.level = 1
         self.max_level = 3
-        self.board = [[0 for _ in range(size)] for _ in range(size)]
         self.barrier_placed = False
         self.barriers_remaining = self.max_barriers()
-        self.initialize_level()
+        self._frontier = set()
+        self._active = _IndexedSet()
+        self._legal_cache = None
+        self._subscribers = []
+        self._pending = []
+        self._batch_depth = 0
+        self.last_flood_cells = 0
+        self._distance = None
+        # Mapa que ya conocen los suscriptores y celdas cuya distancia cambió desde entonces.
+        self._distance_base = None
+        self._distance_changed = set()
+        # Con initialize=False (al decodificar una partida) no se prepara el
+        # nivel: el tablero se rellena enseguida con load_rows o load_tiles.
+        if initialize:
+            self.initialize_level()
     
     def max_barriers(self):
         """Calcula barreras basado en tamaño del tablero y nivel"""
@@ -45,90 +278,367 @@ class GameLogic:
         return max(calculated, 3)  # Mínimo 3 barreras
     
     def initialize_level(self):
-        self.board = [[0 for _ in range(self.size)] for _ in range(self.size)]
+        before = self._snapshot_rows()
         self.barrier_placed = False
         self.barriers_remaining = self.max_barriers()
+        self._reset_board()
+        self.rebuild_frontier()
+        self._record_rows(before, CAUSE_RESET)
+
+    def _reset_board(self):
+        """Vacía el tablero y coloca las infecciones iniciales del nivel."""
+        self.board = [[0] * self.size for _ in range(self.size)]
         initial_infections = self.level
-        positions = random.sample(
-            [(i, j) for i in range(self.size) for j in range(self.size)],
-            initial_infections
-        )
-        for i, j in positions:
+        # Muestrear índices de un range elige las mismas celdas que muestrear la
+        # lista de coordenadas, sin construirla.
+        positions = self.rng.sample(range(self.size * self.size), initial_infections)
+        for k in positions:
+            i, j = divmod(k, self.size)
             self.board[i][j] = 1
 
+    def cell(self, i, j):
+        """Devuelve el estado de la celda (i, j): 0 libre, 1 virus, 2 barrera."""
+        return self.board[i][j]
+
+    def row_bytes(self, i):
+        """Devuelve la fila i como bytes con los valores 0/1/2."""
+        return bytes(self.board[i])
+
+    def load_rows(self, rows):
+        """Reemplaza el tablero por filas de valores 0/1/2 y recalcula la frontera."""
+        before = self._snapshot_rows()
+        self._replace_rows(rows)
+        self.rebuild_frontier()
+        self._record_rows(before, CAUSE_LOAD)
+
+    def _replace_rows(self, rows):
+        self.board = [list(row) for row in rows]
+
+    def subscribe(self, callback):
+        """
+        Registra un suscriptor de cambios de celda.
+        callback recibe una ChangeBatch (lista de CellChange) al terminar cada operación.
+        """
+        self._subscribers.append(callback)
+        return callback
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    @contextmanager
+    def batch(self):
+        """Agrupa los cambios de todas las operaciones del bloque en una sola entrega."""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            self._flush_changes()
+
+    def _flush_changes(self):
+        if self._batch_depth or not self._pending:
+            return
+        changes = ChangeBatch(self._pending)
+        self._pending = []
+        known = self._distance is not None and self._distance is self._distance_base
+        changes.distance_changed = self._distance_changed if known else None
+        self._distance_base = self._distance
+        self._distance_changed = set()
+        for callback in list(self._subscribers):
+            callback(changes)
+
+    def _snapshot_rows(self):
+        """Copia de las filas antes de reemplazar el tablero, solo si hay suscriptores."""
+        if not self._subscribers:
+            return None
+        return [self.row_bytes(i) for i in range(self.size)]
+
+    def _record_rows(self, before, cause):
+        """Registra como CellChange las diferencias con una copia previa de las filas."""
+        if before is not None:
+            for i, old in enumerate(before):
+                new = self.row_bytes(i)
+                if old != new:
+                    self._pending.extend(CellChange(i, j, old[j], new[j], cause)
+                                         for j in range(self.size) if old[j] != new[j])
+        self._flush_changes()
+
+    def rebuild_frontier(self):
+        """Recalcula desde cero la frontera y las celdas infectadas activas."""
+        self._invalidate()
+        self._frontier = set()
+        self._active = _IndexedSet()
+        # Solo las celdas infectadas y sus vecinas pueden pertenecer a la frontera.
+        for i, row in enumerate(self.board):
+            j = -1
+            while True:
+                try:
+                    j = row.index(1, j + 1)
+                except ValueError:
+                    break
+                self._refresh_cell(i, j)
+                for dx, dy in DIRECTIONS:
+                    ni, nj = i + dx, j + dy
+                    if 0 <= ni < self.size and 0 <= nj < self.size:
+                        self._refresh_cell(ni, nj)
+
+    def _refresh_cell(self, i, j):
+        """Actualiza la pertenencia de (i, j) a la frontera o a las celdas activas."""
+        cell = self.board[i][j]
+        target = 1 if cell == 0 else 0 if cell == 1 else None
+        touches = False
+        if target is not None:
+            for dx, dy in DIRECTIONS:
+                ni, nj = i + dx, j + dy
+                if 0 <= ni < self.size and 0 <= nj < self.size and self.board[ni][nj] == target:
+                    touches = True
+                    break
+        if cell == 0 and touches:
+            self._frontier.add((i, j))
+        else:
+            self._frontier.discard((i, j))
+        if cell == 1 and touches:
+            self._active.add((i, j))
+        else:
+            self._active.discard((i, j))
+
+    def _invalidate(self):
+        """Marca como obsoletas las cachés que dependen del tablero."""
+        self._legal_cache = None
+        self._distance = None
+
+    def _set_cell(self, i, j, value, cause=None):
+        """Cambia una celda, actualiza las cachés y registra el cambio para los suscriptores."""
+        old = self.cell(i, j)
+        distance = self._distance
+        self._write_cell(i, j, value)
+        self._invalidate()
+        if distance is not None and old == 0 and value in (1, 2):
+            k = i * self.size + j
+            changed = None
+            if self._subscribers and distance is self._distance_base:
+                changed = self._distance_changed
+            if value == 1:
+                _infect_distance(distance, k, self.size, changed)
+            else:
+                _block_distance(distance, k, self.size, changed)
+            self._distance = distance
+        if self._subscribers:
+            self._pending.append(CellChange(i, j, old, value, cause))
+
+    def _write_cell(self, i, j, value):
+        """Escribe una celda y actualiza la frontera en su vecindario."""
+        self.board[i][j] = value
+        self._refresh_cell(i, j)
+        for dx, dy in DIRECTIONS:
+            ni, nj = i + dx, j + dy
+            if 0 <= ni < self.size and 0 <= nj < self.size:
+                self._refresh_cell(ni, nj)
+
     def place_barrier(self, i, j):
         if self.barriers_remaining <= 0:
             return False
-            
-        if self.board[i][j] == 0:
-            original = self.board[i][j]
-            self.board[i][j] = 2
-            if not self.validate_no_islands():
-                self.board[i][j] = original
-                return False
+        
+        # Con la caché fría basta comprobar esta celda; el conjunto completo
+        # solo se calcula cuando alguien lo pide (p. ej. el resaltado de la GUI).
+        if self._legal_cache is not None:
+            legal = (i, j) in self._legal_cache
+        else:
+            legal = self.validate_no_islands(i, j)
+        if legal:
+            self._set_cell(i, j, 2, CAUSE_BARRIER)
             self.barrier_placed = True
             self.barriers_remaining -= 1
+            self._flush_changes()
             return True
         return False
 
-    def validate_no_islands(self):
-        directions = [(-1,0), (1,0), (0,-1), (0,1)]
-        virus_adjacent = set()
-        
-        for i in range(self.size):
-            for j in range(self.size):
-                if self.board[i][j] == 1:
-                    for dx, dy in directions:
-                        nx, ny = i + dx, j + dy
-                        if 0 <= nx < self.size and 0 <= ny < self.size:
-                            virus_adjacent.add((nx, ny))
-        
-        visited = [[False]*self.size for _ in range(self.size)]
-        queue = []
-        
-        for i in range(self.size):
-            for j in range(self.size):
-                if self.board[i][j] == 0 and (i,j) not in virus_adjacent and not visited[i][j]:
-                    queue.append((i, j))
-                    visited[i][j] = True
-                    while queue:
-                        x, y = queue.pop(0)
-                        for dx, dy in directions:
-                            nx, ny = x + dx, y + dy
-                            if 0 <= nx < self.size and 0 <= ny < self.size:
-                                if not visited[nx][ny] and self.board[nx][ny] == 0 and (nx, ny) not in virus_adjacent:
-                                    visited[nx][ny] = True
-                                    queue.append((nx, ny))
-        
-        for i in range(self.size):
-            for j in range(self.size):
-                if self.board[i][j] == 0 and not visited[i][j] and (i,j) not in virus_adjacent:
-                    return False
-        return True
+    def legal_barrier_cells(self):
+        """Celdas válidas para una barrera; se recalcula solo tras un cambio del tablero."""
+        if self._legal_cache is None:
+            self._legal_cache = frozenset(_validator.legal_barrier_cells(self.board, self.size))
+        return self._legal_cache
+
+    def validate_no_islands(self, i, j):
+        """
+        Verifica que una barrera en la celda libre (i, j) no cree una isla nueva.
+
+        Es la misma regla que legal_barrier_cells: toda celda libre que el virus
+        alcanza ahora lo debe seguir alcanzando. Desde cada vecino libre de
+        (i, j) se lanza una búsqueda en anchura que no pasa por (i, j); las
+        búsquedas avanzan por turnos, se fusionan al encontrarse y se detienen
+        al tocar el virus, así que normalmente solo recorren el entorno de la
+        celda. La barrera es inválida si un grupo se agota sin llegar al virus
+        cuando (i, j) sí estaba conectada con él.
+        """
+        size, cell = self.size, self.cell
+        self.last_flood_cells = 0
+        if not (0 <= i < size and 0 <= j < size) or cell(i, j) != 0:
+            return False
+
+        def touches_virus(x, y):
+            return any(0 <= x + dx < size and 0 <= y + dy < size and cell(x + dx, y + dy) == 1
+                       for dx, dy in DIRECTIONS)
+
+        starts = [(i + dx, j + dy) for dx, dy in DIRECTIONS
+                  if 0 <= i + dx < size and 0 <= j + dy < size and cell(i + dx, j + dy) == 0]
+        if not starts:
+            return True
+        # Si (i, j) toca el virus puede ser el único enlace de sus vecinos con
+        # él; si no, basta con que los vecinos sigan unidos entre sí.
+        linked = touches_virus(i, j)
+        reachable = linked
+        owner = {(i, j): -1}
+        parent = list(range(len(starts)))
+        escaped = [False] * len(starts)
+        queues = []
+        for g, start in enumerate(starts):
+            owner[start] = g
+            escaped[g] = touches_virus(*start)
+            queues.append(deque([start]))
+
+        def find(g):
+            while parent[g] != g:
+                g = parent[g]
+            return g
+
+        stranded = False
+        while True:
+            roots = {find(g) for g in range(len(starts))}
+            if (len(roots) == 1 and not linked) or all(escaped[g] for g in roots):
+                break
+            if stranded and (reachable or any(escaped[g] for g in roots)):
+                break
+            active = [g for g in roots if not escaped[g] and queues[g]]
+            if not active:
+                break
+            for g in active:
+                if find(g) != g or escaped[g]:
+                    continue
+                queue = queues[g]
+                for _ in range(len(queue)):
+                    x, y = queue.popleft()
+                    for dx, dy in DIRECTIONS:
+                        nx, ny = x + dx, y + dy
+                        if not (0 <= nx < size and 0 <= ny < size) or cell(nx, ny) != 0:
+                            continue
+                        other = owner.get((nx, ny))
+                        if other is None:
+                            owner[(nx, ny)] = g
+                            queue.append((nx, ny))
+                            if touches_virus(nx, ny):
+                                escaped[g] = True
+                        elif other >= 0 and find(other) != g:
+                            other = find(other)
+                            parent[other] = g
+                            escaped[g] = escaped[g] or escaped[other]
+                            queue.extend(queues[other])
+                            queues[other] = deque()
+                    if escaped[g]:
+                        break
+                if not escaped[g] and not queue:
+                    stranded = True
+
+        self.last_flood_cells = len(owner) - 1
+        roots = {find(g) for g in range(len(starts))}
+        if len(roots) == 1 and not linked:
+            return True
+        reachable = reachable or any(escaped[g] for g in roots)
+        return not (reachable and any(not escaped[g] for g in roots))
 
     def spread_virus(self):
-        infected = [(i,j) for i in range(self.size) for j in range(self.size) if self.board[i][j] == 1]
-        random.shuffle(infected)
-        
-        for x, y in infected:
-            directions = random.sample([(-1,0), (1,0), (0,-1), (0,1)], 4)
-            for dx, dy in directions:
-                nx, ny = x + dx, y + dy
-                if 0 <= nx < self.size and 0 <= ny < self.size and self.board[nx][ny] == 0:
-                    self.board[nx][ny] = 1
-                    return True
+        # Una celda infectada con algún vecino libre, elegida al azar, y luego
+        # una de sus direcciones libres al azar (igual que recorrer las
+        # infectadas barajadas y tomar la primera que pueda propagarse).
+        if not self._active:
+            return False
+        x, y = self._active.choice(self.rng)
+        for dx, dy in self.rng.sample(DIRECTIONS, 4):
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.size and 0 <= ny < self.size and self.board[nx][ny] == 0:
+                self._set_cell(nx, ny, 1, CAUSE_SPREAD)
+                self._flush_changes()
+                return True
         return False
 
+    def distance_map(self):
+        """
+        Mapa de distancias de infección, en orden de filas (celda i * size + j).
+
+        Cada celda libre guarda el número mínimo de propagaciones que necesita el
+        virus para alcanzarla con las barreras actuales (UNREACHABLE si no puede),
+        las infectadas valen 0 y las barreras BLOCKED. Se calcula la primera vez y
+        después se mantiene al colocar barreras y propagarse el virus. No debe
+        modificarse.
+        """
+        if self._distance is None:
+            self._distance = self._distance_field()
+            # Sin cambios pendientes, los suscriptores ya conocen este tablero.
+            self._distance_base = self._distance
+            self._distance_changed = None if self._pending else set()
+        return self._distance
+
+    def _distance_field(self):
+        """Calcula el mapa de distancias completo (ver distance_field)."""
+        cells = b"".join(self.row_bytes(i) for i in range(self.size))
+        return distance_field(cells, self.size)
+
+    def distance(self, i, j):
+        """Pasos mínimos para que el virus llegue a (i, j) (ver distance_map)."""
+        return self.distance_map()[i * self.size + j]
+
+    def fast_forward(self, turns=None):
+        """
+        Avanza los turnos del virus sin colocar barreras, en un solo lote de cambios.
+
+        Con turns=None se llega directamente al estado final: el virus acaba
+        ocupando exactamente las celdas libres alcanzables en el mapa de
+        distancias, sea cual sea el orden de propagación, así que no se simula.
+        Con un número de turnos se llama a spread_virus ese número de veces.
+
+        Args:
+            turns (int): Turnos a avanzar, o None para llegar al final
+
+        Returns:
+            int: Celdas infectadas
+        """
+        self.barrier_placed = False
+        infected = 0
+        with self.batch():
+            if turns is None:
+                distance = self.distance_map()
+                reachable = [k for k, d in enumerate(distance) if d > 0]
+                self._infect_all(reachable)
+                infected = len(reachable)
+                self._distance = array("i", (0 if d > 0 else d for d in distance))
+            else:
+                for _ in range(turns):
+                    if not self.spread_virus():
+                        break
+                    infected += 1
+        return infected
+
+    def _infect_all(self, cells):
+        """Infecta las celdas planas indicadas (todas libres) como propagaciones."""
+        self._distance = None
+        size = self.size
+        for k in cells:
+            i, j = divmod(k, size)
+            self._set_cell(i, j, 1, CAUSE_SPREAD)
+
+    def _record_spread(self, cells):
+        """Registra como propagaciones las celdas planas infectadas en bloque por un motor."""
+        if self._subscribers:
+            size = self.size
+            self._pending.extend(CellChange(k // size, k % size, 0, 1, CAUSE_SPREAD) for k in cells)
+
     def check_win(self):
-        for i in range(self.size):
-            for j in range(self.size):
-                if self.board[i][j] == 1:
-                    for dx, dy in [(-1,0), (1,0), (0,-1), (0,1)]:
-                        ni, nj = i + dx, j + dy
-                        if 0 <= ni < self.size and 0 <= nj < self.size:
-                            if self.board[ni][nj] == 0:
-                                return False
-        return True
+        return not self._frontier
+
+    def frontier_cells(self):
+        """Devuelve las celdas libres a las que el virus puede propagarse."""
+        return set(self._frontier)
 
     def check_loss(self):
         return self.barriers_remaining <= 0 and not self.check_win()
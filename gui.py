@@ -10,19 +10,21 @@ guardar y cargar partidas, y visualizar el estado del tablero.
         master (tk.Tk): Ventana principal de Tkinter.
     """
 """
-    Inicializa la barra de menú con las opciones de Nuevo Juego, Guardar y Cargar.
+    Inicializa la barra de menú con las opciones de Nuevo Juego, Guardar y Cargar,
+    el menú Editar con Deshacer (Ctrl+Z) y Rehacer (Ctrl+Y) y el menú Ver, que sombrea
+    las celdas libres según lo cerca que está el virus (GameLogic.distance_map).
     """
 """
     Inicia un nuevo juego solicitando al usuario el tamaño del tablero.
     Reinicia el estado del juego y actualiza la interfaz.
     """
 """
-    Crea los botones del tablero en la interfaz gráfica según el tamaño actual del juego.
-    También agrega el botón para avanzar al siguiente turno.
+    Muestra la partida actual en el canvas del tablero (BoardCanvas), que admite
+    zoom (Ctrl + rueda, + y -) y desplazamiento para tableros grandes.
     """
 """
-    Actualiza la visualización del tablero y la información en la ventana principal,
-    mostrando el estado de cada celda y los datos del juego.
+    Actualiza la visualización del tablero y la información en la ventana principal.
+    Solo se redibujan las celdas que cambiaron, una vez por ciclo del bucle de eventos.
     """
 """
     Maneja el evento de clic en una celda del tablero.
@@ -35,30 +37,75 @@ guardar y cargar partidas, y visualizar el estado del tablero.
     Avanza al siguiente turno del juego.
     Propaga el virus, verifica condiciones de victoria o derrota y actualiza la interfaz.
     """
+"""
+    Busca con solver.Solver la mejor barrera para el turno actual, la resalta en el tablero
+    e informa de la probabilidad estimada de contener el virus. En tableros grandes la
+    búsqueda se reparte entre procesos y la mejor celda hasta el momento se va resaltando.
+    """
+"""
+    Deshace o rehace el último paso de la partida (barrera, turno del virus o cambio de nivel)
+    usando el historial de cambios (history.History).
+    """
 """
     Maneja la lógica cuando el jugador gana un nivel o el juego completo.
     Muestra mensajes de victoria y avanza de nivel o reinicia el juego.
     """
 """
     Solicita al usuario un nombre de archivo y guarda el estado actual del juego.
-    Muestra un mensaje de éxito si la operación es exitosa.
+    La partida se copia al instante y se codifica y escribe en segundo plano
+    (async_persistence), así que la ventana no se bloquea con tableros grandes.
+    Muestra un mensaje de éxito al terminar. Desde ese momento cada turno se añade
+    al diario de jugadas (replay_journal) junto a la partida guardada.
     """
 """
-    Solicita al usuario un nombre de archivo y carga una partida guardada.
+    Solicita al usuario un nombre de archivo y carga una partida guardada en segundo plano,
+    mostrando el progreso en el título de la ventana.
     Actualiza la interfaz con el estado cargado y muestra un mensaje de éxito.
     """
+"""
+    Abre el panel de depuración: activa profiling.Profiler y muestra cada medio segundo
+    las llamadas, latencias y celdas recorridas de los métodos críticos. Al cerrar el
+    panel se desactiva la instrumentación.
+    """
+"""
+    Activa o desactiva el autoguardado periódico, que se omite si la partida no cambió
+    desde el último guardado.
+    """
 from tkinter import messagebox, simpledialog
 from game_logic import GameLogic
-from file_manager import FileManager
+from board_canvas import BoardCanvas
+from history import History
+from async_persistence import AsyncPersistence, Autosave
+
+HINT_SECONDS = 1.0
+PARALLEL_HINT_SIZE = 15
+AUTOSAVE_NAME = "autoguardado"
+DEBUG_REFRESH_MS = 500
 
 class VirusGameGUI:
     def __init__(self, master):
         self.master = master
         self.game = None
-        self.buttons = []
+        self.journal = None
+        self.history = None
+        self.persistence = AsyncPersistence(self.master)
+        self.autosave = Autosave(self.persistence, AUTOSAVE_NAME)
+        self.autosave_var = tk.BooleanVar(value=False)
+        self.threat_var = tk.BooleanVar(value=False)
+        self.profiler = None
+        self.debug_panel = None
+        self.board_view = BoardCanvas(self.master, self.on_cell_click)
+        self.board_view.grid(row=0, column=0, sticky="nsew")
+        buttons = tk.Frame(self.master)
+        buttons.grid(row=1, column=0)
+        tk.Button(buttons, text="Siguiente Turno",
+                 command=self.next_turn).grid(row=0, column=0)
+        tk.Button(buttons, text="Pista",
+                 command=self.show_hint).grid(row=0, column=1)
+        self.master.rowconfigure(0, weight=1)
+        self.master.columnconfigure(0, weight=1)
         self.init_menu()
         self.start_new_game()
-        self.master.resizable(False, False)
     
     def init_menu(self):
         menu_bar = tk.Menu(self.master)
@@ -66,42 +113,43 @@ class VirusGameGUI:
         file_menu.add_command(label="Nuevo Juego", command=self.start_new_game)
         file_menu.add_command(label="Guardar", command=self.save_game)
         file_menu.add_command(label="Cargar", command=self.load_game)
+        file_menu.add_checkbutton(label="Autoguardado", variable=self.autosave_var,
+                                  command=self.toggle_autosave)
         menu_bar.add_cascade(label="Archivo", menu=file_menu)
+        edit_menu = tk.Menu(menu_bar, tearoff=0)
+        edit_menu.add_command(label="Deshacer", accelerator="Ctrl+Z", command=self.undo)
+        edit_menu.add_command(label="Rehacer", accelerator="Ctrl+Y", command=self.redo)
+        menu_bar.add_cascade(label="Editar", menu=edit_menu)
+        view_menu = tk.Menu(menu_bar, tearoff=0)
+        view_menu.add_checkbutton(label="Mostrar amenaza", variable=self.threat_var,
+                                  command=lambda: self.board_view.set_threat(self.threat_var.get()))
+        menu_bar.add_cascade(label="Ver", menu=view_menu)
+        debug_menu = tk.Menu(menu_bar, tearoff=0)
+        debug_menu.add_command(label="Panel de rendimiento", command=self.open_debug_panel)
+        menu_bar.add_cascade(label="Depuración", menu=debug_menu)
         self.master.config(menu=menu_bar)
+        self.master.bind("<Control-z>", lambda e: self.undo())
+        self.master.bind("<Control-y>", lambda e: self.redo())
 
     def start_new_game(self):
-        size = simpledialog.askinteger("Nuevo Juego", "Tamaño del tablero (3-10):", 
-                                     minvalue=3, maxvalue=10)
+        size = simpledialog.askinteger("Nuevo Juego", "Tamaño del tablero (3-200):", 
+                                     minvalue=3, maxvalue=200)
         if size:
+            self.close_journal()
             self.game = GameLogic(size)
             self.create_board()
             self.update_board()
 
     def create_board(self):
-        for widget in self.master.winfo_children():
-            if isinstance(widget, tk.Button):
-                widget.destroy()
-        
-        self.buttons = []
-        for i in range(self.game.size):
-            row = []
-            for j in range(self.game.size):
-                btn = tk.Button(self.master, width=4, height=2,
-                               command=lambda i=i, j=j: self.on_cell_click(i, j))
-                btn.grid(row=i, column=j)
-                row.append(btn)
-            self.buttons.append(row)
-        
-        tk.Button(self.master, text="Siguiente Turno", 
-                 command=self.next_turn).grid(row=self.game.size, columnspan=self.game.size)
+        if self.history is None or self.history.game is not self.game:
+            if self.history is not None:
+                self.history.close()
+            self.history = History(self.game)
+        self.autosave.watch(self.game)
+        self.board_view.set_game(self.game)
 
     def update_board(self):
-        for i in range(self.game.size):
-            for j in range(self.game.size):
-                cell = self.game.board[i][j]
-                color = "#90EE90" if cell == 0 else "#FF6961" if cell == 1 else "#A9A9A9"
-                text = "🌿" if cell == 0 else "🦠" if cell == 1 else "🧱"
-                self.buttons[i][j].config(text=text, bg=color, relief="sunken" if cell == 2 else "raised")
+        self.board_view.refresh()
         
         title_info = [
             f"Nivel: {self.game.level}",
@@ -137,6 +185,43 @@ class VirusGameGUI:
         if self.game.check_loss() or self.game.check_win():
             self.update_board()
 
+    def show_hint(self):
+        if self.game.barrier_placed:
+            messagebox.showinfo("Pista", "Ya colocaste la barrera de este turno")
+            return
+        from solver import parallel_solve, solve
+        self.master.config(cursor="watch")
+        self.master.update_idletasks()
+        try:
+            if self.game.size > PARALLEL_HINT_SIZE:
+                result = parallel_solve(self.game, time_limit=HINT_SECONDS,
+                                        on_update=self.show_partial_hint)
+            else:
+                result = solve(self.game, time_limit=HINT_SECONDS)
+        finally:
+            self.master.config(cursor="")
+        if result.move is None:
+            messagebox.showinfo("Pista", "Mejor no colocar barrera este turno\n"
+                                f"Probabilidad de contener el virus: {result.win_probability:.0%}")
+            return
+        self.board_view.mark(*result.move)
+        i, j = result.move
+        messagebox.showinfo("Pista", f"Barrera en fila {i + 1}, columna {j + 1}\n"
+                            f"Probabilidad de contener el virus: {result.win_probability:.0%}")
+
+    def show_partial_hint(self, result):
+        if result.move is not None:
+            self.board_view.mark(*result.move)
+            self.master.update_idletasks()
+
+    def undo(self):
+        if self.history and self.history.undo():
+            self.update_board()
+
+    def redo(self):
+        if self.history and self.history.redo():
+            self.update_board()
+
     def handle_victory(self):
         if self.game.advance_level():
             messagebox.showinfo("¡Victoria!", 
@@ -153,16 +238,96 @@ class VirusGameGUI:
 
     def save_game(self):
         filename = simpledialog.askstring("Guardar", "Nombre:")
-        if filename and FileManager.save_game(self.game, filename):
-            messagebox.showinfo("Éxito", "Partida guardada")
+        if filename:
+            game = self.game
+            journal = None
+            
+            def journal_opened(ok, error):
+                if not ok:
+                    journal.close()
+                    if self.journal is journal:
+                        self.journal = None
+            
+            def done(ok, error):
+                nonlocal journal
+                if ok and game is self.game:
+                    self.close_journal()
+                    journal = self.journal = self.persistence.open_journal(game, filename, journal_opened)
+                if ok:
+                    messagebox.showinfo("Éxito", "Partida guardada")
+                else:
+                    messagebox.showerror("Error", f"No se pudo guardar: {error}")
+            
+            self.persistence.save(game, filename, done)
+    
+    def close_journal(self):
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
     
     def load_game(self):
         filename = simpledialog.askstring("Cargar", "Nombre:")
-        if filename and (loaded_game := FileManager.load_game(filename)):
-            self.game = loaded_game
-            self.create_board()
+        if filename:
+            self.persistence.load(filename, self.finish_load, on_progress=self.show_load_progress)
+    
+    def show_load_progress(self, fraction):
+        self.master.title(f"Cargando partida... {fraction:.0%}")
+    
+    def finish_load(self, loaded_game, error):
+        if loaded_game is None:
             self.update_board()
-            messagebox.showinfo("Éxito", "Partida cargada")
+            messagebox.showerror("Error", f"No se pudo cargar: {error}")
+            return
+        self.close_journal()
+        self.game = loaded_game
+        self.create_board()
+        self.update_board()
+        messagebox.showinfo("Éxito", "Partida cargada")
+    
+    def open_debug_panel(self):
+        if self.debug_panel is not None:
+            self.debug_panel.lift()
+            return
+        from profiling import Profiler
+        self.profiler = self.profiler or Profiler()
+        self.profiler.enable()
+        panel = self.debug_panel = tk.Toplevel(self.master)
+        panel.title("Rendimiento")
+        text = tk.Text(panel, width=110, height=20, font=("TkFixedFont", 9))
+        text.grid(row=0, column=0, columnspan=2, sticky="nsew")
+        tk.Button(panel, text="Reiniciar", command=self.profiler.reset).grid(row=1, column=0)
+        tk.Button(panel, text="Exportar JSON", command=self.export_profile).grid(row=1, column=1)
+        panel.rowconfigure(0, weight=1)
+        panel.columnconfigure(0, weight=1)
+        panel.protocol("WM_DELETE_WINDOW", self.close_debug_panel)
+        
+        def refresh():
+            if self.debug_panel is not panel:
+                return
+            text.delete("1.0", tk.END)
+            text.insert(tk.END, self.profiler.report())
+            panel.after(DEBUG_REFRESH_MS, refresh)
+        
+        refresh()
+    
+    def close_debug_panel(self):
+        self.profiler.disable()
+        self.debug_panel.destroy()
+        self.debug_panel = None
+    
+    def export_profile(self):
+        filename = simpledialog.askstring("Exportar", "Archivo JSON:", parent=self.debug_panel)
+        if filename:
+            try:
+                self.profiler.to_json(filename)
+            except OSError as e:
+                messagebox.showerror("Error", f"No se pudo exportar: {e}")
+    
+    def toggle_autosave(self):
+        if self.autosave_var.get():
+            self.autosave.start()
+        else:
+            self.autosave.stop()
 
 if __name__ == "__main__":
     root = tk.Tk()
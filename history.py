@@ -0,0 +1,104 @@
+"""
+Módulo history.py
+
+Deshacer y rehacer para GameLogic. En lugar de copiar el tablero en cada
+jugada, el historial guarda solo los cambios de celda que la partida
+notifica a sus suscriptores (un paso por lote de cambios) junto con el nivel,
+las barreras restantes y barrier_placed antes y después del paso. La memoria
+crece con el número de celdas cambiadas y no con el área del tablero.
+
+Clases:
+    History: Pilas de deshacer y rehacer de una partida.
+"""
+
+from collections import deque, namedtuple
+
+from game_logic import CAUSE_REDO, CAUSE_UNDO
+
+DEFAULT_LIMIT = 10000
+
+HistoryStep = namedtuple("HistoryStep", "changes before after")
+
+
+def _game_state(game):
+    return (game.level, game.barriers_remaining, game.barrier_placed)
+
+
+class History:
+    """
+    Historial de deshacer/rehacer de una partida.
+
+    Cada lote de cambios entregado por la partida (una barrera, una
+    propagación, un reinicio de nivel o un bloque game.batch()) es un paso.
+
+    Args:
+        game (GameLogic): Partida a seguir (cualquier motor)
+        limit (int): Número máximo de pasos que se pueden deshacer
+    """
+
+    def __init__(self, game, limit=DEFAULT_LIMIT):
+        self.game = game
+        self.undo_stack = deque(maxlen=limit)
+        self.redo_stack = []
+        self._state = _game_state(game)
+        self._applying = False
+        game.subscribe(self._on_changes)
+
+    def _on_changes(self, changes):
+        if self._applying:
+            return
+        after = _game_state(self.game)
+        self.undo_stack.append(HistoryStep(
+            tuple((c.i, c.j, c.old, c.new) for c in changes), self._state, after))
+        self._state = after
+        self.redo_stack.clear()
+
+    def can_undo(self):
+        return bool(self.undo_stack)
+
+    def can_redo(self):
+        return bool(self.redo_stack)
+
+    def _apply(self, changes, state, cause):
+        game = self.game
+        self._applying = True
+        try:
+            with game.batch():
+                for i, j, value in changes:
+                    game._set_cell(i, j, value, cause)
+                # Antes de entregar el lote, para que otros suscriptores vean el estado final.
+                game.level, game.barriers_remaining, game.barrier_placed = state
+        finally:
+            self._applying = False
+        self._state = state
+
+    def undo(self):
+        """
+        Deshace el último paso.
+
+        Returns:
+            bool: True si había algo que deshacer
+        """
+        if not self.undo_stack:
+            return False
+        step = self.undo_stack.pop()
+        self._apply([(i, j, old) for i, j, old, new in reversed(step.changes)], step.before, CAUSE_UNDO)
+        self.redo_stack.append(step)
+        return True
+
+    def redo(self):
+        """
+        Rehace el último paso deshecho.
+
+        Returns:
+            bool: True si había algo que rehacer
+        """
+        if not self.redo_stack:
+            return False
+        step = self.redo_stack.pop()
+        self._apply([(i, j, new) for i, j, old, new in step.changes], step.after, CAUSE_REDO)
+        self.undo_stack.append(step)
+        return True
+
+    def close(self):
+        self.game.unsubscribe(self._on_changes)
@@ -0,0 +1,139 @@
+"""
+Módulo load_client.py
+
+Cliente sintético para probar la carga de server.py. Abre varias conexiones
+concurrentes; cada cliente crea su partida y juega turnos (una barrera en una
+celda al azar y después "turn") hasta terminar la partida o agotar sus
+órdenes. Mide la latencia de ida y vuelta de cada orden e imprime un resumen
+en JSON con las órdenes por segundo y los percentiles por orden, junto con
+las latencias que el servidor registró para una de las sesiones.
+
+Uso:
+    python server.py --port 8765 &
+    python load_client.py --port 8765 --clients 200 --size 20 --turns 50
+
+Funciones:
+    run_load: Lanza los clientes y devuelve el resumen.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from profiling import CallStats
+from server import DEFAULT_PORT, MAX_LINE
+
+
+class _Connection:
+    """Conexión de un cliente: envía una orden y espera su respuesta."""
+
+    def __init__(self, reader, writer, stats):
+        self.reader = reader
+        self.writer = writer
+        self.stats = stats
+        self.rejected = 0
+
+    async def call(self, cmd, **fields):
+        start = time.perf_counter()
+        self.writer.write(json.dumps({"cmd": cmd, **fields}).encode() + b"\n")
+        await self.writer.drain()
+        line = await self.reader.readline()
+        if not line:
+            raise ConnectionError("el servidor cerró la conexión")
+        stat = self.stats.get(cmd)
+        if stat is None:
+            stat = self.stats[cmd] = CallStats(cmd)
+        stat.add(time.perf_counter() - start)
+        response = json.loads(line)
+        if not response["ok"]:
+            self.rejected += 1
+        return response
+
+
+async def _connect(host, port, unix_path):
+    if unix_path is not None:
+        return await asyncio.open_unix_connection(unix_path, limit=MAX_LINE)
+    return await asyncio.open_connection(host, port, limit=MAX_LINE)
+
+
+async def _client(index, options, stats):
+    reader, writer = await _connect(options["host"], options["port"], options["unix_path"])
+    conn = _Connection(reader, writer, stats)
+    rng = random.Random(options["seed"] * 1_000_003 + index)
+    try:
+        fields = {"size": options["size"], "seed": rng.getrandbits(32)}
+        if options["engine"] is not None:
+            # Sin "engine", el servidor usa su motor por defecto.
+            fields["engine"] = options["engine"]
+        state = await conn.call("new", **fields)
+        session, size = state["session"], state["size"]
+        for _ in range(options["turns"]):
+            if state.get("lost") or state.get("event") == "won":
+                break
+            await conn.call("place", session=session, i=rng.randrange(size), j=rng.randrange(size))
+            state = await conn.call("turn", session=session)
+        server_latency = await conn.call("stats", session=session)
+        await conn.call("close", session=session)
+        return conn.rejected, server_latency["latency"]
+    finally:
+        writer.close()
+
+
+async def run_load(clients=50, size=10, turns=20, engine=None, seed=0,
+                   host="127.0.0.1", port=DEFAULT_PORT, unix_path=None):
+    """
+    Lanza ``clients`` clientes concurrentes contra el servidor.
+
+    Args:
+        clients (int): Conexiones simultáneas (una partida por conexión)
+        size (int): Tamaño del tablero de cada partida
+        turns (int): Turnos máximos por partida
+        engine (str): Motor de las partidas (None = el del servidor)
+        seed (int): Semilla de los clientes
+        host (str), port (int): Dirección TCP del servidor
+        unix_path (str): Socket Unix del servidor (en lugar de TCP)
+
+    Returns:
+        dict: Resumen con órdenes, órdenes rechazadas (sobre todo barreras en
+            celdas inválidas), órdenes por segundo y latencias
+    """
+    options = {"size": size, "turns": turns, "engine": engine, "seed": seed,
+               "host": host, "port": port, "unix_path": unix_path}
+    stats = {}
+    start = time.perf_counter()
+    results = await asyncio.gather(*(_client(index, options, stats)
+                                     for index in range(clients)))
+    elapsed = time.perf_counter() - start
+    calls = sum(stat.calls for stat in stats.values())
+    return {
+        "clients": clients,
+        "commands": calls,
+        "rejected": sum(rejected for rejected, _ in results),
+        "elapsed_s": elapsed,
+        "commands_per_s": calls / elapsed if elapsed else 0.0,
+        "latency": {name: stat.as_dict() for name, stat in sorted(stats.items())},
+        "server_latency_sample": results[0][1] if results else {},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cliente de carga para server.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="Ruta del socket Unix del servidor")
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--size", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--engine", default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    summary = asyncio.run(run_load(args.clients, args.size, args.turns, args.engine, args.seed,
+                                   args.host, args.port, args.unix))
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+"""
+Módulo mapped_board.py
+
+Acceso perezoso a partidas guardadas en el formato empaquetado de
+board_codec mediante mmap. Como todas las filas tienen el mismo ancho en
+disco, la fila i se localiza directamente y solo se decodifican las filas que
+se leen (por ejemplo, las visibles en pantalla o una región bajo análisis).
+Las filas modificadas se vuelven a escribir en su sitio, de modo que guardar
+una partida grande solo cuesta las filas que cambiaron.
+
+Clases:
+    MappedBoard: Vista de tablero ``board[i][j]`` respaldada por un archivo.
+"""
+
+import mmap
+from collections import OrderedDict
+
+import board_codec
+
+
+class MappedRow:
+    """Fila de un MappedBoard con semántica de lista."""
+
+    def __init__(self, board, i):
+        self.board = board
+        self.i = i
+
+    def __len__(self):
+        return self.board.size
+
+    def __getitem__(self, j):
+        return self.board.row(self.i)[j]
+
+    def __setitem__(self, j, value):
+        row = self.board.row(self.i)
+        if row[j] != value:
+            # mark_dirty comprueba antes de tocar la fila que se pueda escribir.
+            self.board.mark_dirty(self.i)
+            row[j] = value
+
+    def __iter__(self):
+        return iter(self.board.row(self.i))
+
+    def __bytes__(self):
+        return bytes(self.board.row(self.i))
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+    def __repr__(self):
+        return repr(list(self))
+
+    def index(self, value, start=0):
+        return self.board.row(self.i).index(value, start)
+
+    def count(self, value):
+        return self.board.row(self.i).count(value)
+
+
+class MappedBoard:
+    """
+    Tablero de una partida guardada, abierto con mmap y decodificado por filas.
+
+    Las filas decodificadas se guardan en una caché LRU de ``cache_rows``
+    filas; al expulsar una fila modificada se escribe antes en el archivo.
+    La cabecera (nivel, barreras) también se lee y escribe en su sitio.
+
+    Args:
+        path (str): Ruta del archivo .bin en formato empaquetado
+        writable (bool): Si se permiten modificaciones
+        cache_rows (int): Número máximo de filas decodificadas en memoria
+    """
+
+    def __init__(self, path, writable=True, cache_rows=256):
+        self.file = open(path, "r+b" if writable else "rb")
+        try:
+            access = mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ
+            self.mm = mmap.mmap(self.file.fileno(), 0, access=access)
+        except Exception:
+            self.file.close()
+            raise
+        self.writable = False
+        header = board_codec.read_header(self.mm[:board_codec.HEADER.size])
+        expected = None if header is None else (
+            board_codec.HEADER.size + header.size * board_codec.row_stride(header.size))
+        if len(self.mm) != expected:
+            self.close()
+            raise ValueError(f"{path} no es una partida en formato empaquetado")
+        self.size = header.size
+        self.stride = board_codec.row_stride(self.size)
+        self.writable = writable
+        self.cache_rows = cache_rows
+        self._rows = OrderedDict()
+        self._dirty = set()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.size
+        if not 0 <= i < self.size:
+            raise IndexError("fila fuera del tablero")
+        return MappedRow(self, i)
+
+    def __iter__(self):
+        for i in range(self.size):
+            yield MappedRow(self, i)
+
+    def _offset(self, i):
+        return board_codec.HEADER.size + i * self.stride
+
+    def row(self, i):
+        """Devuelve la fila i decodificada (bytearray mutable, cacheado)."""
+        row = self._rows.get(i)
+        if row is not None:
+            self._rows.move_to_end(i)
+            return row
+        data = self.mm[self._offset(i):self._offset(i) + self.stride]
+        row = bytearray(board_codec.unpack_rows(data, self.size)[0])
+        self._rows[i] = row
+        if len(self._rows) > self.cache_rows:
+            old, old_row = self._rows.popitem(last=False)
+            if old in self._dirty:
+                self._write_row(old, old_row)
+        return row
+
+    def rows(self, start, stop):
+        """Decodifica las filas [start, stop), por ejemplo las visibles en pantalla."""
+        return [self.row(i) for i in range(max(start, 0), min(stop, self.size))]
+
+    def mark_dirty(self, i):
+        if not self.writable:
+            raise ValueError("el tablero está abierto en solo lectura")
+        self._dirty.add(i)
+
+    def _write_row(self, i, row):
+        offset = self._offset(i)
+        self.mm[offset:offset + self.stride] = board_codec.pack_rows([row], self.size)
+        self._dirty.discard(i)
+
+    def _header_fields(self):
+        return list(board_codec.HEADER.unpack_from(self.mm))
+
+    def _set_header_field(self, index, value):
+        if not self.writable:
+            raise ValueError("el tablero está abierto en solo lectura")
+        fields = self._header_fields()
+        fields[index] = value
+        board_codec.HEADER.pack_into(self.mm, 0, *fields)
+
+    @property
+    def level(self):
+        return self._header_fields()[3]
+
+    @level.setter
+    def level(self, value):
+        self._set_header_field(3, value)
+
+    @property
+    def barriers_remaining(self):
+        return self._header_fields()[4]
+
+    @barriers_remaining.setter
+    def barriers_remaining(self, value):
+        self._set_header_field(4, value)
+
+    @property
+    def barrier_placed(self):
+        return bool(self._header_fields()[5] & board_codec.FLAG_BARRIER_PLACED)
+
+    @barrier_placed.setter
+    def barrier_placed(self, value):
+        flags = self._header_fields()[5] & ~board_codec.FLAG_BARRIER_PLACED
+        self._set_header_field(5, flags | (board_codec.FLAG_BARRIER_PLACED if value else 0))
+
+    @property
+    def max_level(self):
+        """Nivel máximo guardado en la cabecera (None en archivos que no lo guardan)."""
+        return self._header_fields()[5] >> board_codec.MAX_LEVEL_SHIFT or None
+
+    @max_level.setter
+    def max_level(self, value):
+        if not 1 <= value <= board_codec.MAX_STORED_LEVEL:
+            raise ValueError(f"max_level fuera de rango (1 a {board_codec.MAX_STORED_LEVEL}): {value}")
+        flags = self._header_fields()[5] & board_codec.FLAG_BARRIER_PLACED
+        self._set_header_field(5, flags | (value << board_codec.MAX_LEVEL_SHIFT))
+
+    def flush(self):
+        """Escribe en el archivo las filas modificadas y sincroniza el mmap."""
+        for i in sorted(self._dirty):
+            self._write_row(i, self._rows[i])
+        if self.writable:
+            self.mm.flush()
+
+    def close(self):
+        if not self.mm.closed:
+            if self.writable:
+                self.flush()
+            self.mm.close()
+        self.file.close()
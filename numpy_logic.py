@@ -0,0 +1,100 @@
+"""
+Módulo numpy_logic.py
+
+Motor alternativo de GameLogic respaldado por un ndarray de NumPy (uint8 con
+los mismos valores 0/1/2 que el tablero de listas). Mantiene la API pública de
+GameLogic, pero la reconstrucción de la frontera, el conteo de celdas libres y
+la inicialización del nivel se resuelven con máscaras desplazadas en lugar de
+recorrer cada celda en Python. Durante la partida la frontera se mantiene de
+forma incremental igual que en el motor de listas.
+
+El motor de listas de game_logic.py sigue siendo la implementación de
+referencia; este módulo solo se usa si NumPy está instalado.
+
+Clases:
+    NumpyGameLogic: GameLogic con el tablero almacenado en un ndarray.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es una dependencia opcional
+    np = None
+
+from game_logic import GameLogic, _IndexedSet
+
+
+def neighbor_mask(mask):
+    """
+    Calcula las celdas ortogonalmente adyacentes a una máscara booleana.
+
+    Args:
+        mask (ndarray): Máscara booleana de tamaño size x size
+
+    Returns:
+        ndarray: Máscara con las celdas vecinas de alguna celda marcada
+    """
+    out = np.zeros_like(mask)
+    out[1:, :] |= mask[:-1, :]
+    out[:-1, :] |= mask[1:, :]
+    out[:, 1:] |= mask[:, :-1]
+    out[:, :-1] |= mask[:, 1:]
+    return out
+
+
+class NumpyGameLogic(GameLogic):
+    """
+    GameLogic con el tablero en un ndarray uint8.
+
+    Cualquier tablero asignado a ``board`` (por ejemplo una lista de listas)
+    se convierte a ndarray, de modo que el resto del código puede seguir
+    usando ``board[i][j]``.
+    """
+
+    def __init__(self, size=5, seed=None, initialize=True):
+        if np is None:
+            raise ImportError("El motor 'numpy' requiere tener NumPy instalado")
+        super().__init__(size, seed, initialize)
+
+    @property
+    def board(self):
+        return self._board
+
+    @board.setter
+    def board(self, value):
+        self._board = np.array(value, dtype=np.uint8).reshape(self.size, self.size)
+
+    def _reset_board(self):
+        self._board = np.zeros((self.size, self.size), dtype=np.uint8)
+        positions = self.rng.sample(range(self.size * self.size), self.level)
+        self._board.flat[positions] = 1
+
+    def cell(self, i, j):
+        return int(self._board[i, j])
+
+    def row_bytes(self, i):
+        return self._board[i].tobytes()
+
+    def _replace_rows(self, rows):
+        self._board = np.frombuffer(b"".join(rows), dtype=np.uint8).reshape(self.size, self.size).copy()
+
+    def frontier_mask(self):
+        """Máscara de celdas libres a las que el virus puede propagarse."""
+        return neighbor_mask(self._board == 1) & (self._board == 0)
+
+    def rebuild_frontier(self):
+        self._invalidate()
+        board = self._board
+        infected = board == 1
+        free = board == 0
+        self._frontier = set(map(tuple, np.argwhere(neighbor_mask(infected) & free).tolist()))
+        self._active = _IndexedSet()
+        for i, j in np.argwhere(neighbor_mask(free) & infected).tolist():
+            self._active.add((i, j))
+
+    def _infect_all(self, cells):
+        self._record_spread(cells)
+        self._board.flat[np.fromiter(cells, dtype=np.intp, count=len(cells))] = 1
+        self.rebuild_frontier()
+
+    def free_cells(self):
+        return int(np.count_nonzero(self._board == 0))
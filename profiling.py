@@ -0,0 +1,244 @@
+"""
+Módulo profiling.py
+
+Instrumentación opcional de las rutas críticas del juego. Mientras el
+perfilador está activo, los métodos medidos se sustituyen por envoltorios que
+registran número de llamadas, tiempo acumulado y percentiles de latencia, y
+en las búsquedas por inundación también las celdas recorridas. Al
+desactivarlo se restauran los métodos originales, así que no tiene ningún
+coste cuando está apagado.
+
+Clases:
+    CallStats: Estadísticas de un método medido.
+    Profiler: Activa, desactiva y exporta la instrumentación.
+"""
+
+import functools
+import importlib
+import json
+import random
+import time
+
+from engines import ENGINES
+
+# (módulo, clase o None para funciones del módulo, atributo, mide celdas)
+TARGETS = [
+    ("game_logic", "GameLogic", "place_barrier", False),
+    ("game_logic", "GameLogic", "validate_no_islands", True),
+    ("game_logic", "GameLogic", "legal_barrier_cells", False),
+    ("game_logic", "GameLogic", "spread_virus", False),
+    ("game_logic", "GameLogic", "check_win", False),
+    ("game_logic", "GameLogic", "free_cells", False),
+    ("validation", "Validation", "validate_no_islands", True),
+    ("validation", "Validation", "legal_barrier_cells", True),
+    ("file_manager", "FileManager", "save_game", False),
+    ("file_manager", "FileManager", "load_game", False),
+    ("file_handler", "FileHandler", "save_game", False),
+    ("file_handler", "FileHandler", "load_game", False),
+    ("board_codec", None, "encode_game", False),
+    ("board_codec", None, "decode_game", False),
+    ("async_persistence", None, "write_snapshot", False),
+    ("async_persistence", None, "read_game", False),
+]
+
+# Métodos de GameLogic que los motores pueden redefinir.
+ENGINE_METHODS = ("place_barrier", "spread_virus", "check_win", "free_cells")
+
+DEFAULT_MAX_SAMPLES = 100_000
+
+
+class CallStats:
+    """
+    Estadísticas de las llamadas a un método.
+
+    Las latencias se guardan en una muestra de tamaño acotado (muestreo de
+    depósito), suficiente para estimar percentiles en sesiones largas.
+
+    Args:
+        name (str): Nombre del método medido
+        max_samples (int): Tamaño máximo de la muestra de latencias
+        cells (bool): Si el método registra celdas recorridas
+    """
+
+    def __init__(self, name, max_samples=DEFAULT_MAX_SAMPLES, cells=False):
+        self.name = name
+        self.max_samples = max_samples
+        self.calls = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.samples = []
+        self.cells = 0 if cells else None
+        self.max_cells = 0
+        self._rng = random.Random(0)
+
+    def add(self, elapsed, cells=None):
+        self.calls += 1
+        self.total += elapsed
+        if elapsed > self.max:
+            self.max = elapsed
+        if len(self.samples) < self.max_samples:
+            self.samples.append(elapsed)
+        else:
+            k = self._rng.randrange(self.calls)
+            if k < self.max_samples:
+                self.samples[k] = elapsed
+        if cells is not None:
+            self.cells += cells
+            if cells > self.max_cells:
+                self.max_cells = cells
+
+    def as_dict(self):
+        ordered = sorted(self.samples)
+
+        def pct(q):
+            return ordered[min(int(q * len(ordered)), len(ordered) - 1)] * 1000 if ordered else 0.0
+
+        data = {
+            "calls": self.calls,
+            "total_ms": self.total * 1000,
+            "mean_ms": self.total / self.calls * 1000 if self.calls else 0.0,
+            "p50_ms": pct(0.50),
+            "p90_ms": pct(0.90),
+            "p99_ms": pct(0.99),
+            "max_ms": self.max * 1000,
+        }
+        if self.cells is not None:
+            data["cells_visited"] = self.cells
+            data["mean_cells"] = self.cells / self.calls if self.calls else 0.0
+            data["max_cells"] = self.max_cells
+        return data
+
+
+class Profiler:
+    """
+    Perfilador de las rutas críticas de GameLogic, los motores y el guardado.
+
+    Uso:
+        profiler = Profiler()
+        with profiler:
+            ...  # jugar, guardar, cargar
+        print(profiler.report())
+
+    Args:
+        targets (list): Métodos a medir como (módulo, clase, atributo, mide celdas)
+        max_samples (int): Latencias guardadas por método para los percentiles
+    """
+
+    def __init__(self, targets=TARGETS, max_samples=DEFAULT_MAX_SAMPLES):
+        self.targets = list(targets)
+        self.max_samples = max_samples
+        self.stats = {}
+        self.enabled = False
+        self._patched = []
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self.disable()
+
+    def _resolve(self):
+        """Devuelve (propietario, atributo, nombre, mide celdas) de cada objetivo disponible."""
+        resolved = []
+        for module_name, owner_name, attr, cells in self.targets:
+            try:
+                module = importlib.import_module(module_name)
+            except ImportError:
+                continue
+            owner = module if owner_name is None else getattr(module, owner_name)
+            resolved.append((owner, attr, f"{owner_name or module_name}.{attr}", cells))
+        for module_name, class_name in ENGINES.values():
+            try:
+                cls = getattr(importlib.import_module(module_name), class_name)
+            except ImportError:
+                continue
+            for attr in ENGINE_METHODS:
+                if class_name != "GameLogic" and attr in cls.__dict__:
+                    resolved.append((cls, attr, f"{class_name}.{attr}", False))
+        return resolved
+
+    def _wrap(self, func, stat, cells):
+        perf_counter = time.perf_counter
+
+        if cells:
+            @functools.wraps(func)
+            def wrapper(owner, *args, **kwargs):
+                start = perf_counter()
+                try:
+                    return func(owner, *args, **kwargs)
+                finally:
+                    stat.add(perf_counter() - start, getattr(owner, "last_flood_cells", 0))
+        else:
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                start = perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    stat.add(perf_counter() - start)
+        return wrapper
+
+    def enable(self):
+        """Sustituye los métodos medidos por sus envoltorios."""
+        if self.enabled:
+            return
+        for owner, attr, name, cells in self._resolve():
+            original = owner.__dict__.get(attr) if isinstance(owner, type) else getattr(owner, attr)
+            if original is None:
+                continue
+            stat = self.stats.get(name)
+            if stat is None:
+                stat = self.stats[name] = CallStats(name, self.max_samples, cells)
+            setattr(owner, attr, self._wrap(original, stat, cells))
+            self._patched.append((owner, attr, original))
+        self.enabled = True
+
+    def disable(self):
+        """Restaura los métodos originales; las estadísticas se conservan."""
+        for owner, attr, original in reversed(self._patched):
+            setattr(owner, attr, original)
+        self._patched = []
+        self.enabled = False
+
+    def reset(self):
+        """Borra las estadísticas acumuladas."""
+        for name, stat in self.stats.items():
+            self.stats[name] = CallStats(name, self.max_samples, stat.cells is not None)
+        if self.enabled:
+            self.disable()
+            self.enable()
+
+    def as_dict(self):
+        return {name: stat.as_dict() for name, stat in sorted(self.stats.items()) if stat.calls}
+
+    def to_json(self, path=None):
+        """
+        Exporta las estadísticas en JSON.
+
+        Args:
+            path (str): Archivo donde escribirlas (opcional)
+
+        Returns:
+            str: El JSON generado
+        """
+        text = json.dumps(self.as_dict(), indent=2)
+        if path is not None:
+            with open(path, "w") as f:
+                f.write(text + "\n")
+        return text
+
+    def report(self):
+        """Informe de texto ordenado por tiempo acumulado."""
+        rows = sorted(self.as_dict().items(), key=lambda item: item[1]["total_ms"], reverse=True)
+        if not rows:
+            return "Sin llamadas registradas"
+        width = max(len(name) for name, _ in rows)
+        lines = [f"{'método':<{width}}  {'llamadas':>8}  {'total ms':>10}  {'media':>8}  "
+                 f"{'p50':>8}  {'p90':>8}  {'p99':>8}  {'celdas/llamada':>14}"]
+        for name, data in rows:
+            cells = f"{data['mean_cells']:.0f}" if "mean_cells" in data else "-"
+            lines.append(f"{name:<{width}}  {data['calls']:>8}  {data['total_ms']:>10.2f}  "
+                         f"{data['mean_ms']:>8.3f}  {data['p50_ms']:>8.3f}  {data['p90_ms']:>8.3f}  "
+                         f"{data['p99_ms']:>8.3f}  {cells:>14}")
+        return "\n".join(lines)
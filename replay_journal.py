@@ -0,0 +1,462 @@
+"""
+Módulo replay_journal.py
+
+Diario binario de solo escritura al final (append-only) de una partida. Se
+guarda junto a la partida de FileManager (``nombre.vjl`` al lado de
+``nombre.bin``) y registra cada barrera, cada propagación del virus y cada
+reinicio de nivel a partir de los eventos de GameLogic, con unos pocos bytes
+por jugada. Cada K jugadas se escribe un punto de control con la partida
+completa en el formato de board_codec, de modo que para ir a la jugada T basta
+con cargar el punto de control anterior y aplicar unas pocas jugadas.
+
+Formato:
+    cabecera:
+        magic "VGJ", versión (1 byte), tamaño (varint),
+        jugadas entre puntos de control (varint),
+        semilla: indicador (1 byte) y valor en zigzag (varint) si existe
+    registros (tipo en 1 byte seguido de varints):
+        BARRIER celda      barrera colocada (celda = i * size + j)
+        SPREAD celda       propagación del virus
+        CELL celda valor   cambio de celda sin causa de juego (p. ej. deshacer)
+        STATE nivel barreras indicadores
+                           nivel, barreras restantes y barrier_placed
+        CHECKPOINT jugada longitud datos
+                           partida completa (board_codec.encode_game)
+
+Las jugadas son los registros BARRIER, SPREAD y CELL. Un registro incompleto
+al final del archivo (por ejemplo, tras un corte) se ignora al leer.
+
+Clases:
+    ReplayJournal: Suscriptor que escribe el diario de una partida.
+    JournalReader: Lectura, auditoría y búsqueda de jugadas en un diario.
+
+Funciones:
+    encode_varint: Codifica un entero no negativo como varint.
+    decode_varint: Decodifica un varint desde una posición de unos bytes.
+"""
+
+import mmap
+import os
+import threading
+from collections import namedtuple
+
+import board_codec
+from engines import DEFAULT_ENGINE
+from game_logic import CAUSE_BARRIER, CAUSE_LOAD, CAUSE_RESET, CAUSE_SPREAD
+
+MAGIC = b"VGJ"
+VERSION = 1
+JOURNAL_EXT = ".vjl"
+DEFAULT_CHECKPOINT_EVERY = 256
+
+REC_BARRIER = 1
+REC_SPREAD = 2
+REC_CELL = 3
+REC_STATE = 4
+REC_CHECKPOINT = 5
+
+MOVE_RECORDS = (REC_BARRIER, REC_SPREAD, REC_CELL)
+
+JournalRecord = namedtuple("JournalRecord", "offset move kind fields")
+
+
+def encode_varint(value):
+    """Codifica un entero no negativo en 7 bits por byte (LEB128)."""
+    if value < 0:
+        raise ValueError("varint negativo")
+    out = bytearray()
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def decode_varint(data, pos):
+    """
+    Decodifica un varint.
+
+    Args:
+        data (bytes): Datos del diario
+        pos (int): Posición del primer byte del varint
+
+    Returns:
+        tuple: (valor, posición siguiente)
+    """
+    value = 0
+    shift = 0
+    while True:
+        if pos >= len(data):
+            raise EOFError("varint incompleto")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _zigzag(value):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value):
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+
+def _encode_header(size, checkpoint_every, seed):
+    out = bytearray(MAGIC)
+    out.append(VERSION)
+    out += encode_varint(size)
+    out += encode_varint(checkpoint_every)
+    if seed is None:
+        out.append(0)
+    else:
+        out.append(1)
+        out += encode_varint(_zigzag(seed))
+    return bytes(out)
+
+
+def _decode_header(data):
+    """Devuelve (size, checkpoint_every, seed, posición del primer registro)."""
+    if bytes(data[:len(MAGIC)]) != MAGIC or len(data) <= len(MAGIC) or data[len(MAGIC)] != VERSION:
+        raise ValueError("no es un diario de partida")
+    pos = len(MAGIC) + 1
+    size, pos = decode_varint(data, pos)
+    checkpoint_every, pos = decode_varint(data, pos)
+    if pos >= len(data):
+        raise EOFError("cabecera incompleta")
+    has_seed = data[pos]
+    pos += 1
+    seed = None
+    if has_seed:
+        raw, pos = decode_varint(data, pos)
+        seed = _unzigzag(raw)
+    return size, checkpoint_every, seed, pos
+
+
+def _checkpoint_bytes(move, payload):
+    return bytes((REC_CHECKPOINT,)) + encode_varint(move) + encode_varint(len(payload)) + payload
+
+
+def _final_state(reader, source):
+    """Partida codificada al final del diario, con el motor que corresponde a source."""
+    engine = "sparse" if getattr(source, "tile", None) else DEFAULT_ENGINE
+    try:
+        return board_codec.encode_game(reader.seek(reader.moves, engine))
+    except ValueError:
+        return None
+
+
+def _game_state(game):
+    return (game.level, game.barriers_remaining, bool(game.barrier_placed))
+
+
+class ReplayJournal:
+    """
+    Escribe el diario de una partida a medida que se juega.
+
+    Se suscribe a los cambios de celda de la partida y añade al archivo solo
+    los registros de cada lote de cambios (unos pocos bytes por turno). Al
+    abrirse añade un punto de control con el estado actual, así que se puede
+    continuar un diario existente tras cargar la partida guardada. Solo se
+    continúa si el diario termina exactamente en el estado de la partida
+    (las partidas de la interfaz no tienen semilla, así que tamaño y semilla
+    no bastan para reconocerla); si no, se empieza un diario nuevo.
+
+    Con ``snapshot`` (una copia como async_persistence.GameSnapshot) el
+    archivo no se abre en el constructor: los registros se acumulan en
+    memoria hasta que open() (pensado para un hilo de trabajo) escribe el
+    punto de control de la copia y todo lo pendiente.
+
+    Args:
+        path (str): Ruta del archivo de diario
+        game (GameLogic): Partida a registrar (cualquier motor)
+        checkpoint_every (int): Jugadas entre puntos de control
+        snapshot: Copia de la partida para abrir el diario más tarde con open()
+    """
+
+    def __init__(self, path, game, checkpoint_every=DEFAULT_CHECKPOINT_EVERY, snapshot=None):
+        self.path = path
+        self.game = game
+        self.checkpoint_every = max(int(checkpoint_every), 1)
+        self.moves = 0
+        self.file = None
+        self.closed = False
+        self._lock = threading.Lock()
+        self._pending = []
+        self._since_checkpoint = 0
+        self._state = _game_state(game if snapshot is None else snapshot)
+        self._snapshot = snapshot
+        if snapshot is None:
+            self.open()
+        game.subscribe(self._on_changes)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def open(self):
+        """
+        Abre el archivo (continuando el diario si es de la misma partida) y
+        escribe el punto de control inicial y los registros pendientes.
+        """
+        source = self.game if self._snapshot is None else self._snapshot
+        self._snapshot = None
+        payload = board_codec.encode_game(source)
+        base = 0
+        try:
+            reader = JournalReader(self.path)
+            with reader:
+                same_game = ((reader.size, reader.seed) == (source.size, self.game.seed)
+                             and _final_state(reader, source) == payload)
+                base = reader.moves if same_game else 0
+                end = reader.end
+        except (OSError, ValueError, EOFError):
+            same_game = False
+        if same_game:
+            # Se descarta un posible registro incompleto del final.
+            file = open(self.path, "r+b")
+            file.truncate(end)
+            file.seek(end)
+        else:
+            file = open(self.path, "wb")
+            file.write(_encode_header(source.size, self.checkpoint_every, self.game.seed))
+        file.write(_checkpoint_bytes(base, payload))
+        with self._lock:
+            for item in self._pending:
+                file.write(item if isinstance(item, bytes) else _checkpoint_bytes(base + item[0], item[1]))
+            self._pending = []
+            self.moves += base
+            file.flush()
+            if self.closed:
+                # Se cerró mientras se abría en otro hilo.
+                file.close()
+                return
+            self.file = file
+
+    def _checkpoint_record(self):
+        payload = board_codec.encode_game(self.game)
+        self._since_checkpoint = 0
+        self._state = _game_state(self.game)
+        if self.file is None:
+            # Sin archivo todavía se desconoce la jugada inicial: se guarda la relativa.
+            return (self.moves, payload)
+        return _checkpoint_bytes(self.moves, payload)
+
+    def _write(self, data):
+        if self.file is None:
+            self._pending.append(data)
+            return
+        self.file.write(data)
+        self.file.flush()
+
+    def checkpoint(self):
+        """Escribe un punto de control con el estado actual de la partida."""
+        with self._lock:
+            self._write(self._checkpoint_record())
+
+    def _on_changes(self, changes):
+        with self._lock:
+            self._record_changes(changes)
+
+    def _record_changes(self, changes):
+        out = bytearray()
+        size = self.game.size
+        level, barriers, placed = self._state
+        reset = False
+        for change in changes:
+            if change.cause in (CAUSE_RESET, CAUSE_LOAD):
+                reset = True
+                continue
+            cell = encode_varint(change.i * size + change.j)
+            if change.cause == CAUSE_BARRIER:
+                out.append(REC_BARRIER)
+                out += cell
+                barriers -= 1
+                placed = True
+            elif change.cause == CAUSE_SPREAD:
+                out.append(REC_SPREAD)
+                out += cell
+            else:
+                out.append(REC_CELL)
+                out += cell
+                out += encode_varint(change.new)
+            self.moves += 1
+            self._since_checkpoint += 1
+        checkpoint = None
+        if reset or self._since_checkpoint >= self.checkpoint_every:
+            # Un reinicio o una carga reemplazan el tablero: se guarda completo.
+            checkpoint = self._checkpoint_record()
+        elif _game_state(self.game) != (level, barriers, placed):
+            level, barriers, placed = self._state = _game_state(self.game)
+            out.append(REC_STATE)
+            out += encode_varint(level) + encode_varint(barriers) + encode_varint(int(placed))
+        else:
+            self._state = (level, barriers, placed)
+        if out:
+            self._write(bytes(out))
+        if checkpoint is not None:
+            self._write(checkpoint)
+
+    def close(self):
+        self.game.unsubscribe(self._on_changes)
+        with self._lock:
+            self.closed = True
+            if self.file is not None and not self.file.closed:
+                self.file.close()
+
+
+class JournalReader:
+    """
+    Lee un diario de partida con mmap.
+
+    Al abrirlo se recorren los registros una vez (saltando los datos de los
+    puntos de control) para conocer el número de jugadas y la posición de
+    cada punto de control.
+
+    Args:
+        path (str): Ruta del archivo de diario
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError(f"{path} está vacío")
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self.size, self.checkpoint_every, self.seed, self.start = _decode_header(self.mm)
+            self.checkpoints = []
+            self.moves = 0
+            self.end = self.start
+            for record in self.records():
+                if record.kind == REC_CHECKPOINT:
+                    self.checkpoints.append((record.move, record.offset))
+                self.moves = record.move
+        except Exception:
+            self.mm.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.mm.close()
+
+    def _read_record(self, pos, move):
+        """Lee el registro en pos; devuelve (JournalRecord, posición siguiente)."""
+        data = self.mm
+        kind = data[pos]
+        start = pos
+        pos += 1
+        if kind in (REC_BARRIER, REC_SPREAD):
+            cell, pos = decode_varint(data, pos)
+            fields = divmod(cell, self.size)
+            move += 1
+        elif kind == REC_CELL:
+            cell, pos = decode_varint(data, pos)
+            value, pos = decode_varint(data, pos)
+            fields = divmod(cell, self.size) + (value,)
+            move += 1
+        elif kind == REC_STATE:
+            level, pos = decode_varint(data, pos)
+            barriers, pos = decode_varint(data, pos)
+            placed, pos = decode_varint(data, pos)
+            fields = (level, barriers, bool(placed))
+        elif kind == REC_CHECKPOINT:
+            move, pos = decode_varint(data, pos)
+            length, pos = decode_varint(data, pos)
+            if pos + length > len(data):
+                raise EOFError("punto de control incompleto")
+            fields = (pos, length)
+            pos += length
+        else:
+            raise ValueError(f"registro desconocido {kind} en {start}")
+        return JournalRecord(start, move, kind, fields), pos
+
+    def records(self, offset=None, move=0):
+        """
+        Recorre los registros desde ``offset`` (por defecto, el primero).
+
+        Produce JournalRecord(offset, move, kind, fields), donde move es el
+        número de jugadas aplicadas tras el registro. fields es (i, j) para
+        BARRIER y SPREAD, (i, j, valor) para CELL, (nivel, barreras,
+        barrier_placed) para STATE y (posición, longitud) de los datos para
+        CHECKPOINT. La lectura termina en el primer registro incompleto.
+        """
+        pos = self.start if offset is None else offset
+        while pos < len(self.mm):
+            try:
+                record, pos = self._read_record(pos, move)
+            except EOFError:
+                return
+            move = record.move
+            self.end = max(self.end, pos)
+            yield record
+
+    def checkpoint_game(self, record, engine=DEFAULT_ENGINE):
+        """Reconstruye la partida guardada en un registro CHECKPOINT."""
+        pos, length = record.fields
+        return board_codec.decode_game(self.mm[pos:pos + length], engine)
+
+    def seek(self, move, engine=DEFAULT_ENGINE):
+        """
+        Reconstruye la partida tal como estaba tras ``move`` jugadas.
+
+        Carga el último punto de control anterior o igual a ``move`` y aplica
+        las jugadas siguientes hasta llegar a ella.
+
+        Args:
+            move (int): Número de jugadas (0..moves)
+            engine (str): Motor de tablero de la partida devuelta
+
+        Returns:
+            GameLogic: La partida en ese punto
+        """
+        if not 0 <= move <= self.moves:
+            raise ValueError(f"jugada fuera del diario (0..{self.moves})")
+        start_move, offset = max((c for c in self.checkpoints if c[0] <= move), default=(None, None))
+        if offset is None:
+            raise ValueError("el diario no tiene un punto de control inicial")
+        game = None
+        for record in self.records(offset, start_move):
+            if record.kind == REC_CHECKPOINT:
+                if record.move > move:
+                    break
+                game = self.checkpoint_game(record, engine)
+                continue
+            if record.kind in MOVE_RECORDS and record.move > move:
+                break
+            apply_record(game, record)
+        return game
+
+    def replay(self, engine=DEFAULT_ENGINE):
+        """Produce (jugada, partida) tras cada registro, reutilizando la misma partida."""
+        game = None
+        for record in self.records():
+            if record.kind == REC_CHECKPOINT:
+                game = self.checkpoint_game(record, engine)
+            else:
+                apply_record(game, record)
+            yield record.move, game
+
+
+def apply_record(game, record):
+    """Aplica a una partida un registro de jugada o de estado del diario."""
+    if record.kind == REC_BARRIER:
+        game._set_cell(*record.fields, 2, CAUSE_BARRIER)
+        game.barriers_remaining -= 1
+        game.barrier_placed = True
+    elif record.kind == REC_SPREAD:
+        game._set_cell(*record.fields, 1, CAUSE_SPREAD)
+    elif record.kind == REC_CELL:
+        game._set_cell(*record.fields)
+    elif record.kind == REC_STATE:
+        game.level, game.barriers_remaining, game.barrier_placed = record.fields
+    game._flush_changes()
@@ -0,0 +1,175 @@
+"""
+Módulo save_catalog.py
+
+Catálogo de partidas guardadas con los metadatos de su cabecera (tamaño,
+nivel y barreras restantes). Solo se lee la cabecera fija de cada archivo, y
+los resultados se guardan en un archivo índice que se actualiza de forma
+incremental: un archivo se vuelve a leer únicamente si cambió su fecha de
+modificación o su tamaño.
+
+Clases:
+    SaveCatalog: Índice de partidas de un directorio con filtros y orden.
+"""
+
+import json
+import os
+import struct
+
+import board_codec
+
+INDEX_NAME = ".virus_saves.json"
+INDEX_VERSION = 1
+LEGACY_BIN_HEADER = struct.Struct(">HBB")
+LEGACY_VSC_HEADER = struct.Struct(">HB")
+
+
+def read_save_metadata(path, file_size):
+    """
+    Lee los metadatos de una partida a partir de su cabecera.
+
+    Args:
+        path (str): Ruta del archivo (.bin o .vsc)
+        file_size (int): Tamaño del archivo en bytes
+
+    Returns:
+        dict | None: size, level, barriers y format, o None si no se reconoce
+    """
+    with open(path, "rb") as f:
+        head = f.read(board_codec.HEADER.size)
+    header = board_codec.read_header(head)
+    expected = None if header is None else (
+        board_codec.HEADER.size + header.size * board_codec.row_stride(header.size))
+    if file_size == expected:
+        return {"size": header.size, "level": header.level,
+                "barriers": header.barriers, "format": "packed"}
+    if header is not None and header.version == board_codec.TILED_VERSION:
+        return {"size": header.size, "level": header.level,
+                "barriers": header.barriers, "format": "tiled"}
+    if path.endswith(".bin") and len(head) >= LEGACY_BIN_HEADER.size:
+        size, level, barriers = LEGACY_BIN_HEADER.unpack_from(head)
+        return {"size": size, "level": level, "barriers": barriers, "format": "legacy"}
+    if path.endswith(".vsc") and len(head) >= LEGACY_VSC_HEADER.size:
+        size, level = LEGACY_VSC_HEADER.unpack_from(head)
+        return {"size": size, "level": level, "barriers": None, "format": "legacy"}
+    return None
+
+
+class SaveCatalog:
+    """
+    Índice de las partidas guardadas en un directorio.
+
+    Todos los catálogos de un directorio comparten el archivo índice; cada uno
+    solo actualiza y devuelve las entradas de sus extensiones, y conserva las
+    de las demás.
+
+    Args:
+        directory (str): Directorio donde buscar partidas
+        extensions (tuple): Extensiones de archivo a catalogar
+        index_name (str): Nombre del archivo índice dentro del directorio
+    """
+
+    def __init__(self, directory=".", extensions=(".bin", ".vsc"), index_name=INDEX_NAME):
+        self.directory = directory
+        self.extensions = tuple(extensions)
+        self.index_path = os.path.join(directory, index_name)
+        self.entries = {}
+        self._load_index()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path) as f:
+                data = json.load(f)
+            if data.get("version") == INDEX_VERSION:
+                self.entries = data["entries"]
+        except (OSError, ValueError, KeyError):
+            self.entries = {}
+
+    def _save_index(self):
+        tmp_path = self.index_path + ".tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump({"version": INDEX_VERSION, "entries": self.entries}, f)
+            os.replace(tmp_path, self.index_path)
+        except OSError as e:
+            print(f"Error al guardar el índice de partidas: {e}")
+
+    def refresh(self):
+        """
+        Actualiza el índice con los archivos del directorio.
+
+        Solo se leen las cabeceras de los archivos nuevos o modificados
+        (distinta fecha de modificación o tamaño) y se eliminan los borrados.
+        Las entradas de otras extensiones no se tocan.
+
+        Returns:
+            int: Número de archivos que hubo que volver a leer
+        """
+        seen = set()
+        changed = 0
+        removed = False
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if not entry.name.endswith(self.extensions) or not entry.is_file():
+                    continue
+                seen.add(entry.name)
+                st = entry.stat()
+                cached = self.entries.get(entry.name)
+                if cached and cached["mtime_ns"] == st.st_mtime_ns and cached["bytes"] == st.st_size:
+                    continue
+                try:
+                    meta = read_save_metadata(entry.path, st.st_size)
+                except OSError:
+                    meta = None
+                if meta is None:
+                    removed = self.entries.pop(entry.name, None) is not None or removed
+                    continue
+                meta.update(name=entry.name, mtime_ns=st.st_mtime_ns, bytes=st.st_size)
+                self.entries[entry.name] = meta
+                changed += 1
+        for name in list(self.entries):
+            if name.endswith(self.extensions) and name not in seen:
+                del self.entries[name]
+                removed = True
+        if changed or removed:
+            self._save_index()
+        return changed
+
+    def query(self, extension=None, size=None, min_level=None, max_level=None,
+              min_barriers=None, sort_by="name", reverse=False, refresh=True):
+        """
+        Devuelve las partidas que cumplen los filtros indicados.
+
+        Args:
+            extension (str): Solo archivos con esta extensión (".bin" o ".vsc")
+            size (int): Solo tableros de este tamaño
+            min_level (int): Nivel mínimo
+            max_level (int): Nivel máximo
+            min_barriers (int): Barreras restantes mínimas
+            sort_by (str): Campo por el que ordenar (name, size, level, barriers, mtime_ns, bytes)
+            reverse (bool): Orden descendente
+            refresh (bool): Actualizar el índice antes de consultar
+
+        Returns:
+            list: Diccionarios con name, size, level, barriers, format, mtime_ns y bytes
+        """
+        if refresh:
+            self.refresh()
+        result = []
+        for meta in self.entries.values():
+            if not meta["name"].endswith(self.extensions):
+                continue
+            if extension and not meta["name"].endswith(extension):
+                continue
+            if size is not None and meta["size"] != size:
+                continue
+            if min_level is not None and meta["level"] < min_level:
+                continue
+            if max_level is not None and meta["level"] > max_level:
+                continue
+            if min_barriers is not None and (meta["barriers"] or 0) < min_barriers:
+                continue
+            result.append(dict(meta))
+        # Los valores None (barreras de .vsc antiguos) se ordenan al principio.
+        result.sort(key=lambda m: (m[sort_by] is not None, m[sort_by] or 0, m["name"])
+                    if sort_by != "name" else m["name"], reverse=reverse)
+        return result
@@ -0,0 +1,358 @@
+"""
+Módulo server.py
+
+Servidor asyncio sin interfaz gráfica que aloja muchas partidas (sesiones) en
+un mismo proceso. Los clientes se conectan por TCP o por un socket Unix y
+envían una orden JSON por línea; cada orden recibe una respuesta JSON en una
+línea, con el mismo "id" si la orden lo trae.
+
+Órdenes:
+    {"cmd": "new", "size": 8, "seed": 1, "engine": "list", "max_level": 3}
+    {"cmd": "place", "session": "s1", "i": 2, "j": 3}
+    {"cmd": "turn", "session": "s1"}
+    {"cmd": "state", "session": "s1", "board": true}
+    {"cmd": "save", "session": "s1", "filename": "partida"}
+    {"cmd": "load", "filename": "partida", "engine": "list"}
+    {"cmd": "stats", "session": "s1"}
+    {"cmd": "close", "session": "s1"}
+
+Las reglas de turno son las de VirusGameGUI: una barrera por turno, "turn"
+avanza de nivel si el virus quedó contenido y si no lo propaga. Las órdenes
+de una misma sesión se ejecutan de una en una; las de sesiones distintas se
+intercalan. Lo costoso (en tableros grandes, las barreras, los turnos y el
+estado, que recorren el tablero; y guardar o cargar archivos) se ejecuta en
+un ThreadPoolExecutor para no bloquear el bucle de eventos. El número de
+sesiones abiertas está limitado. Cada sesión registra la latencia de sus
+órdenes con profiling.CallStats.
+
+Uso:
+    python server.py --port 8765
+    python server.py --unix /tmp/virus.sock --save-dir partidas
+
+Clases:
+    Session: Una partida alojada en el servidor y sus latencias.
+    GameServer: Sesiones, órdenes y conexiones del servidor.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from async_persistence import GameSnapshot, read_game, write_snapshot
+from board_codec import MAX_SIZE, MAX_STORED_LEVEL
+from engines import DEFAULT_ENGINE, ENGINES, create_game
+from profiling import CallStats
+
+DEFAULT_PORT = 8765
+# Tableros a partir de este número de celdas juegan sus órdenes en el executor.
+OFFLOAD_CELLS = 10_000
+MAX_SESSIONS = 1000
+# Celdas máximas de una partida nueva con un motor denso (el motor "sparse"
+# admite hasta MAX_SIZE, el mayor tamaño que se puede guardar).
+MAX_CELLS = 16_000_000
+SPARSE_ENGINES = ("sparse",)
+MAX_LINE = 1 << 20
+LATENCY_SAMPLES = 1000
+
+
+class CommandError(Exception):
+    """Orden inválida; su mensaje se devuelve al cliente."""
+
+
+class Session:
+    """
+    Una partida alojada en el servidor.
+
+    Args:
+        session_id (str): Identificador de la sesión
+        game (GameLogic): Partida (cualquier motor)
+    """
+
+    __slots__ = ("id", "game", "lock", "latency", "created")
+
+    def __init__(self, session_id, game):
+        self.id = session_id
+        self.game = game
+        self.lock = asyncio.Lock()
+        self.latency = {}
+        self.created = time.time()
+
+    def record(self, command, elapsed):
+        stat = self.latency.get(command)
+        if stat is None:
+            stat = self.latency[command] = CallStats(command, LATENCY_SAMPLES)
+        stat.add(elapsed)
+
+    def state(self, board=False):
+        game = self.game
+        won = game.check_win()
+        data = {
+            "session": self.id,
+            "size": game.size,
+            "level": game.level,
+            "max_level": game.max_level,
+            "barriers_remaining": game.barriers_remaining,
+            "max_barriers": game.max_barriers(),
+            "barrier_placed": game.barrier_placed,
+            "free_cells": game.free_cells(),
+            "contained": won,
+            "lost": game.barriers_remaining <= 0 and not won,
+        }
+        if board:
+            data["board"] = ["".join(map(str, game.row_bytes(i))) for i in range(game.size)]
+        return data
+
+
+class GameServer:
+    """
+    Servidor de partidas con un protocolo de líneas JSON.
+
+    Args:
+        engine (str): Motor por defecto de las partidas nuevas
+        save_dir (str): Carpeta donde se guardan y de donde se cargan las partidas
+        workers (int): Hilos del executor para las operaciones costosas
+        offload_cells (int): Celdas a partir de las cuales las órdenes de una partida se hacen en el executor
+        max_cells (int): Celdas máximas de una partida nueva con un motor denso
+        max_sessions (int): Sesiones abiertas a la vez como máximo
+    """
+
+    def __init__(self, engine=DEFAULT_ENGINE, save_dir=".", workers=None, offload_cells=OFFLOAD_CELLS,
+                 max_cells=MAX_CELLS, max_sessions=MAX_SESSIONS):
+        self.engine = engine
+        self.save_dir = save_dir
+        self.offload_cells = offload_cells
+        self.max_cells = max_cells
+        self.max_sessions = max_sessions
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="server")
+        self.sessions = {}
+        self._ids = itertools.count(1)
+        self.commands = {
+            "new": self.cmd_new,
+            "place": self.cmd_place,
+            "turn": self.cmd_turn,
+            "state": self.cmd_state,
+            "save": self.cmd_save,
+            "load": self.cmd_load,
+            "stats": self.cmd_stats,
+            "close": self.cmd_close,
+        }
+
+    def _check_capacity(self):
+        if len(self.sessions) >= self.max_sessions:
+            raise CommandError(f"Demasiadas sesiones abiertas (máximo {self.max_sessions})")
+
+    def _new_session(self, game):
+        # Se vuelve a comprobar: otra orden pudo abrir una sesión mientras se creaba esta partida.
+        self._check_capacity()
+        session = Session(f"s{next(self._ids)}", game)
+        self.sessions[session.id] = session
+        return session
+
+    def _session(self, request):
+        session = self.sessions.get(request.get("session"))
+        if session is None:
+            raise CommandError("Sesión desconocida")
+        return session
+
+    def _path(self, request):
+        filename = request.get("filename")
+        if not isinstance(filename, str) or not filename or os.path.basename(filename) != filename:
+            raise CommandError("Nombre de archivo inválido")
+        return os.path.join(self.save_dir, filename)
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def _call(self, game, func, *args):
+        """Ejecuta func en el executor si el tablero de game es grande, o aquí mismo si no."""
+        if game.size * game.size >= self.offload_cells:
+            return await self._run(func, *args)
+        return func(*args)
+
+    async def cmd_new(self, request):
+        engine = request.get("engine", self.engine)
+        if engine not in ENGINES:
+            raise CommandError(f"Motor desconocido: {engine!r}")
+        size = request.get("size", 5)
+        if not isinstance(size, int) or isinstance(size, bool) or not 2 <= size <= MAX_SIZE:
+            raise CommandError(f"Tamaño inválido (de 2 a {MAX_SIZE})")
+        if engine not in SPARSE_ENGINES and size * size > self.max_cells:
+            raise CommandError(f"Tablero demasiado grande para el motor {engine!r}"
+                               f" (máximo {self.max_cells} celdas; use el motor \"sparse\")")
+        max_level = request.get("max_level")
+        if max_level is not None and (not isinstance(max_level, int) or isinstance(max_level, bool)
+                                      or not 1 <= max_level <= MAX_STORED_LEVEL):
+            raise CommandError(f"max_level debe ser un entero de 1 a {MAX_STORED_LEVEL}")
+        self._check_capacity()
+        game = await self._run(lambda: create_game(size, engine, seed=request.get("seed")))
+        if max_level is not None:
+            game.max_level = max_level
+        session = self._new_session(game)
+        return await self._call(game, session.state)
+
+    async def cmd_place(self, request, session):
+        game = session.game
+        try:
+            i, j = int(request["i"]), int(request["j"])
+        except (KeyError, TypeError, ValueError):
+            raise CommandError("Faltan las coordenadas i, j")
+        if not (0 <= i < game.size and 0 <= j < game.size):
+            raise CommandError("Celda fuera del tablero")
+        if game.barrier_placed:
+            raise CommandError("Solo 1 barrera por turno")
+
+        def place():
+            if not game.place_barrier(i, j):
+                return None
+            return session.state()
+
+        data = await self._call(game, place)
+        if data is None:
+            raise CommandError("Sin barreras disponibles" if game.barriers_remaining <= 0
+                               else "Ubicación inválida")
+        return data
+
+    async def cmd_turn(self, request, session):
+        return await self._call(session.game, self._turn, session)
+
+    @staticmethod
+    def _turn(session):
+        # Avanzar o reiniciar un nivel y el estado recorren el tablero.
+        game = session.game
+        game.barrier_placed = False
+        if game.check_win():
+            advanced = game.advance_level()
+            return {**session.state(), "event": "level" if advanced else "won"}
+        spread = game.spread_virus()
+        return {**session.state(), "event": "spread" if spread else "idle"}
+
+    async def cmd_state(self, request, session):
+        return await self._call(session.game, session.state, bool(request.get("board")))
+
+    async def cmd_save(self, request, session):
+        path = self._path(request)
+        # La copia se hace con la sesión bloqueada, así que no cambia a medias.
+        game = session.game
+        await self._run(lambda: write_snapshot(GameSnapshot(game), f"{path}.bin"))
+        return {"session": session.id, "saved": request["filename"]}
+
+    async def cmd_load(self, request):
+        path = self._path(request)
+        engine = request.get("engine", self.engine)
+        if engine not in ENGINES:
+            raise CommandError(f"Motor desconocido: {engine!r}")
+        self._check_capacity()
+        try:
+            game = await self._run(read_game, f"{path}.bin", engine)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"No se pudo cargar: {e}")
+        session = self._new_session(game)
+        return await self._call(game, session.state)
+
+    async def cmd_stats(self, request, session):
+        return {"session": session.id,
+                "latency": {name: stat.as_dict() for name, stat in sorted(session.latency.items())}}
+
+    async def cmd_close(self, request, session):
+        del self.sessions[session.id]
+        return {"session": session.id, "closed": True}
+
+    async def handle(self, request):
+        """
+        Ejecuta una orden y devuelve la respuesta.
+
+        Args:
+            request (dict): Orden decodificada
+
+        Returns:
+            dict: Respuesta con "ok" y los datos de la orden, o "error"
+        """
+        response = {"id": request["id"]} if "id" in request else {}
+        command = self.commands.get(request.get("cmd"))
+        if command is None:
+            return {**response, "ok": False, "error": f"Orden desconocida: {request.get('cmd')!r}"}
+        start = time.perf_counter()
+        session = None
+        try:
+            if command in (self.cmd_new, self.cmd_load):
+                data = await command(request)
+                session = self.sessions.get(data.get("session"))
+            else:
+                session = self._session(request)
+                async with session.lock:
+                    data = await command(request, session)
+        except CommandError as e:
+            return {**response, "ok": False, "error": str(e)}
+        except Exception as e:
+            print(f"Error en la orden {request.get('cmd')}: {str(e)}")
+            return {**response, "ok": False, "error": str(e)}
+        finally:
+            if session is not None:
+                session.record(request["cmd"], time.perf_counter() - start)
+        return {**response, "ok": True, **data}
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break
+                if not line:
+                    break
+                try:
+                    request = json.loads(line)
+                    if not isinstance(request, dict):
+                        raise ValueError("se esperaba un objeto")
+                except ValueError as e:
+                    response = {"ok": False, "error": f"JSON inválido: {e}"}
+                else:
+                    response = await self.handle(request)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host="127.0.0.1", port=DEFAULT_PORT, unix_path=None):
+        """Acepta conexiones hasta que se cancele la tarea."""
+        if unix_path is not None:
+            server = await asyncio.start_unix_server(self.handle_client, unix_path, limit=MAX_LINE)
+        else:
+            server = await asyncio.start_server(self.handle_client, host, port, limit=MAX_LINE)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown(wait=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de partidas del juego de virus")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", help="Ruta de un socket Unix en lugar de TCP")
+    parser.add_argument("--engine", choices=sorted(ENGINES), default=DEFAULT_ENGINE)
+    parser.add_argument("--save-dir", default=".")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--max-cells", type=int, default=MAX_CELLS,
+                        help="Celdas máximas de una partida nueva con un motor denso")
+    parser.add_argument("--max-sessions", type=int, default=MAX_SESSIONS,
+                        help="Sesiones abiertas a la vez como máximo")
+    args = parser.parse_args(argv)
+
+    server = GameServer(args.engine, args.save_dir, args.workers, max_cells=args.max_cells,
+                        max_sessions=args.max_sessions)
+    try:
+        asyncio.run(server.serve(args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,318 @@
+"""
+Módulo simulation.py
+
+Simulación por lotes de partidas sin interfaz gráfica. Sirve para ajustar la
+fórmula de max_barriers y el valor de max_level jugando muchas partidas con
+políticas automáticas de colocación de barreras.
+
+Cada partida usa su propio random.Random sembrado a partir de la semilla del
+lote y del índice de la partida, así que los resultados son reproducibles sin
+importar cuántos procesos se usen. Las partidas se reparten en bloques entre
+un ProcessPoolExecutor y cada bloque devuelve solo estadísticas agregadas y,
+si se pide, los estados finales comprimidos para un game_archive.GameArchive
+(que se escriben en el orden de las partidas).
+
+Clases:
+    SimulationStats: Acumula victorias, derrotas y turnos de muchas partidas.
+
+Funciones:
+    play_game: Juega una partida completa con una política.
+    iter_simulation: Ejecuta un lote y produce las estadísticas acumuladas por bloque.
+    run_simulation: Ejecuta un lote y devuelve las estadísticas finales.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from engines import DEFAULT_ENGINE, get_engine
+
+
+def policy_none(game):
+    """No coloca barreras: el virus se propaga libremente."""
+    return None
+
+
+def policy_random(game):
+    """Coloca la barrera en una celda válida elegida al azar."""
+    legal = sorted(game.legal_barrier_cells())
+    return game.rng.choice(legal) if legal else None
+
+
+def policy_frontier(game):
+    """Bloquea una celda de la frontera del virus si es posible; si no, juega al azar."""
+    legal = game.legal_barrier_cells()
+    blocking = sorted(cell for cell in game.frontier_cells() if cell in legal)
+    if blocking:
+        return game.rng.choice(blocking)
+    return policy_random(game)
+
+
+SOLVER_NODES = 200
+
+
+def policy_solver(game):
+    """Coloca la barrera que elige solver.Solver con un presupuesto fijo de simulaciones."""
+    from solver import Solver
+    # Sin límite de tiempo y con la semilla tomada de la partida, el resultado es reproducible.
+    result = Solver(seed=game.rng.getrandbits(64)).solve(game, time_limit=None, max_nodes=SOLVER_NODES)
+    return result.move
+
+
+POLICIES = {
+    "none": policy_none,
+    "random": policy_random,
+    "frontier": policy_frontier,
+    "solver": policy_solver,
+}
+
+
+class SimulationStats:
+    """
+    Estadísticas agregadas de un lote de partidas.
+
+    Solo guarda contadores enteros, de modo que combinar bloques en cualquier
+    orden produce exactamente el mismo resultado.
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.wins = 0
+        self.losses = 0
+        self.total_turns = 0
+        self.min_turns = None
+        self.max_turns = None
+        self.levels = {}
+
+    def add(self, won, level, turns):
+        """Registra el resultado de una partida."""
+        self.games += 1
+        if won:
+            self.wins += 1
+        else:
+            self.losses += 1
+        self.total_turns += turns
+        self.min_turns = turns if self.min_turns is None else min(self.min_turns, turns)
+        self.max_turns = turns if self.max_turns is None else max(self.max_turns, turns)
+        self.levels[level] = self.levels.get(level, 0) + 1
+
+    def merge(self, other):
+        """Combina las estadísticas de otro bloque con estas."""
+        self.games += other.games
+        self.wins += other.wins
+        self.losses += other.losses
+        self.total_turns += other.total_turns
+        for attr, pick in (("min_turns", min), ("max_turns", max)):
+            mine, theirs = getattr(self, attr), getattr(other, attr)
+            if theirs is not None:
+                setattr(self, attr, theirs if mine is None else pick(mine, theirs))
+        for level, count in other.levels.items():
+            self.levels[level] = self.levels.get(level, 0) + count
+
+    def as_dict(self):
+        return {
+            "games": self.games,
+            "wins": self.wins,
+            "losses": self.losses,
+            "win_rate": self.wins / self.games if self.games else 0.0,
+            "mean_turns": self.total_turns / self.games if self.games else 0.0,
+            "min_turns": self.min_turns,
+            "max_turns": self.max_turns,
+            "levels_reached": {str(level): self.levels[level] for level in sorted(self.levels)},
+        }
+
+
+def game_seed(seed, index):
+    """
+    Semilla de la partida ``index`` dentro de un lote sembrado con ``seed``.
+
+    Se obtiene de un hash de (seed, index), así que lotes con semillas
+    distintas (también negativas, que random.Random tomaría en valor
+    absoluto) no comparten partidas por mucho que crezca ``index``.
+    """
+    return int.from_bytes(hashlib.blake2b(f"{seed}:{index}".encode(), digest_size=8).digest(), "big")
+
+
+def play_game(size, seed, policy="frontier", engine=DEFAULT_ENGINE, max_level=3,
+              barrier_formula=None, on_end=None):
+    """
+    Juega una partida completa siguiendo las reglas de VirusGameGUI.
+
+    Cada turno la política puede colocar una barrera; después, si el virus ya
+    no puede propagarse se avanza de nivel (o se gana la partida) y si no, el
+    virus se propaga. Se pierde al gastar la última barrera sin contenerlo.
+
+    Args:
+        size (int): Tamaño del tablero
+        seed (int): Semilla del random.Random de la partida
+        policy (str): Nombre de la política en POLICIES
+        engine (str): Motor de tablero (ver engines.py)
+        max_level (int): Último nivel de la partida
+        barrier_formula (callable): Función opcional (size, level) -> barreras
+            que sustituye a GameLogic.max_barriers
+        on_end (callable): Función opcional llamada con la partida al terminar
+
+    Returns:
+        tuple: (ganada, nivel alcanzado, turnos jugados)
+    """
+    cls = get_engine(engine)
+    if barrier_formula is not None:
+        cls = type(cls.__name__, (cls,), {
+            "max_barriers": lambda self: barrier_formula(self.size, self.level),
+        })
+    game = cls(size, seed=seed)
+    game.max_level = max_level
+    choose = POLICIES[policy]
+    turns = 0
+    while True:
+        move = choose(game)
+        if move is not None and game.place_barrier(*move) and game.check_loss():
+            result = (False, game.level, turns)
+            break
+        game.barrier_placed = False
+        turns += 1
+        if game.check_win():
+            if not game.advance_level():
+                result = (True, game.level, turns)
+                break
+            continue
+        game.spread_virus()
+    if on_end is not None:
+        on_end(game)
+    return result
+
+
+def _play_block(start, count, seed, options, keep_states=False):
+    """
+    Juega las partidas [start, start + count).
+
+    Returns:
+        tuple: (SimulationStats, estados finales comprimidos o None)
+    """
+    stats = SimulationStats()
+    states = [] if keep_states else None
+    on_end = None
+    if keep_states:
+        from game_archive import compress_game
+
+        def on_end(game):
+            states.append(compress_game(game))
+    for index in range(start, start + count):
+        stats.add(*play_game(seed=game_seed(seed, index), on_end=on_end, **options))
+    return stats, states
+
+
+def iter_simulation(games, size=8, policy="frontier", seed=0, workers=None,
+                    block_size=64, engine=DEFAULT_ENGINE, max_level=3, barrier_formula=None,
+                    archive=None):
+    """
+    Ejecuta un lote de partidas y produce las estadísticas acumuladas.
+
+    Los bloques se envían al ProcessPoolExecutor de forma acotada (como mucho
+    dos por proceso a la vez), así la memoria no crece con ``games``. Con
+    ``workers=0`` todo se ejecuta en el proceso actual.
+
+    Args:
+        games (int): Número de partidas
+        size (int): Tamaño del tablero
+        policy (str): Nombre de la política en POLICIES
+        seed (int): Semilla del lote
+        workers (int): Procesos a usar (None = todos los núcleos)
+        block_size (int): Partidas por bloque
+        engine (str): Motor de tablero
+        max_level (int): Último nivel de cada partida
+        barrier_formula (callable): Fórmula de barreras a nivel de módulo (debe poder serializarse)
+        archive (GameArchive): Archivo abierto para escritura donde añadir el
+            estado final de cada partida, en el orden de las partidas
+
+    Yields:
+        SimulationStats: Estadísticas acumuladas tras cada bloque terminado
+    """
+    if policy not in POLICIES:
+        raise ValueError(f"Política desconocida: {policy!r}")
+    options = {"size": size, "policy": policy, "engine": engine,
+               "max_level": max_level, "barrier_formula": barrier_formula}
+    blocks = ((start, min(block_size, games - start)) for start in range(0, games, block_size))
+    keep = archive is not None
+    total = SimulationStats()
+    # Estados de los bloques terminados antes que alguno anterior, por inicio de bloque.
+    finished = {}
+    next_start = 0
+
+    def merge(start, result):
+        nonlocal next_start
+        stats, states = result
+        total.merge(stats)
+        if keep:
+            finished[start] = states
+            while next_start in finished:
+                states = finished.pop(next_start)
+                for blob in states:
+                    archive.append_compressed(blob)
+                next_start += len(states)
+
+    if workers == 0:
+        for start, count in blocks:
+            merge(start, _play_block(start, count, seed, options, keep))
+            yield total
+        return
+
+    limit = 2 * (workers or os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        for start, count in blocks:
+            pending[pool.submit(_play_block, start, count, seed, options, keep)] = start
+            if len(pending) >= limit:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    merge(pending.pop(future), future.result())
+                    yield total
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                merge(pending.pop(future), future.result())
+                yield total
+
+
+def run_simulation(games, **kwargs):
+    """
+    Ejecuta un lote de partidas y devuelve las estadísticas finales.
+
+    Acepta los mismos argumentos que iter_simulation.
+
+    Returns:
+        SimulationStats: Estadísticas de todas las partidas
+    """
+    stats = SimulationStats()
+    for stats in iter_simulation(games, **kwargs):
+        pass
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Simulación por lotes del juego de virus")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--size", type=int, default=8)
+    parser.add_argument("--policy", choices=sorted(POLICIES), default="frontier")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--engine", default=DEFAULT_ENGINE)
+    parser.add_argument("--max-level", type=int, default=3)
+    parser.add_argument("--archive", help="Archivo .vga donde guardar el estado final de cada partida")
+    args = parser.parse_args(argv)
+
+    options = {"size": args.size, "policy": args.policy, "seed": args.seed, "workers": args.workers,
+               "engine": args.engine, "max_level": args.max_level}
+    if args.archive:
+        from game_archive import GameArchive
+        with GameArchive(args.archive, "w") as archive:
+            stats = run_simulation(args.games, archive=archive, **options)
+    else:
+        stats = run_simulation(args.games, **options)
+    print(json.dumps(stats.as_dict(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,517 @@
+"""
+Módulo solver.py
+
+Búsqueda de la mejor barrera para el estado actual de una partida mediante
+Monte Carlo Tree Search (MCTS) sobre la propagación aleatoria del virus.
+
+Cada turno del árbol sigue las reglas de VirusGameGUI: el jugador coloca una
+barrera en una celda válida (o pasa), se pierde si no quedan barreras y el
+virus aún puede propagarse, se gana cuando el virus queda contenido y, si no,
+el virus se propaga con la misma distribución que GameLogic.spread_virus. El
+valor de una partida ganada es la fracción de celdas libres que se salvan
+respecto al estado inicial; una derrota vale 0.
+
+El estado de búsqueda es un bytearray plano con las celdas del tablero. Las
+posiciones se identifican con un hash de Zobrist que se actualiza en cada
+cambio de celda, y las estadísticas de cada posición se guardan en una tabla
+de transposición acotada con expulsión LRU, así una posición a la que se llega
+por distintos caminos no se vuelve a evaluar.
+
+Clases:
+    SearchState: Estado compacto del tablero con frontera y hash incrementales.
+    Solver: MCTS con tabla de transposición y presupuesto de tiempo o nodos.
+
+Funciones:
+    solve: Atajo para buscar la mejor barrera de una partida.
+    parallel_solve: Reparte los movimientos de la raíz entre varios procesos.
+"""
+
+import math
+import multiprocessing
+import os
+import queue
+import random
+import time
+from collections import OrderedDict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from game_logic import _IndexedSet
+from validation import Validation
+
+_validator = Validation()
+
+DEFAULT_TABLE_SIZE = 100_000
+DEFAULT_EXPLORATION = 1.4
+ZOBRIST_SEED = 0x5A0B
+# parallel_solve: cada proceso envía sus estadísticas tras cada tramo de búsqueda.
+UPDATE_INTERVAL = 0.1
+MIN_SLICE = 0.01
+# Fracción del plazo que busca el proceso principal si no llega ningún resultado.
+FALLBACK_FRACTION = 0.5
+
+SolverResult = namedtuple("SolverResult", "move win_probability value playouts elapsed scores")
+
+_neighbor_cache = {}
+_zobrist_cache = {}
+
+
+def _neighbors(size):
+    """Vecinos ortogonales de cada celda del tablero plano (cacheado por tamaño)."""
+    table = _neighbor_cache.get(size)
+    if table is None:
+        table = []
+        for k in range(size * size):
+            i, j = divmod(k, size)
+            adjacent = []
+            if i > 0:
+                adjacent.append(k - size)
+            if i < size - 1:
+                adjacent.append(k + size)
+            if j > 0:
+                adjacent.append(k - 1)
+            if j < size - 1:
+                adjacent.append(k + 1)
+            table.append(tuple(adjacent))
+        _neighbor_cache[size] = table
+    return table
+
+
+def _zobrist(size):
+    """Claves de Zobrist por celda para los estados virus (1) y barrera (2)."""
+    table = _zobrist_cache.get(size)
+    if table is None:
+        rng = random.Random(ZOBRIST_SEED ^ size)
+        table = [(0, rng.getrandbits(64), rng.getrandbits(64)) for _ in range(size * size)]
+        _zobrist_cache[size] = table
+    return table
+
+
+class SearchState:
+    """
+    Estado compacto de una partida para la búsqueda.
+
+    Args:
+        size (int): Tamaño del tablero
+        cells (bytes): size * size celdas con los valores 0/1/2
+        barriers (int): Barreras restantes
+    """
+
+    __slots__ = ("size", "cells", "barriers", "hash", "free", "frontier", "active",
+                 "_neighbors", "_zobrist")
+
+    def __init__(self, size, cells, barriers):
+        self.size = size
+        self.cells = bytearray(cells)
+        self.barriers = barriers
+        self._neighbors = _neighbors(size)
+        self._zobrist = _zobrist(size)
+        self.hash = 0
+        for k, cell in enumerate(self.cells):
+            if cell:
+                self.hash ^= self._zobrist[k][cell]
+        self.free = self.cells.count(0)
+        self.frontier = _IndexedSet()
+        self.active = _IndexedSet()
+        k = -1
+        while True:
+            k = self.cells.find(1, k + 1)
+            if k < 0:
+                break
+            self._refresh(k)
+            for w in self._neighbors[k]:
+                self._refresh(w)
+
+    @classmethod
+    def from_game(cls, game):
+        """Crea el estado de búsqueda a partir de una partida (cualquier motor)."""
+        cells = b"".join(game.row_bytes(i) for i in range(game.size))
+        return cls(game.size, cells, game.barriers_remaining)
+
+    def encode(self):
+        """Codificación compacta: barreras (4 bytes) seguidas de las celdas."""
+        return self.barriers.to_bytes(4, "big") + bytes(self.cells)
+
+    @classmethod
+    def decode(cls, size, data):
+        return cls(size, data[4:], int.from_bytes(data[:4], "big"))
+
+    def copy(self):
+        other = object.__new__(SearchState)
+        other.size = self.size
+        other.cells = bytearray(self.cells)
+        other.barriers = self.barriers
+        other.hash = self.hash
+        other.free = self.free
+        other._neighbors = self._neighbors
+        other._zobrist = self._zobrist
+        other.frontier = _IndexedSet()
+        other.frontier.items = list(self.frontier.items)
+        other.frontier.index = dict(self.frontier.index)
+        other.active = _IndexedSet()
+        other.active.items = list(self.active.items)
+        other.active.index = dict(self.active.index)
+        return other
+
+    def key(self):
+        return (self.hash, self.barriers)
+
+    def _refresh(self, k):
+        cell = self.cells[k]
+        target = 1 if cell == 0 else 0 if cell == 1 else None
+        touches = target is not None and any(self.cells[w] == target for w in self._neighbors[k])
+        if cell == 0 and touches:
+            self.frontier.add(k)
+        else:
+            self.frontier.discard(k)
+        if cell == 1 and touches:
+            self.active.add(k)
+        else:
+            self.active.discard(k)
+
+    def set(self, k, value):
+        old = self.cells[k]
+        self.hash ^= self._zobrist[k][old] ^ self._zobrist[k][value]
+        self.free += (value == 0) - (old == 0)
+        self.cells[k] = value
+        self._refresh(k)
+        for w in self._neighbors[k]:
+            self._refresh(w)
+
+    def is_win(self):
+        return not self.frontier
+
+    def is_loss(self):
+        return self.barriers <= 0 and bool(self.frontier)
+
+    def legal_moves(self):
+        """Celdas (índices planos) donde la regla de no crear islas permite una barrera."""
+        size = self.size
+        rows = [self.cells[start:start + size] for start in range(0, size * size, size)]
+        return {i * size + j for i, j in _validator.legal_barrier_cells(rows, size)}
+
+    def candidate_moves(self):
+        """Pasar (None) y las celdas válidas a distancia 2 o menos del virus."""
+        moves = [None]
+        if self.barriers > 0:
+            near = set()
+            for k in self.frontier.items:
+                near.add(k)
+                near.update(self._neighbors[k])
+            moves += sorted(near & self.legal_moves())
+        return moves
+
+    def place(self, k):
+        self.set(k, 2)
+        self.barriers -= 1
+
+    def spread(self, rng):
+        """Propaga el virus como GameLogic.spread_virus."""
+        if not self.active:
+            return False
+        k = self.active.choice(rng)
+        free = [w for w in self._neighbors[k] if self.cells[w] == 0]
+        self.set(free[rng.randrange(len(free))], 1)
+        return True
+
+
+class Solver:
+    """
+    MCTS con tabla de transposición para elegir dónde colocar la barrera.
+
+    Los movimientos candidatos de cada posición son pasar y las celdas válidas
+    a distancia 2 o menos del virus (las demás no cambian el próximo turno).
+    Las simulaciones desde una posición nueva bloquean una celda de la
+    frontera al azar cada turno, como la política "frontier" de simulation.py,
+    sin comprobar la regla de islas para que sean rápidas.
+
+    Args:
+        table_size (int): Número máximo de posiciones en la tabla de transposición
+        exploration (float): Constante de exploración de UCB1
+        seed (int): Semilla del random.Random de la búsqueda
+    """
+
+    def __init__(self, table_size=DEFAULT_TABLE_SIZE, exploration=DEFAULT_EXPLORATION, seed=None):
+        self.table_size = table_size
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.table = OrderedDict()
+        self.hits = 0
+
+    def _lookup(self, key):
+        entry = self.table.get(key)
+        if entry is not None:
+            self.table.move_to_end(key)
+            self.hits += 1
+        return entry
+
+    def _expand(self, key, state):
+        moves = state.candidate_moves()
+        # entrada: [visitas, movimientos, {movimiento: [visitas, valor total, victorias]}]
+        entry = [0, moves, {}]
+        self.table[key] = entry
+        if len(self.table) > self.table_size:
+            self.table.popitem(last=False)
+        return entry
+
+    def _select(self, entry):
+        visits, moves, stats = entry
+        untried = [move for move in moves if move not in stats]
+        if untried:
+            move = untried[self.rng.randrange(len(untried))]
+            stats[move] = [0, 0.0, 0]
+            return move
+        log_n = math.log(visits)
+        c = self.exploration
+        return max(moves, key=lambda m: stats[m][1] / stats[m][0] + c * math.sqrt(log_n / stats[m][0]))
+
+    def _turn(self, state, move):
+        """Aplica la barrera (o el pase) y, si la partida sigue, propaga el virus."""
+        if move is not None:
+            state.place(move)
+        if not state.is_win() and not state.is_loss():
+            state.spread(self.rng)
+
+    def _outcome(self, state, root_free):
+        """(valor, ganada) de un estado terminal, o None si la partida sigue."""
+        if state.is_win():
+            return state.free / root_free if root_free else 1.0, True
+        if state.is_loss():
+            return 0.0, False
+        return None
+
+    def _rollout(self, state, root_free):
+        rng = self.rng
+        while True:
+            outcome = self._outcome(state, root_free)
+            if outcome is not None:
+                return outcome
+            state.place(state.frontier.choice(rng))
+            if not state.is_win() and not state.is_loss():
+                state.spread(rng)
+
+    def search(self, root, time_limit=1.0, max_nodes=None, root_moves=None, stats=None):
+        """
+        Ejecuta simulaciones desde un estado hasta agotar el presupuesto.
+
+        Args:
+            root (SearchState): Estado inicial
+            time_limit (float): Segundos de búsqueda (None = sin límite de tiempo)
+            max_nodes (int): Número máximo de simulaciones (None = sin límite)
+            root_moves (list): Restringe los movimientos de la raíz (índices planos o None)
+            stats (dict): Estadísticas de la raíz de una búsqueda anterior desde el
+                mismo estado, que se continúa (se actualizan en el sitio)
+
+        Returns:
+            dict: {movimiento: [visitas, valor total, victorias]} de la raíz
+        """
+        if time_limit is None and max_nodes is None:
+            raise ValueError("hace falta un límite de tiempo o de nodos")
+        root_free = root.free
+        stats = {} if stats is None else stats
+        root_entry = [sum(stat[0] for stat in stats.values()), None, stats]
+        if root.is_win() or root.is_loss():
+            return root_entry[2]
+        key = root.key()
+        full = self._lookup(key) or self._expand(key, root)
+        root_entry[1] = full[1] if root_moves is None else list(root_moves)
+        deadline = None if time_limit is None else time.perf_counter() + time_limit
+        playouts = 0
+        while (max_nodes is None or playouts < max_nodes) and (
+                deadline is None or time.perf_counter() < deadline):
+            playouts += 1
+            state = root.copy()
+            entry = root_entry
+            path = []
+            while True:
+                outcome = self._outcome(state, root_free) if path else None
+                if outcome is not None:
+                    break
+                if entry is None:
+                    key = state.key()
+                    entry = self._lookup(key)
+                    if entry is None:
+                        self._expand(key, state)
+                        outcome = self._rollout(state, root_free)
+                        break
+                move = self._select(entry)
+                path.append((entry, move))
+                self._turn(state, move)
+                entry = None
+            value, won = outcome
+            for entry, move in path:
+                entry[0] += 1
+                stat = entry[2][move]
+                stat[0] += 1
+                stat[1] += value
+                stat[2] += won
+        return root_entry[2]
+
+    def solve(self, game, time_limit=1.0, max_nodes=None):
+        """
+        Busca la mejor barrera para el estado actual de una partida.
+
+        Args:
+            game (GameLogic): Partida a analizar (no se modifica)
+            time_limit (float): Segundos de búsqueda (None = sin límite de tiempo)
+            max_nodes (int): Número máximo de simulaciones (None = sin límite)
+
+        Returns:
+            SolverResult: Mejor celda (i, j) o None para pasar, probabilidad
+            estimada de contener el virus, valor medio (fracción de celdas
+            salvadas), simulaciones, segundos y estadísticas de cada movimiento
+        """
+        start = time.perf_counter()
+        root = SearchState.from_game(game)
+        stats = self.search(root, time_limit, max_nodes)
+        return make_result(stats, game.size, time.perf_counter() - start)
+
+
+def make_result(stats, size, elapsed, by_value=False):
+    """
+    Construye un SolverResult a partir de las estadísticas de la raíz.
+
+    Por defecto elige el movimiento más visitado. Con by_value elige el de
+    mayor valor medio entre los que tienen al menos una cuarta parte de las
+    visitas medias, porque las visitas de búsquedas separadas no son comparables.
+    """
+    scores = {}
+    for move, (visits, total, wins) in stats.items():
+        cell = None if move is None else divmod(move, size)
+        scores[cell] = (visits, total / visits if visits else 0.0, wins / visits if visits else 0.0)
+    if not scores:
+        return SolverResult(None, 0.0, 0.0, 0, elapsed, scores)
+    if by_value:
+        threshold = sum(s[0] for s in scores.values()) / len(scores) / 4
+        candidates = [cell for cell in scores if scores[cell][0] >= threshold] or list(scores)
+        best = max(candidates, key=lambda cell: (scores[cell][1], scores[cell][0]))
+    else:
+        best = max(scores, key=lambda cell: (scores[cell][0], scores[cell][1]))
+    visits, value, win_rate = scores[best]
+    playouts = sum(s[0] for s in scores.values())
+    return SolverResult(best, win_rate, value, playouts, elapsed, scores)
+
+
+def solve(game, time_limit=1.0, max_nodes=None, seed=None):
+    """Busca la mejor barrera para una partida con un Solver nuevo."""
+    return Solver(seed=seed).solve(game, time_limit, max_nodes)
+
+
+_worker_root = None
+_worker_updates = None
+
+
+def _init_worker(size, encoded, updates):
+    """Inicializador de los procesos: decodifica una vez el tablero compartido."""
+    global _worker_root, _worker_updates
+    _worker_root = SearchState.decode(size, encoded)
+    _worker_updates = updates
+    # Los resultados que nadie lea tras el plazo no deben bloquear la salida del proceso.
+    updates.cancel_join_thread()
+
+
+def _search_moves(part, moves, deadline, max_nodes, seed):
+    """
+    Busca desde la raíz del proceso restringida a ``moves`` por tramos de
+    UPDATE_INTERVAL segundos y envía las estadísticas tras cada tramo.
+
+    ``deadline`` es una hora de time.time(), comparable entre procesos.
+    """
+    solver = Solver(seed=seed)
+    stats = {}
+    while True:
+        slice_limit = None
+        if deadline is not None:
+            remaining = deadline - time.time()
+            if remaining <= MIN_SLICE:
+                break
+            slice_limit = min(UPDATE_INTERVAL, remaining - MIN_SLICE)
+        elif max_nodes is not None:
+            slice_limit = UPDATE_INTERVAL
+        nodes = None if max_nodes is None else max_nodes - sum(stat[0] for stat in stats.values())
+        solver.search(_worker_root, slice_limit, nodes, root_moves=moves, stats=stats)
+        finished = max_nodes is not None and sum(stat[0] for stat in stats.values()) >= max_nodes
+        _worker_updates.put((part, {move: list(stat) for move, stat in stats.items()}, finished))
+        if finished:
+            return
+    _worker_updates.put((part, {move: list(stat) for move, stat in stats.items()}, True))
+
+
+def parallel_solve(game, time_limit=1.0, max_nodes=None, workers=None, seed=None, on_update=None):
+    """
+    Busca la mejor barrera repartiendo los movimientos de la raíz entre procesos.
+
+    Cada proceso recibe una sola vez el tablero codificado (SearchState.encode)
+    en su inicializador y busca con su propio árbol sobre una parte de los
+    movimientos candidatos, enviando sus estadísticas por una cola cada
+    UPDATE_INTERVAL segundos. Los resultados parciales se combinan según
+    llegan; al vencer el plazo se devuelve la última combinación y, si no
+    llegó ninguna (arrancar los procesos puede costar más que el plazo en
+    tableros grandes), se busca en este proceso durante FALLBACK_FRACTION del
+    plazo, para no devolver "sin barrera" por falta de resultados.
+
+    Args:
+        game (GameLogic): Partida a analizar (no se modifica)
+        time_limit (float): Plazo total en segundos (None = sin límite de tiempo)
+        max_nodes (int): Simulaciones totales, repartidas según los movimientos de cada parte
+        workers (int): Procesos a usar (None = todos los núcleos)
+        seed (int): Semilla de las búsquedas
+        on_update (callable): Función llamada con el SolverResult parcial tras cada envío
+
+    Returns:
+        SolverResult: Resultado combinado (elegido por valor medio)
+    """
+    if time_limit is None and max_nodes is None:
+        raise ValueError("hace falta un límite de tiempo o de nodos")
+    start = time.perf_counter()
+    deadline = None if time_limit is None else start + time_limit
+    root = SearchState.from_game(game)
+    moves = root.candidate_moves() if not (root.is_win() or root.is_loss()) else []
+    workers = max(1, min(workers or os.cpu_count() or 1, len(moves) or 1))
+    # Reparto intercalado para que cada parte tenga celdas de todas las zonas.
+    parts = [moves[w::workers] for w in range(workers) if moves[w::workers]]
+    seeds = random.Random(seed)
+    latest = {}
+    result = make_result({}, game.size, 0.0, by_value=True)
+    if not parts:
+        return result
+
+    updates = multiprocessing.Queue()
+    pool = ProcessPoolExecutor(max_workers=len(parts), initializer=_init_worker,
+                               initargs=(game.size, root.encode(), updates))
+    try:
+        wall_deadline = None if deadline is None else time.time() + (deadline - time.perf_counter())
+        futures = [pool.submit(_search_moves, index, part, wall_deadline,
+                               None if max_nodes is None else max(1, max_nodes * len(part) // len(moves)),
+                               seeds.getrandbits(64))
+                   for index, part in enumerate(parts)]
+        finished = set()
+        while len(finished) < len(parts):
+            wait = UPDATE_INTERVAL if deadline is None else min(deadline - time.perf_counter(), UPDATE_INTERVAL)
+            if wait <= 0:
+                break
+            try:
+                part, stats, done = updates.get(timeout=wait)
+            except queue.Empty:
+                for future in futures:
+                    if future.done() and future.exception() is not None:
+                        raise future.exception()
+                continue
+            latest[part] = stats
+            if done:
+                finished.add(part)
+            merged = {}
+            # En orden de partes, para que los empates no dependan de qué proceso llegó antes.
+            for index in sorted(latest):
+                merged.update(latest[index])
+            result = make_result(merged, game.size, time.perf_counter() - start, by_value=True)
+            if on_update is not None:
+                on_update(result)
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+        updates.close()
+        updates.cancel_join_thread()
+    if not latest:
+        fallback = Solver(seed=seeds.getrandbits(64)).search(
+            root, None if time_limit is None else time_limit * FALLBACK_FRACTION, max_nodes)
+        result = make_result(fallback, game.size, time.perf_counter() - start)
+    return result
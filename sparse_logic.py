@@ -0,0 +1,520 @@
+"""
+Módulo sparse_logic.py
+
+Motor de GameLogic para tableros muy grandes y casi vacíos. El tablero se
+divide en teselas cuadradas de TILE x TILE celdas y solo se guardan las
+teselas con alguna celda infectada o bloqueada; las teselas completamente
+libres no ocupan memoria. Las infecciones iniciales se eligen muestreando
+índices de un range, sin construir la lista de celdas.
+
+Las celdas válidas para una barrera se calculan sobre un grafo contraído:
+las teselas guardadas y sus vecinas se analizan celda a celda, y cada zona
+conexa del resto de teselas (libres y lejos del virus) se reduce a un único
+nodo. Esas zonas se obtienen por tramos de teselas en cada fila, así que el
+coste crece con la región activa y no con el área del tablero. Ninguna celda
+de una zona contraída puede dejar aislada ninguna celda: una tesela de al
+menos 4 x 4 celdas libres sigue conexa sin una de ellas, y sus vecinas
+(también libres) quedan unidas a ella por más de una celda.
+
+El guardado usa el formato por teselas de board_codec (encode_tiled), que
+solo escribe las teselas guardadas.
+
+Clases:
+    SparseGameLogic: GameLogic con el tablero en teselas dispersas.
+"""
+
+import bisect
+
+from game_logic import CAUSE_LOAD, CAUSE_SPREAD, CellChange, DIRECTIONS, GameLogic, _IndexedSet
+
+TILE = 32
+# Ancho mínimo de una tesela para poder contraerla (ver el docstring del módulo).
+MIN_TILE = 4
+
+
+def tile_side(size, tile=TILE):
+    """
+    Lado de tesela para un tablero: el mayor, hasta ``tile``, cuyas teselas
+    del borde tengan al menos MIN_TILE celdas de ancho.
+
+    Args:
+        size (int): Tamaño del tablero
+        tile (int): Lado de tesela preferido
+
+    Returns:
+        int: Lado de tesela (size si el tablero cabe en una sola)
+    """
+    if size <= tile:
+        return size
+    for side in range(tile, MIN_TILE - 1, -1):
+        if size % side == 0 or size % side >= MIN_TILE:
+            return side
+    return size
+
+
+class _SparseBoard:
+    """Vista de solo lectura ``board[i][j]`` sobre una SparseGameLogic."""
+
+    __slots__ = ("game",)
+
+    def __init__(self, game):
+        self.game = game
+
+    def __len__(self):
+        return self.game.size
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.game.size
+        if not 0 <= i < self.game.size:
+            raise IndexError("fila fuera del tablero")
+        return self.game.row_bytes(i)
+
+    def __iter__(self):
+        for i in range(self.game.size):
+            yield self.game.row_bytes(i)
+
+
+class _SparseLegalCells:
+    """
+    Conjunto de celdas válidas para una barrera de una SparseGameLogic.
+
+    Las de las teselas analizadas se guardan explícitamente; las de las zonas
+    contraídas son todas válidas y solo se enumeran al recorrer el conjunto.
+    """
+
+    __slots__ = ("game", "detailed", "cells", "contracted_cells")
+
+    def __init__(self, game, detailed, cells, contracted_cells):
+        self.game = game
+        self.detailed = detailed
+        self.cells = cells
+        self.contracted_cells = contracted_cells
+
+    def __contains__(self, cell):
+        i, j = cell
+        game = self.game
+        if not (0 <= i < game.size and 0 <= j < game.size):
+            return False
+        if game._tile_id(i, j) in self.detailed:
+            return cell in self.cells
+        return True
+
+    def __len__(self):
+        return len(self.cells) + self.contracted_cells
+
+    def __iter__(self):
+        yield from sorted(self.cells)
+        game, t, n = self.game, self.game.tile, self.game.tiles_per_side
+        for ti in range(n):
+            for tj in range(n):
+                if ti * n + tj in self.detailed:
+                    continue
+                for i in range(ti * t, min(ti * t + t, game.size)):
+                    for j in range(tj * t, min(tj * t + t, game.size)):
+                        yield (i, j)
+
+
+class SparseGameLogic(GameLogic):
+    """
+    GameLogic con el tablero en teselas dispersas.
+
+    Args:
+        size (int): Tamaño del tablero
+        seed (int): Semilla del random.Random de la partida
+        tile (int): Lado de tesela preferido (ver tile_side)
+        initialize (bool): Si se prepara el primer nivel (ver GameLogic)
+    """
+
+    __slots__ = ("tile", "tiles_per_side", "_tiles", "_counts", "_filled")
+
+    def __init__(self, size=5, seed=None, tile=TILE, initialize=True):
+        self.tile = tile_side(size, tile)
+        self.tiles_per_side = -(-size // self.tile)
+        self._tiles = {}
+        self._counts = {}
+        self._filled = 0
+        super().__init__(size, seed, initialize)
+
+    @property
+    def board(self):
+        return _SparseBoard(self)
+
+    def _tile_id(self, i, j):
+        return (i // self.tile) * self.tiles_per_side + j // self.tile
+
+    def _tile_bounds(self, q):
+        """Filas y columnas [i0, i1) x [j0, j1) de la tesela q."""
+        ti, tj = divmod(q, self.tiles_per_side)
+        t = self.tile
+        return ti * t, min(ti * t + t, self.size), tj * t, min(tj * t + t, self.size)
+
+    def cell(self, i, j):
+        t = self.tile
+        tile = self._tiles.get((i // t) * self.tiles_per_side + j // t)
+        return 0 if tile is None else tile[(i % t) * t + j % t]
+
+    def _store(self, i, j, value):
+        """Escribe una celda; las teselas que quedan libres se descartan."""
+        t = self.tile
+        q = (i // t) * self.tiles_per_side + j // t
+        tile = self._tiles.get(q)
+        if tile is None:
+            if value == 0:
+                return
+            tile = self._tiles[q] = bytearray(t * t)
+            self._counts[q] = 0
+        k = (i % t) * t + j % t
+        delta = (value != 0) - (tile[k] != 0)
+        tile[k] = value
+        if delta:
+            self._filled += delta
+            self._counts[q] += delta
+            if not self._counts[q]:
+                del self._tiles[q], self._counts[q]
+
+    def _reset_board(self):
+        self._tiles = {}
+        self._counts = {}
+        self._filled = 0
+        for k in self.rng.sample(range(self.size * self.size), self.level):
+            self._store(*divmod(k, self.size), 1)
+
+    def row_bytes(self, i):
+        t, n = self.tile, self.tiles_per_side
+        row = bytearray(self.size)
+        ti, r = divmod(i, t)
+        for tj in range(n):
+            tile = self._tiles.get(ti * n + tj)
+            if tile is not None:
+                width = min(t, self.size - tj * t)
+                row[tj * t:tj * t + width] = tile[r * t:r * t + width]
+        return bytes(row)
+
+    def stored_tiles(self):
+        """
+        Teselas guardadas, en orden.
+
+        Yields:
+            tuple: (fila de tesela, columna de tesela, tile * tile bytes 0/1/2)
+        """
+        for q in sorted(self._tiles):
+            yield (*divmod(q, self.tiles_per_side), bytes(self._tiles[q]))
+
+    def load_tiles(self, tiles):
+        """
+        Reemplaza el tablero por teselas y recalcula la frontera.
+
+        Args:
+            tiles (dict): (fila de tesela, columna de tesela) -> tile * tile bytes
+        """
+        before = self._snapshot_rows()
+        self._tiles = {}
+        self._counts = {}
+        self._filled = 0
+        t = self.tile
+        for (ti, tj), cells in tiles.items():
+            for r in range(min(t, self.size - ti * t)):
+                for c in range(min(t, self.size - tj * t)):
+                    if cells[r * t + c]:
+                        self._store(ti * t + r, tj * t + c, cells[r * t + c])
+        self.rebuild_frontier()
+        self._record_rows(before, CAUSE_LOAD)
+
+    def _replace_rows(self, rows):
+        self._tiles = {}
+        self._counts = {}
+        self._filled = 0
+        for i, row in enumerate(rows):
+            row = bytes(row)
+            if not row.strip(b"\x00"):
+                continue
+            for j, value in enumerate(row):
+                if value:
+                    self._store(i, j, value)
+
+    def _snapshot_rows(self):
+        # Copia de las teselas en lugar de las filas: crece con la región ocupada.
+        if not self._subscribers:
+            return None
+        return {q: bytes(tile) for q, tile in self._tiles.items()}
+
+    def _record_rows(self, before, cause):
+        if before is not None:
+            t = self.tile
+            empty = bytes(t * t)
+            for q in sorted(set(before) | set(self._tiles)):
+                old = before.get(q, empty)
+                new = bytes(self._tiles.get(q, empty))
+                if old == new:
+                    continue
+                i0, i1, j0, j1 = self._tile_bounds(q)
+                for i in range(i0, i1):
+                    for j in range(j0, j1):
+                        k = (i - i0) * t + j - j0
+                        if old[k] != new[k]:
+                            self._pending.append(CellChange(i, j, old[k], new[k], cause))
+        self._flush_changes()
+
+    def rebuild_frontier(self):
+        self._invalidate()
+        self._frontier = set()
+        self._active = _IndexedSet()
+        # En orden de filas, como GameLogic, para que la elección al azar coincida.
+        infected = []
+        for q, tile in self._tiles.items():
+            i0, i1, j0, j1 = self._tile_bounds(q)
+            k = tile.find(1)
+            while k >= 0:
+                r, c = divmod(k, self.tile)
+                infected.append((i0 + r, j0 + c))
+                k = tile.find(1, k + 1)
+        for i, j in sorted(infected):
+            self._refresh_cell(i, j)
+            for dx, dy in DIRECTIONS:
+                ni, nj = i + dx, j + dy
+                if 0 <= ni < self.size and 0 <= nj < self.size:
+                    self._refresh_cell(ni, nj)
+
+    def _refresh_cell(self, i, j):
+        cell = self.cell(i, j)
+        target = 1 if cell == 0 else 0 if cell == 1 else None
+        touches = False
+        if target is not None:
+            for dx, dy in DIRECTIONS:
+                ni, nj = i + dx, j + dy
+                if 0 <= ni < self.size and 0 <= nj < self.size and self.cell(ni, nj) == target:
+                    touches = True
+                    break
+        if cell == 0 and touches:
+            self._frontier.add((i, j))
+        else:
+            self._frontier.discard((i, j))
+        if cell == 1 and touches:
+            self._active.add((i, j))
+        else:
+            self._active.discard((i, j))
+
+    def _write_cell(self, i, j, value):
+        self._store(i, j, value)
+        self._refresh_cell(i, j)
+        for dx, dy in DIRECTIONS:
+            ni, nj = i + dx, j + dy
+            if 0 <= ni < self.size and 0 <= nj < self.size:
+                self._refresh_cell(ni, nj)
+
+    def spread_virus(self):
+        # Igual que GameLogic.spread_virus, leyendo las celdas de las teselas.
+        if not self._active:
+            return False
+        x, y = self._active.choice(self.rng)
+        for dx, dy in self.rng.sample(DIRECTIONS, 4):
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < self.size and 0 <= ny < self.size and self.cell(nx, ny) == 0:
+                self._set_cell(nx, ny, 1, CAUSE_SPREAD)
+                self._flush_changes()
+                return True
+        return False
+
+    def free_cells(self):
+        return self.size * self.size - self._filled
+
+    def fast_forward(self, turns=None):
+        """
+        Como GameLogic.fast_forward, pero con turns=None el virus se extiende
+        por oleadas desde la frontera en lugar de usar el mapa de distancias,
+        que ocuparía size * size enteros. Cada oleada infecta la frontera
+        actual, así que la memoria extra crece con la frontera y no con el área.
+        """
+        if turns is not None:
+            return super().fast_forward(turns)
+        self.barrier_placed = False
+        self._distance = None
+        infected = 0
+        with self.batch():
+            while self._frontier:
+                for i, j in sorted(self._frontier):
+                    self._set_cell(i, j, 1, CAUSE_SPREAD)
+                    infected += 1
+        return infected
+
+    def legal_barrier_cells(self):
+        """Celdas válidas para una barrera; se recalcula solo tras un cambio del tablero."""
+        if self._legal_cache is None:
+            self._legal_cache = self._analyze()
+        return self._legal_cache
+
+    def validate_no_islands(self, i, j):
+        """Verifica que una barrera en la celda libre (i, j) no cree una isla nueva."""
+        return (i, j) in self.legal_barrier_cells()
+
+    def _contracted_zones(self, detailed):
+        """
+        Zonas conexas de las teselas no analizadas, por tramos de teselas.
+
+        Args:
+            detailed (set): Teselas analizadas celda a celda
+
+        Returns:
+            tuple: (función (fila, columna de tesela) -> zona, conjunto de zonas)
+        """
+        n = self.tiles_per_side
+        by_row = {}
+        for q in detailed:
+            by_row.setdefault(q // n, []).append(q % n)
+        parent = []
+
+        def find(x):
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        def new_node():
+            parent.append(len(parent))
+            return len(parent) - 1
+
+        # Tramos libres de cada fila con teselas analizadas: (inicios, finales, nodos).
+        runs = {}
+        for ti, cols in by_row.items():
+            cols.sort()
+            starts, ends, nodes = [], [], []
+            start = 0
+            for tj in cols + [n]:
+                if tj > start:
+                    starts.append(start)
+                    ends.append(tj)
+                    nodes.append(new_node())
+                start = tj + 1
+            runs[ti] = (starts, ends, nodes)
+        # Bandas de filas sin teselas analizadas: cada una es un único nodo.
+        bands = []
+        previous = -1
+        for ti in sorted(runs) + [n]:
+            if ti > previous + 1:
+                bands.append((previous + 1, ti, new_node()))
+            previous = ti
+        band_starts = [start for start, _, _ in bands]
+
+        def band_node(ti):
+            k = bisect.bisect_right(band_starts, ti) - 1
+            if k >= 0 and bands[k][0] <= ti < bands[k][1]:
+                return bands[k][2]
+            return None
+
+        for ti, (starts, ends, nodes) in runs.items():
+            for neighbor in (ti - 1, ti + 1):
+                band = band_node(neighbor) if 0 <= neighbor < n else None
+                if band is not None:
+                    for node in nodes:
+                        parent[find(node)] = find(band)
+            below = runs.get(ti + 1)
+            if below is None:
+                continue
+            a = b = 0
+            while a < len(starts) and b < len(below[0]):
+                if starts[a] < below[1][b] and below[0][b] < ends[a]:
+                    parent[find(nodes[a])] = find(below[2][b])
+                if ends[a] < below[1][b]:
+                    a += 1
+                else:
+                    b += 1
+
+        def zone(ti, tj):
+            row = runs.get(ti)
+            if row is None:
+                return find(band_node(ti))
+            k = bisect.bisect_right(row[0], tj) - 1
+            return find(row[2][k])
+
+        return zone, {find(x) for x in range(len(parent))}
+
+    def _analyze(self):
+        """Calcula las celdas válidas sobre el grafo contraído (ver el docstring del módulo)."""
+        size, t, n = self.size, self.tile, self.tiles_per_side
+        detailed = set()
+        for q in self._tiles:
+            ti, tj = divmod(q, n)
+            detailed.add(q)
+            for dx, dy in DIRECTIONS:
+                if 0 <= ti + dx < n and 0 <= tj + dy < n:
+                    detailed.add((ti + dx) * n + tj + dy)
+        zone, zone_keys = self._contracted_zones(detailed)
+
+        # Grafo: la raíz (el virus), las celdas libres de las teselas analizadas
+        # y, a continuación, un nodo por zona contraída.
+        free = {}
+        cell = self.cell
+        for q in detailed:
+            i0, i1, j0, j1 = self._tile_bounds(q)
+            for i in range(i0, i1):
+                for j in range(j0, j1):
+                    if cell(i, j) == 0:
+                        free[(i, j)] = len(free) + 1
+        first_zone = len(free) + 1
+        zones = {key: first_zone + k for k, key in enumerate(sorted(zone_keys))}
+        neighbors = [[] for _ in range(first_zone + len(zones))]
+        for (i, j), v in free.items():
+            for dx, dy in DIRECTIONS:
+                ni, nj = i + dx, j + dy
+                if not (0 <= ni < size and 0 <= nj < size):
+                    continue
+                if (ni // t) * n + nj // t in detailed:
+                    w = 0 if cell(ni, nj) == 1 else free.get((ni, nj))
+                else:
+                    w = zones[zone(ni // t, nj // t)]
+                if w is not None and w not in neighbors[v]:
+                    neighbors[v].append(w)
+                    if w == 0 or w >= first_zone:
+                        neighbors[w].append(v)
+        contracted_cells = size * size - sum(
+            (i1 - i0) * (j1 - j0) for i0, i1, j0, j1 in map(self._tile_bounds, detailed))
+
+        cut, visited = _articulation(neighbors, 0)
+        self.last_flood_cells = visited - 1
+
+        # Una celda solo es inválida si al quitarla alguna celda alcanzable
+        # desde el virus deja de serlo.
+        legal = {pos for pos, v in free.items() if not cut[v]}
+        return _SparseLegalCells(self, detailed, legal, contracted_cells)
+
+
+def _articulation(neighbors, root):
+    """
+    Puntos de articulación alcanzables desde un nodo raíz (DFS iterativo de
+    Tarjan, como Validation.legal_barrier_cells). La raíz nunca se marca: en
+    el análisis es un nodo virtual que representa al virus.
+
+    Args:
+        neighbors (list): Lista de adyacencia por nodo
+        root (int): Nodo desde el que se recorre el grafo
+
+    Returns:
+        tuple: (bytearray de cortes, nodos visitados)
+    """
+    total = len(neighbors)
+    disc = [0] * total
+    low = [0] * total
+    cut = bytearray(total)
+    disc[root] = low[root] = 1
+    timer = 2
+    stack = [(root, -1, iter(neighbors[root]))]
+    while stack:
+        v, parent, edges = stack[-1]
+        for w in edges:
+            if not disc[w]:
+                disc[w] = low[w] = timer
+                timer += 1
+                stack.append((w, v, iter(neighbors[w])))
+                break
+            if w != parent and disc[w] < low[v]:
+                low[v] = disc[w]
+        else:
+            stack.pop()
+            if stack:
+                p = stack[-1][0]
+                if low[v] < low[p]:
+                    low[p] = low[v]
+                if p != root and low[v] >= disc[p]:
+                    cut[p] = 1
+    return cut, timer - 1
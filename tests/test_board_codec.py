@@ -0,0 +1,116 @@
+"""
+Pruebas del formato empaquetado (versión 2) de board_codec y de su lectura
+desde FileManager, async_persistence y MappedBoard.
+"""
+
+import os
+import random
+import tempfile
+import unittest
+
+import board_codec
+from async_persistence import GameSnapshot, read_game, write_snapshot
+from engines import ENGINES, create_game
+from file_manager import FileManager
+from mapped_board import MappedBoard
+
+
+def played_game(size, engine, seed):
+    game = create_game(size, engine, seed=seed)
+    rng = random.Random(seed)
+    for _ in range(size):
+        game.spread_virus()
+        legal = sorted(pos for pos in game.legal_barrier_cells() if game.cell(*pos) == 0)
+        if legal:
+            game.place_barrier(*rng.choice(legal))
+    game.level = 2
+    game.max_level = 5
+    return game
+
+
+def same_game(test, a, b):
+    test.assertEqual(a.size, b.size)
+    test.assertEqual([bytes(a.row_bytes(i)) for i in range(a.size)],
+                     [bytes(b.row_bytes(i)) for i in range(b.size)])
+    for field in ("level", "max_level", "barriers_remaining", "barrier_placed"):
+        test.assertEqual(getattr(a, field), getattr(b, field), field)
+    test.assertEqual(sorted(a.frontier_cells()), sorted(b.frontier_cells()))
+
+
+class PackRowsTest(unittest.TestCase):
+    def test_round_trip(self):
+        rng = random.Random(1)
+        for size in (1, 4, 5, 6, 11, 64):
+            rows = [bytes(rng.randrange(3) for _ in range(size)) for _ in range(size)]
+            data = board_codec.pack_rows(rows, size)
+            self.assertEqual(len(data), size * board_codec.row_stride(size))
+            self.assertEqual(board_codec.unpack_rows(data, size), rows)
+
+    def test_rejects_invalid_cells(self):
+        with self.assertRaises(ValueError):
+            board_codec.pack_rows([b"\x00\x03"], 2)
+        with self.assertRaises(ValueError):
+            board_codec.unpack_rows(b"\xff", 5)
+
+
+class PackedGameTest(unittest.TestCase):
+    def test_round_trip_all_engines(self):
+        for name in ENGINES:
+            if name == "sparse":
+                continue
+            game = played_game(9, name, seed=4)
+            data = board_codec.encode_game(game)
+            self.assertTrue(board_codec.is_packed(data))
+            header = board_codec.read_header(data)
+            self.assertEqual((header.version, header.size, header.level, header.max_level),
+                             (board_codec.VERSION, 9, 2, 5))
+            for target in ENGINES:
+                with self.subTest(source=name, target=target):
+                    same_game(self, board_codec.decode_game(data, target), game)
+
+    def test_rejects_truncated_data(self):
+        data = board_codec.encode_game(create_game(7, seed=1))
+        self.assertFalse(board_codec.is_packed(data[:-1]))
+        with self.assertRaises(ValueError):
+            board_codec.decode_game(data[:-1])
+
+    def test_file_round_trips(self):
+        game = played_game(12, "list", seed=2)
+        with tempfile.TemporaryDirectory() as workdir:
+            name = os.path.join(workdir, "partida")
+            self.assertTrue(FileManager.save_game(game, name))
+            same_game(self, FileManager.load_game(name), game)
+
+            write_snapshot(GameSnapshot(game), f"{name}.bin", rows_per_chunk=5)
+            same_game(self, read_game(f"{name}.bin", rows_per_chunk=5), game)
+
+            with MappedBoard(f"{name}.bin", writable=False) as board:
+                self.assertEqual([bytes(board[i]) for i in range(board.size)],
+                                 [bytes(game.row_bytes(i)) for i in range(game.size)])
+                self.assertEqual(board.max_level, game.max_level)
+
+    def test_save_rows_in_place(self):
+        game = played_game(12, "list", seed=3)
+        with tempfile.TemporaryDirectory() as workdir:
+            name = os.path.join(workdir, "partida")
+            FileManager.save_game(game, name)
+            frontier = sorted(game.frontier_cells())
+            game._set_cell(*frontier[0], 1)
+            game.barriers_remaining -= 1
+            self.assertTrue(FileManager.save_rows(game, name, [frontier[0][0]]))
+            same_game(self, FileManager.load_game(name), game)
+            self.assertFalse(FileManager.save_rows(create_game(5), name, [0]))
+
+    def test_read_only_mapped_row(self):
+        with tempfile.TemporaryDirectory() as workdir:
+            name = os.path.join(workdir, "partida")
+            FileManager.save_game(create_game(6, seed=1), name)
+            with MappedBoard(f"{name}.bin", writable=False) as board:
+                value = board[0][0]
+                with self.assertRaises(ValueError):
+                    board[0][0] = 2 if value != 2 else 0
+                self.assertEqual(board[0][0], value)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Pruebas del mapa de distancias incremental: tras colocar barreras y propagar
+el virus debe coincidir con el recalculado desde cero, y las celdas cuya
+distancia cambia deben aparecer en ChangeBatch.distance_changed.
+"""
+
+import random
+import unittest
+
+from engines import ENGINES, create_game
+from game_logic import BLOCKED, UNREACHABLE, distance_field
+
+
+def full_field(game):
+    cells = b"".join(game.row_bytes(i) for i in range(game.size))
+    return list(distance_field(cells, game.size))
+
+
+class DistanceFieldTest(unittest.TestCase):
+    def test_values(self):
+        # Virus en la esquina y una pared que encierra la última columna.
+        cells = bytes([1, 0, 2, 0,
+                       0, 0, 2, 0,
+                       0, 0, 2, 0,
+                       0, 0, 2, 0])
+        self.assertEqual(list(distance_field(cells, 4)),
+                         [0, 1, BLOCKED, UNREACHABLE,
+                          1, 2, BLOCKED, UNREACHABLE,
+                          2, 3, BLOCKED, UNREACHABLE,
+                          3, 4, BLOCKED, UNREACHABLE])
+
+
+class IncrementalDistanceTest(unittest.TestCase):
+    def check_engine(self, engine, size, seed):
+        game = create_game(size, engine, seed=seed)
+        game.barriers_remaining = size * size
+        batches = []
+        game.subscribe(batches.append)
+        rng = random.Random(seed)
+        previous = list(game.distance_map())
+        for step in range(size * 4):
+            del batches[:]
+            if rng.random() < 0.7:
+                game.place_barrier(rng.randrange(size), rng.randrange(size))
+            else:
+                game.spread_virus()
+            current = list(game.distance_map())
+            self.assertEqual(current, full_field(game), (engine, seed, step))
+            changed = {k for k in range(size * size) if current[k] != previous[k]}
+            for batch in batches:
+                if batch.distance_changed is None:
+                    break
+                changed -= batch.distance_changed
+            else:
+                self.assertFalse(changed, (engine, seed, step))
+            previous = current
+
+    def test_engines(self):
+        for engine in ENGINES:
+            for seed in range(3):
+                with self.subTest(engine=engine, seed=seed):
+                    self.check_engine(engine, 9 + seed, seed)
+
+
+if __name__ == "__main__":
+    unittest.main()
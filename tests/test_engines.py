@@ -0,0 +1,109 @@
+"""
+Equivalencia entre motores: con el mismo tablero, todos los motores deben
+dar las mismas celdas, frontera, celdas válidas y mapa de distancias, y
+terminar igual tras la misma secuencia de jugadas.
+"""
+
+import random
+import unittest
+
+from engines import ENGINES, create_game
+
+
+def random_rows(size, seed):
+    """Filas con unas pocas infecciones y barreras al azar."""
+    rng = random.Random(seed)
+    rows = [bytearray(size) for _ in range(size)]
+    for _ in range(1 + seed % 3):
+        rows[rng.randrange(size)][rng.randrange(size)] = 1
+    for _ in range(size * size // 5):
+        i, j = rng.randrange(size), rng.randrange(size)
+        if rows[i][j] == 0:
+            rows[i][j] = 2
+    return [bytes(row) for row in rows]
+
+
+def snapshot(game):
+    return {
+        "rows": [bytes(game.row_bytes(i)) for i in range(game.size)],
+        "free": game.free_cells(),
+        "frontier": sorted(game.frontier_cells()),
+        "won": game.check_win(),
+        "barriers": game.barriers_remaining,
+        "level": game.level,
+    }
+
+
+def play(game, seed, turns):
+    """Jugadas deterministas: una barrera válida y una infección por turno."""
+    rng = random.Random(seed)
+    states = [snapshot(game)]
+    for _ in range(turns):
+        legal = sorted(pos for pos in game.legal_barrier_cells() if game.cell(*pos) == 0)
+        if legal and game.barriers_remaining > 0:
+            game.place_barrier(*rng.choice(legal))
+        frontier = sorted(game.frontier_cells())
+        if frontier:
+            game._set_cell(*rng.choice(frontier), 1)
+            game._flush_changes()
+        game.barrier_placed = False
+        states.append(snapshot(game))
+    return states
+
+
+class EngineEquivalenceTest(unittest.TestCase):
+    def engines(self, size, rows):
+        games = {}
+        for name in ENGINES:
+            game = create_game(size, name, seed=0)
+            game.load_rows(rows)
+            games[name] = game
+        return games
+
+    def test_same_state_after_load(self):
+        for seed in range(10):
+            size = 5 + seed
+            games = self.engines(size, random_rows(size, seed))
+            reference = games.pop("list")
+            for name, game in games.items():
+                with self.subTest(engine=name, seed=seed):
+                    self.assertEqual(snapshot(game), snapshot(reference))
+                    self.assertEqual(set(game.legal_barrier_cells()), set(reference.legal_barrier_cells()))
+                    self.assertEqual(list(game.distance_map()), list(reference.distance_map()))
+
+    def test_same_games(self):
+        for seed in range(6):
+            size = 6 + seed
+            games = self.engines(size, random_rows(size, seed))
+            reference = play(games.pop("list"), seed, 12)
+            for name, game in games.items():
+                with self.subTest(engine=name, seed=seed):
+                    self.assertEqual(play(game, seed, 12), reference)
+
+    def test_fast_forward(self):
+        for seed in range(6):
+            size = 8 + seed
+            games = self.engines(size, random_rows(size, seed))
+            infected = {name: game.fast_forward() for name, game in games.items()}
+            reference = snapshot(games["list"])
+            for name, game in games.items():
+                with self.subTest(engine=name, seed=seed):
+                    self.assertEqual(infected[name], infected["list"])
+                    self.assertEqual(snapshot(game), reference)
+                    self.assertTrue(game.check_win())
+
+    def test_spread_infects_a_frontier_cell(self):
+        for name in ENGINES:
+            game = create_game(10, name, seed=3)
+            for _ in range(20):
+                frontier = game.frontier_cells()
+                free = game.free_cells()
+                if not game.spread_virus():
+                    break
+                with self.subTest(engine=name):
+                    self.assertEqual(game.free_cells(), free - 1)
+                    self.assertEqual(sum(game.cell(i, j) == 1 for i, j in frontier), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
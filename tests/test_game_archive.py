@@ -0,0 +1,94 @@
+"""
+Pruebas del archivo de partidas .vga: escritura, lectura aleatoria, añadido
+a un archivo existente y recuperación de un archivo sin índice.
+"""
+
+import os
+import tempfile
+import unittest
+
+import board_codec
+from engines import create_game
+from file_manager import FileManager
+from game_archive import GameArchive, compress_game
+
+
+def games():
+    result = []
+    for seed in range(4):
+        game = create_game(6 + seed, seed=seed)
+        for _ in range(seed * 3):
+            game.spread_virus()
+        result.append(game)
+    result.append(create_game(200, "sparse", seed=9))
+    return result
+
+
+class GameArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.workdir.name, "finales.vga")
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def test_round_trip(self):
+        expected = games()
+        with GameArchive(self.path, "w") as archive:
+            for game in expected:
+                archive.append(game)
+        with GameArchive(self.path) as archive:
+            self.assertEqual(len(archive), len(expected))
+            # Acceso aleatorio: de la última a la primera.
+            for index in reversed(range(len(expected))):
+                self.assertEqual(archive.encoded(index), board_codec.encode_game(expected[index]))
+            header, rows = archive.board(1)
+            self.assertEqual(header.size, expected[1].size)
+            self.assertEqual(rows, [expected[1].row_bytes(i) for i in range(expected[1].size)])
+            decoded = archive.game(len(expected) - 1, None)
+            self.assertEqual(list(decoded.stored_tiles()), list(expected[-1].stored_tiles()))
+            self.assertEqual([g.size for g in archive.iter_games(start=1, stop=3)],
+                             [g.size for g in expected[1:3]])
+            with self.assertRaises(ValueError):
+                archive.append(expected[0])
+
+    def test_append_and_saves(self):
+        first, *rest = games()
+        with GameArchive(self.path, "w") as archive:
+            archive.append(first)
+        name = os.path.join(self.workdir.name, "partida")
+        FileManager.save_game(rest[0], name)
+        with GameArchive(self.path, "a") as archive:
+            self.assertEqual(archive.add_save(name), 1)
+            self.assertEqual(archive.append_compressed(compress_game(rest[1])), 2)
+        with GameArchive(self.path) as archive:
+            self.assertEqual(len(archive), 3)
+            self.assertEqual(archive.encoded(1), board_codec.encode_game(rest[0]))
+            copy = os.path.join(self.workdir.name, "copia")
+            self.assertTrue(archive.extract(2, copy))
+        self.assertEqual(board_codec.encode_game(FileManager.load_game(copy)),
+                         board_codec.encode_game(rest[1]))
+
+    def test_recovers_without_index(self):
+        expected = games()[:3]
+        archive = GameArchive(self.path, "w")
+        for game in expected:
+            archive.append(game)
+        # Sin close(): no hay índice y el último registro queda incompleto.
+        archive.file.flush()
+        size = os.path.getsize(self.path)
+        archive.file.truncate(size - 3)
+        archive.file.close()
+        with GameArchive(self.path) as archive:
+            self.assertEqual(len(archive), 2)
+            self.assertEqual(archive.encoded(1), board_codec.encode_game(expected[1]))
+
+    def test_rejects_other_files(self):
+        with open(self.path, "wb") as f:
+            f.write(b"no es un archivo")
+        with self.assertRaises(ValueError):
+            GameArchive(self.path)
+
+
+if __name__ == "__main__":
+    unittest.main()
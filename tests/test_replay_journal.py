@@ -0,0 +1,127 @@
+"""
+Pruebas del diario de jugadas: codificación, búsqueda de jugadas,
+continuación de un diario existente y apertura diferida.
+"""
+
+import os
+import tempfile
+import unittest
+
+import board_codec
+from async_persistence import GameSnapshot
+from engines import create_game
+from replay_journal import JournalReader, ReplayJournal, decode_varint, encode_varint
+
+
+def rows(game):
+    return [bytes(game.row_bytes(i)) for i in range(game.size)]
+
+
+def play(game, turns, states):
+    for _ in range(turns):
+        legal = sorted(pos for pos in game.legal_barrier_cells() if game.cell(*pos) == 0)
+        if legal and game.barriers_remaining > 0:
+            game.place_barrier(*legal[len(legal) // 2])
+            states.append(rows(game))
+        game.barrier_placed = False
+        if game.spread_virus():
+            states.append(rows(game))
+
+
+class VarintTest(unittest.TestCase):
+    def test_round_trip(self):
+        for value in (0, 1, 127, 128, 300, 2 ** 31, 2 ** 64 + 5):
+            data = encode_varint(value) + b"\x00"
+            self.assertEqual(decode_varint(data, 0), (value, len(data) - 1))
+        with self.assertRaises(EOFError):
+            decode_varint(b"\x80", 0)
+
+
+class ReplayJournalTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.workdir.name, "partida.vjl")
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def test_seek_every_move(self):
+        game = create_game(8, seed=5)
+        states = [rows(game)]
+        with ReplayJournal(self.path, game, checkpoint_every=4):
+            play(game, 10, states)
+        with JournalReader(self.path) as reader:
+            self.assertEqual(reader.moves, len(states) - 1)
+            self.assertEqual((reader.size, reader.seed), (8, 5))
+            for move, expected in enumerate(states):
+                self.assertEqual(rows(reader.seek(move)), expected)
+            final = reader.seek(reader.moves)
+            self.assertEqual(final.barriers_remaining, game.barriers_remaining)
+
+    def test_reset_writes_checkpoint(self):
+        game = create_game(6, seed=2)
+        with ReplayJournal(self.path, game):
+            game.spread_virus()
+            game.advance_level()
+            game.spread_virus()
+        with JournalReader(self.path) as reader:
+            final = reader.seek(reader.moves)
+            self.assertEqual(rows(final), rows(game))
+            self.assertEqual(final.level, 2)
+
+    def test_ignores_incomplete_record(self):
+        game = create_game(6, seed=1)
+        with ReplayJournal(self.path, game):
+            play(game, 3, [])
+        with open(self.path, "ab") as f:
+            f.write(b"\x01")
+        with JournalReader(self.path) as reader:
+            self.assertEqual(rows(reader.seek(reader.moves)), rows(game))
+
+    def test_continues_only_the_same_game(self):
+        game = create_game(7)
+        with ReplayJournal(self.path, game):
+            play(game, 3, [])
+        with JournalReader(self.path) as reader:
+            moves = reader.moves
+        with ReplayJournal(self.path, game):
+            game.spread_virus()
+        with JournalReader(self.path) as reader:
+            self.assertEqual(reader.moves, moves + 1)
+
+        # Otra partida sin semilla del mismo tamaño empieza un diario nuevo.
+        other = create_game(7)
+        with ReplayJournal(self.path, other):
+            other.spread_virus()
+        with JournalReader(self.path) as reader:
+            self.assertEqual(reader.moves, 1)
+            self.assertEqual(rows(reader.seek(1)), rows(other))
+
+    def test_deferred_open(self):
+        game = create_game(9, seed=3)
+        states = [rows(game)]
+        journal = ReplayJournal(self.path, game, checkpoint_every=2, snapshot=GameSnapshot(game))
+        # Las jugadas anteriores a open() se guardan en memoria.
+        play(game, 4, states)
+        self.assertFalse(os.path.exists(self.path))
+        journal.open()
+        play(game, 2, states)
+        journal.close()
+        with JournalReader(self.path) as reader:
+            self.assertEqual(reader.moves, len(states) - 1)
+            for move, expected in enumerate(states):
+                self.assertEqual(rows(reader.seek(move)), expected)
+
+    def test_sparse_checkpoints(self):
+        game = create_game(300, "sparse", seed=4)
+        with ReplayJournal(self.path, game, checkpoint_every=3):
+            for _ in range(7):
+                game.spread_virus()
+        with JournalReader(self.path) as reader:
+            final = reader.seek(reader.moves, None)
+            self.assertEqual(list(final.stored_tiles()), list(game.stored_tiles()))
+            self.assertEqual(board_codec.encode_game(final), board_codec.encode_game(game))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+"""
+Pruebas del catálogo de partidas: lectura de cabeceras de cada formato,
+actualización incremental del índice, filtros y orden.
+"""
+
+import os
+import struct
+import tempfile
+import unittest
+
+from engines import create_game
+from file_manager import FileManager
+from save_catalog import INDEX_NAME, SaveCatalog
+
+
+class SaveCatalogTest(unittest.TestCase):
+    def setUp(self):
+        self.workdir = tempfile.TemporaryDirectory()
+        self.dir = self.workdir.name
+        game = create_game(8, seed=1)
+        game.level = 3
+        game.barriers_remaining = 5
+        FileManager.save_game(game, os.path.join(self.dir, "a"))
+        FileManager.save_game(create_game(300, "sparse", seed=2), os.path.join(self.dir, "b"))
+        # Formatos antiguos: solo importa la cabecera.
+        with open(os.path.join(self.dir, "c.bin"), "wb") as f:
+            f.write(struct.pack(">HBB", 12, 4, 9) + bytes(12))
+        with open(os.path.join(self.dir, "d.vsc"), "wb") as f:
+            f.write(struct.pack(">HB", 6, 2) + bytes(6))
+        with open(os.path.join(self.dir, "notas.txt"), "w") as f:
+            f.write("no es una partida")
+
+    def tearDown(self):
+        self.workdir.cleanup()
+
+    def test_reads_headers(self):
+        entries = {m["name"]: m for m in SaveCatalog(self.dir).query()}
+        self.assertEqual(sorted(entries), ["a.bin", "b.bin", "c.bin", "d.vsc"])
+        self.assertEqual((entries["a.bin"]["format"], entries["a.bin"]["size"],
+                          entries["a.bin"]["level"], entries["a.bin"]["barriers"]),
+                         ("packed", 8, 3, 5))
+        self.assertEqual((entries["b.bin"]["format"], entries["b.bin"]["size"]), ("tiled", 300))
+        self.assertEqual((entries["c.bin"]["format"], entries["c.bin"]["size"],
+                          entries["c.bin"]["level"], entries["c.bin"]["barriers"]),
+                         ("legacy", 12, 4, 9))
+        self.assertEqual((entries["d.vsc"]["size"], entries["d.vsc"]["barriers"]), (6, None))
+
+    def test_incremental_refresh(self):
+        catalog = SaveCatalog(self.dir)
+        self.assertEqual(catalog.refresh(), 4)
+        self.assertEqual(catalog.refresh(), 0)
+        # Un catálogo nuevo parte del índice guardado en disco.
+        self.assertEqual(SaveCatalog(self.dir).refresh(), 0)
+        game = create_game(10, seed=3)
+        FileManager.save_game(game, os.path.join(self.dir, "a"))
+        os.remove(os.path.join(self.dir, "c.bin"))
+        self.assertEqual(catalog.refresh(), 1)
+        names = [m["name"] for m in catalog.query(refresh=False)]
+        self.assertEqual(names, ["a.bin", "b.bin", "d.vsc"])
+        self.assertEqual(catalog.query(size=10, refresh=False)[0]["name"], "a.bin")
+
+    def test_filters_and_order(self):
+        catalog = SaveCatalog(self.dir)
+        self.assertEqual([m["name"] for m in catalog.query(extension=".vsc")], ["d.vsc"])
+        self.assertEqual([m["name"] for m in catalog.query(min_level=3, max_level=4)],
+                         ["a.bin", "c.bin"])
+        rich = [m["name"] for m in catalog.query(min_barriers=6)]
+        self.assertIn("c.bin", rich)
+        self.assertNotIn("a.bin", rich)
+        self.assertNotIn("d.vsc", rich)
+        by_size = [m["size"] for m in catalog.query(sort_by="size", reverse=True)]
+        self.assertEqual(by_size, sorted(by_size, reverse=True))
+        # Las barreras desconocidas (None) van al principio.
+        self.assertEqual(catalog.query(sort_by="barriers")[0]["name"], "d.vsc")
+
+    def test_shared_index_keeps_other_extensions(self):
+        SaveCatalog(self.dir).refresh()
+        only_vsc = SaveCatalog(self.dir, extensions=(".vsc",))
+        os.remove(os.path.join(self.dir, "a.bin"))
+        only_vsc.refresh()
+        self.assertEqual([m["name"] for m in only_vsc.query()], ["d.vsc"])
+        # La entrada de a.bin sigue en el índice hasta que la refresque un catálogo de .bin.
+        self.assertIn("a.bin", SaveCatalog(self.dir).entries)
+        self.assertTrue(os.path.exists(os.path.join(self.dir, INDEX_NAME)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,99 @@
+"""
+Pruebas del motor por teselas: formato por teselas (versión 3) de
+board_codec, análisis de celdas válidas y avance rápido sin mapa denso.
+"""
+
+import os
+import random
+import tempfile
+import unittest
+
+import board_codec
+from async_persistence import GameSnapshot, read_game, write_snapshot
+from engines import create_game
+from file_manager import FileManager
+
+
+def scattered_game(size, seed):
+    game = create_game(size, "sparse", seed=seed)
+    rng = random.Random(seed)
+    for _ in range(size):
+        i, j = rng.randrange(size), rng.randrange(size)
+        if game.cell(i, j) == 0:
+            game._set_cell(i, j, 2)
+    for _ in range(size):
+        game.spread_virus()
+    game.level = 3
+    game.max_level = 4
+    game.barriers_remaining = 7
+    return game
+
+
+class TiledCodecTest(unittest.TestCase):
+    def assertSameGame(self, a, b):
+        self.assertEqual(a.size, b.size)
+        self.assertEqual([bytes(a.row_bytes(i)) for i in range(a.size)],
+                         [bytes(b.row_bytes(i)) for i in range(b.size)])
+        for field in ("level", "max_level", "barriers_remaining", "barrier_placed"):
+            self.assertEqual(getattr(a, field), getattr(b, field), field)
+
+    def test_round_trip(self):
+        for size in (12, 40, 100):
+            game = scattered_game(size, size)
+            data = board_codec.encode_game(game)
+            with self.subTest(size=size):
+                self.assertTrue(board_codec.is_tiled(data))
+                self.assertFalse(board_codec.is_packed(data))
+                header, tile, tiles = board_codec.unpack_tiles(data)
+                self.assertEqual((header.version, tile), (board_codec.TILED_VERSION, game.tile))
+                self.assertEqual(len(tiles), len(list(game.stored_tiles())))
+                decoded = board_codec.decode_game(data, None)
+                self.assertEqual(type(decoded), type(game))
+                self.assertSameGame(decoded, game)
+                self.assertSameGame(board_codec.decode_game(data, "list"), game)
+
+    def test_size_grows_with_occupied_tiles(self):
+        game = create_game(board_codec.MAX_SIZE, "sparse", seed=1)
+        data = board_codec.encode_game(game)
+        self.assertLess(len(data), 1024)
+        decoded = board_codec.decode_game(data, None)
+        self.assertEqual(list(decoded.stored_tiles()), list(game.stored_tiles()))
+        self.assertEqual(decoded.frontier_cells(), game.frontier_cells())
+
+    def test_files(self):
+        game = scattered_game(70, 5)
+        with tempfile.TemporaryDirectory() as workdir:
+            name = os.path.join(workdir, "dispersa")
+            self.assertTrue(FileManager.save_game(game, name))
+            self.assertSameGame(FileManager.load_game(name, None), game)
+            write_snapshot(GameSnapshot(game), f"{name}.bin")
+            self.assertSameGame(read_game(f"{name}.bin", "sparse"), game)
+
+
+class SparseGameTest(unittest.TestCase):
+    def test_fast_forward_matches_list_engine(self):
+        for seed in range(5):
+            sparse = scattered_game(50, seed)
+            dense = create_game(50, "list")
+            dense.load_rows([sparse.row_bytes(i) for i in range(50)])
+            batches = []
+            sparse.subscribe(batches.append)
+            infected = sparse.fast_forward()
+            with self.subTest(seed=seed):
+                self.assertEqual(infected, dense.fast_forward())
+                self.assertEqual([sparse.row_bytes(i) for i in range(50)],
+                                 [dense.row_bytes(i) for i in range(50)])
+                self.assertEqual([len(batch) for batch in batches], [infected])
+                self.assertIsNone(sparse._distance)
+                self.assertTrue(sparse.check_win())
+
+    def test_legal_cells_far_from_virus(self):
+        game = create_game(2000, "sparse", seed=2)
+        legal = game.legal_barrier_cells()
+        self.assertIn((0, 0), legal)
+        self.assertIn((1999, 1999), legal)
+        self.assertEqual(len(legal), game.free_cells())
+
+
+if __name__ == "__main__":
+    unittest.main()
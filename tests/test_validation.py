@@ -0,0 +1,91 @@
+"""
+Pruebas de la regla de islas: legal_barrier_cells y la comprobación local de
+cada motor deben coincidir con Validation.validate_no_islands.
+"""
+
+import random
+import unittest
+
+from engines import ENGINES, create_game
+from validation import Validation
+
+
+def random_board(size, seed, barriers):
+    """Tablero con un virus y barreras al azar, sin islas previas."""
+    rng = random.Random(seed)
+    validator = Validation()
+    board = [[0] * size for _ in range(size)]
+    virus = (rng.randrange(size), rng.randrange(size))
+    board[virus[0]][virus[1]] = 1
+    for _ in range(barriers):
+        i, j = rng.randrange(size), rng.randrange(size)
+        if board[i][j] == 0:
+            board[i][j] = 2
+            if not validator.validate_no_islands(board, [virus], size):
+                board[i][j] = 0
+    return board, [virus]
+
+
+def reference_cells(board, virus, size):
+    """Celdas libres donde validate_no_islands acepta una barrera."""
+    validator = Validation()
+    legal = set()
+    for i in range(size):
+        for j in range(size):
+            if board[i][j] == 0:
+                board[i][j] = 2
+                if validator.validate_no_islands(board, virus, size):
+                    legal.add((i, j))
+                board[i][j] = 0
+    return legal
+
+
+class LegalBarrierCellsTest(unittest.TestCase):
+    def test_open_board_corner(self):
+        size = 8
+        board = [[0] * size for _ in range(size)]
+        board[2][1] = 1
+        legal = Validation().legal_barrier_cells(board, size)
+        for cell in ((0, 0), (0, 1), (0, 2), (4, 0)):
+            self.assertIn(cell, legal)
+        self.assertEqual(legal, reference_cells(board, [(2, 1)], size))
+
+    def test_matches_validate_no_islands(self):
+        for seed in range(40):
+            size = 4 + seed % 9
+            board, virus = random_board(size, seed, size * size // 2)
+            with self.subTest(seed=seed, size=size):
+                self.assertEqual(Validation().legal_barrier_cells(board, size),
+                                 reference_cells(board, virus, size))
+
+    def test_existing_islands_do_not_block(self):
+        # La celda (0, 0) ya está aislada: colocar barreras a su alrededor
+        # no crea ninguna isla nueva.
+        board = [[0, 2, 0, 0],
+                 [2, 0, 0, 0],
+                 [0, 0, 1, 0],
+                 [0, 0, 0, 0]]
+        legal = Validation().legal_barrier_cells(board, 4)
+        self.assertIn((0, 0), legal)
+        self.assertIn((1, 1), legal)
+
+
+class EngineLegalityTest(unittest.TestCase):
+    def test_engines_match_reference(self):
+        for name in ENGINES:
+            for seed in range(12):
+                size = 6 + seed % 7
+                board, virus = random_board(size, seed, size * size // 2)
+                expected = reference_cells(board, virus, size)
+                game = create_game(size, name, seed=seed)
+                game.load_rows([bytes(row) for row in board])
+                with self.subTest(engine=name, seed=seed):
+                    self.assertEqual(expected,
+                                     {(i, j) for i in range(size) for j in range(size)
+                                      if board[i][j] == 0 and game.validate_no_islands(i, j)})
+                    self.assertEqual(expected, {pos for pos in game.legal_barrier_cells()
+                                                if board[pos[0]][pos[1]] == 0})
+
+
+if __name__ == "__main__":
+    unittest.main()
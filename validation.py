@@ -10,6 +10,7 @@ Autor: [Tu nombre]
 Fecha: [Fecha]
 """
 
+from array import array
 from collections import deque
 
 class Validation:
@@ -18,11 +19,13 @@ class Validation:
     
     Métodos:
         validate_no_islands: Verifica que no se creen islas inválidas.
+        legal_barrier_cells: Calcula todas las celdas donde se puede colocar una barrera.
     """
     
     def __init__(self):
         """Inicializa el validador."""
-        pass
+        # Celdas recorridas por la última búsqueda (lo usa profiling.Profiler).
+        self.last_flood_cells = 0
     
     def validate_no_islands(self, board, virus_positions, size):
         """
@@ -36,7 +39,6 @@ class Validation:
         Returns:
             bool: True si no hay islas inválidas, False si se crean
         """
-        temp_board = [row[:] for row in board]
         visited = [[False for _ in range(size)] for _ in range(size)]
         queue = deque()
         
@@ -45,19 +47,114 @@ class Validation:
             visited[x][y] = True
         
         directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+        flooded = len(queue)
         while queue:
             x, y = queue.popleft()
             
             for dx, dy in directions:
                 nx, ny = x + dx, y + dy
                 if 0 <= nx < size and 0 <= ny < size:
-                    if not visited[nx][ny] and temp_board[nx][ny] == 0:
+                    if not visited[nx][ny] and board[nx][ny] == 0:
                         visited[nx][ny] = True
                         queue.append((nx, ny))
+                        flooded += 1
+        self.last_flood_cells = flooded
         
         for i in range(size):
             for j in range(size):
-                if temp_board[i][j] == 0 and not visited[i][j]:
+                if board[i][j] == 0 and not visited[i][j]:
                     return False
         
-        return True
\ No newline at end of file
+        return True
+    
+    def legal_barrier_cells(self, board, size):
+        """
+        Calcula en una sola pasada todas las celdas donde se puede colocar una barrera.
+        
+        Una barrera es válida si todas las celdas libres que el virus puede
+        alcanzar lo siguen pudiendo alcanzar después de colocarla (la regla de
+        validate_no_islands; las celdas que ya estaban aisladas no cuentan).
+        Con un DFS iterativo (Tarjan) sobre el grafo de celdas libres, con una
+        raíz virtual unida a las celdas libres adyacentes al virus, se obtienen
+        los puntos de articulación: son las únicas celdas libres inválidas. Los
+        vecinos se calculan con aritmética de índices y el estado del DFS se
+        guarda en arrays planos, sin listas por celda.
+        
+        Args:
+            board (list): Matriz del tablero
+            size (int): Tamaño del tablero
+            
+        Returns:
+            set: Posiciones (i, j) donde colocar una barrera no crea islas
+        """
+        total = size * size
+        root = total
+        cells = bytearray(total)
+        for i, row in enumerate(board):
+            cells[i * size:(i + 1) * size] = bytes(row)
+        
+        def touches_virus(k):
+            j = k % size
+            return ((k >= size and cells[k - size] == 1) or (k + size < total and cells[k + size] == 1)
+                    or (j > 0 and cells[k - 1] == 1) or (j < size - 1 and cells[k + 1] == 1))
+        
+        disc = array("i", [0]) * (total + 1)
+        low = array("i", [0]) * (total + 1)
+        parent = array("i", [-1]) * (total + 1)
+        # Siguiente vecino por probar de cada celda: 0-3 las direcciones, 4 la raíz.
+        step = bytearray(total)
+        cut = bytearray(total)
+        disc[root] = low[root] = 1
+        timer = 2
+        scan = 0
+        stack = [root]
+        while stack:
+            v = stack[-1]
+            w = -1
+            if v == root:
+                while scan < total:
+                    k = scan
+                    scan += 1
+                    if cells[k] == 0 and not disc[k] and touches_virus(k):
+                        w = k
+                        break
+            else:
+                j = v % size
+                while step[v] < 5:
+                    d = step[v]
+                    step[v] += 1
+                    if d == 4:
+                        if parent[v] != root and touches_virus(v):
+                            low[v] = 1
+                        continue
+                    if d == 0:
+                        u = v - size if v >= size else -1
+                    elif d == 1:
+                        u = v + size if v + size < total else -1
+                    elif d == 2:
+                        u = v - 1 if j > 0 else -1
+                    else:
+                        u = v + 1 if j < size - 1 else -1
+                    if u < 0 or cells[u] != 0:
+                        continue
+                    if not disc[u]:
+                        w = u
+                        break
+                    if u != parent[v] and disc[u] < low[v]:
+                        low[v] = disc[u]
+            if w >= 0:
+                disc[w] = low[w] = timer
+                timer += 1
+                parent[w] = v
+                stack.append(w)
+                continue
+            stack.pop()
+            if v != root:
+                p = parent[v]
+                if low[v] < low[p]:
+                    low[p] = low[v]
+                if p != root and low[v] >= disc[p]:
+                    cut[p] = 1
+        self.last_flood_cells = timer - 2
+        
+        return {divmod(k, size) for k in range(total) if cells[k] == 0 and not cut[k]}